@@ -0,0 +1,109 @@
+"""
+Text Analysis Module
+Scans each capsule's text once and shares the results with enrichment and graph building
+"""
+
+import hashlib
+import logging
+import re
+from collections import Counter
+from typing import Dict, FrozenSet, List
+from models import CapsuleModel
+
+logger = logging.getLogger(__name__)
+
+# Maximal runs of word characters; the length filters below reproduce the
+# \b\w{3,}\b (graph) and \b\w{4,}\b (keywords) patterns on the same stream
+WORD_PATTERN = re.compile(r'\w+')
+
+# Sentence boundaries used for SEO descriptions
+SENTENCE_PATTERN = re.compile(r'[.!?]+')
+
+# Shortest word used for graph similarity and for content keywords
+MIN_TERM_LENGTH = 3
+MIN_KEYWORD_LENGTH = 4
+
+# Leading sentences kept for SEO descriptions
+LEADING_SENTENCES = 2
+
+
+class TextAnalysis:
+    """
+    Results of one pass over a capsule's title and content
+
+    Attributes:
+        content_hash: SHA-256 hex digest of the title and content
+        tokens: Lowercase words of 3+ characters from title and content, in
+            text order (the token stream)
+        term_counts: Occurrences of each token
+        terms: Distinct tokens, as used for graph similarity
+        keyword_counts: Occurrences of each content word of 4+ characters,
+            in order of first occurrence
+        sentences: The first LEADING_SENTENCES pieces of the content split on
+            sentence punctuation (unstripped, possibly empty)
+    """
+
+    def __init__(self, content_hash: str, tokens: List[str], keyword_counts: Dict[str, int],
+                 sentences: List[str]):
+        self.content_hash = content_hash
+        self.tokens = tokens
+        self.term_counts: Dict[str, int] = Counter(tokens)
+        self.terms: FrozenSet[str] = frozenset(self.term_counts)
+        self.keyword_counts = keyword_counts
+        self.sentences = sentences
+
+
+class TextAnalyzer:
+    """Runs the shared text analysis stage"""
+
+    @staticmethod
+    def content_hash(title: str, content: str) -> str:
+        """
+        Hash of the text a capsule is analyzed on
+
+        Args:
+            title: The capsule title
+            content: The capsule content
+
+        Returns:
+            SHA-256 hex digest
+        """
+        return hashlib.sha256(f"{title}\0{content}".encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def analyze(title: str, content: str) -> TextAnalysis:
+        """
+        Analyze a capsule's text in one regex pass per field
+
+        Args:
+            title: The capsule title
+            content: The capsule content
+
+        Returns:
+            TextAnalysis of the text
+        """
+        title_words = WORD_PATTERN.findall(title.lower())
+        content_words = WORD_PATTERN.findall(content.lower())
+
+        tokens = [w for w in title_words + content_words if len(w) >= MIN_TERM_LENGTH]
+        keyword_counts = Counter(w for w in content_words if len(w) >= MIN_KEYWORD_LENGTH)
+
+        # Split only as far as the leading sentences
+        sentences = SENTENCE_PATTERN.split(content, maxsplit=LEADING_SENTENCES)[:LEADING_SENTENCES]
+
+        return TextAnalysis(TextAnalyzer.content_hash(title, content), tokens, keyword_counts, sentences)
+
+    @staticmethod
+    def analyze_collection(capsules: List[CapsuleModel]) -> Dict[str, TextAnalysis]:
+        """
+        Analyze every capsule of a collection
+
+        Args:
+            capsules: Capsules to analyze
+
+        Returns:
+            Capsule ID -> TextAnalysis
+        """
+        analyses = {c.id: TextAnalyzer.analyze(c.title, c.content) for c in capsules}
+        logger.info(f"Analyzed text of {len(analyses)} capsules")
+        return analyses
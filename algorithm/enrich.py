@@ -3,10 +3,15 @@ Content Enrichment Module
 Programmatically enhances capsule data with SEO metadata, structured data, and other attributes
 """
 
+import heapq
 import logging
+import math
 import re
-from typing import Dict, Any, List
+from collections import Counter
+from typing import Dict, Any, Iterable, List, Optional
 from models import CapsuleModel, SEOModel
+from analysis import TextAnalysis, TextAnalyzer
+from enrich_cache import EnrichmentCache
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
@@ -50,7 +55,9 @@ class ContentEnricher:
         return f"{capsule_type}/{slug}"
 
     @staticmethod
-    def extract_keywords(title: str, content: str, capsule_type: str) -> List[str]:
+    def extract_keywords(title: str, content: str, capsule_type: str,
+                         analysis: Optional[TextAnalysis] = None,
+                         idf: Optional[Dict[str, float]] = None) -> List[str]:
         """
         Extract relevant keywords from title and content
 
@@ -58,34 +65,64 @@ class ContentEnricher:
             title: The capsule title
             content: The capsule content
             capsule_type: The capsule type
+            analysis: Precomputed text analysis of the capsule
+            idf: Inverse document frequency per content word (see
+                keyword_idf); without it words are ranked by frequency alone
 
         Returns:
-            A list of relevant keywords
+            Up to 10 keywords: title words, then the top content words, then
+            type-specific keywords
         """
-        keywords = set()
-
-        # Add type-specific keywords
-        keywords.update(ContentEnricher.TYPE_KEYWORDS.get(capsule_type, []))
-
-        # Add title words (longer than 3 characters)
+        # Title words (longer than 3 characters)
         title_words = [w.lower() for w in title.split() if len(w) > 3]
-        keywords.update(title_words)
 
-        # Extract common words from content (very basic approach)
+        # Rank content words by TF-IDF (very basic approach)
         # In production, use NLTK or similar for better extraction
-        words = re.findall(r'\b\w{4,}\b', content.lower())
-        word_freq = {}
-        for word in words:
-            word_freq[word] = word_freq.get(word, 0) + 1
+        if analysis is None:
+            analysis = TextAnalyzer.analyze(title, content)
+        idf = idf or {}
+
+        # Bounded selection of the 5 best words; ties go to the earlier word
+        top_words = heapq.nlargest(
+            5,
+            ((count * idf.get(word, 1.0), -position, word)
+             for position, (word, count) in enumerate(analysis.keyword_counts.items()))
+        )
+
+        keywords = title_words + [word for _, _, word in top_words]
+        keywords += ContentEnricher.TYPE_KEYWORDS.get(capsule_type, [])
+
+        return list(dict.fromkeys(keywords))[:10]  # Limit to 10 keywords
+
+    @staticmethod
+    def keyword_idf(analyses: Iterable[TextAnalysis]) -> Dict[str, float]:
+        """
+        Inverse document frequency of content words over a collection
 
-        # Add most frequent words
-        top_words = sorted(word_freq.items(), key=lambda x: x[1], reverse=True)[:5]
-        keywords.update([w[0] for w in top_words])
+        Document frequencies are counted in one pass over the analyses, and
+        smoothed as 1 + log((1 + n) / (1 + df)) so every word keeps a
+        positive weight.
 
-        return list(keywords)[:10]  # Limit to 10 keywords
+        Args:
+            analyses: Text analysis of every capsule in the collection
+
+        Returns:
+            Content word -> IDF weight
+        """
+        document_frequencies: Counter = Counter()
+        count = 0
+        for analysis in analyses:
+            document_frequencies.update(analysis.keyword_counts.keys())
+            count += 1
+
+        return {
+            word: 1 + math.log((1 + count) / (1 + frequency))
+            for word, frequency in document_frequencies.items()
+        }
 
     @staticmethod
-    def generate_seo_description(title: str, content: str, max_length: int = 160) -> str:
+    def generate_seo_description(title: str, content: str, max_length: int = 160,
+                                 analysis: Optional[TextAnalysis] = None) -> str:
         """
         Generate a SEO-optimized meta description
 
@@ -93,12 +130,15 @@ class ContentEnricher:
             title: The capsule title
             content: The capsule content
             max_length: Maximum description length
+            analysis: Precomputed text analysis of the capsule
 
         Returns:
             A SEO-optimized description
         """
-        # Get first 2-3 sentences from content
-        sentences = re.split(r'[.!?]+', content)
+        # Get first 2 sentences from content
+        if analysis is None:
+            analysis = TextAnalyzer.analyze(title, content)
+        sentences = analysis.sentences
         description = '. '.join([s.strip() for s in sentences[:2] if s.strip()])
 
         # Ensure it includes the title
@@ -148,68 +188,156 @@ class ContentEnricher:
         return seo_title
 
     @staticmethod
-    def enrich_capsule(capsule: CapsuleModel) -> CapsuleModel:
+    def enrich_capsule(capsule: CapsuleModel, analysis: Optional[TextAnalysis] = None,
+                       idf: Optional[Dict[str, float]] = None) -> CapsuleModel:
         """
         Enrich a capsule with additional metadata
 
         Args:
             capsule: The capsule to enrich
+            analysis: Precomputed text analysis of the capsule
+            idf: Collection-wide keyword IDF weights (see keyword_idf)
 
         Returns:
-            The enriched capsule
+            The enriched capsule (unchanged if enrichment failed)
         """
         try:
-            # Generate slug if not present or invalid
-            if not capsule.slug or capsule.slug == '**':
-                capsule.slug = ContentEnricher.generate_slug(capsule.title, capsule.type)
-
-            # Extract keywords if missing
-            if not capsule.seo.keywords or len(capsule.seo.keywords) == 0:
-                capsule.seo.keywords = ContentEnricher.extract_keywords(
-                    capsule.title,
-                    capsule.content,
-                    capsule.type
-                )
-
-            # Generate SEO title if missing or generic
-            if not capsule.seo.title or len(capsule.seo.title) < 10:
-                capsule.seo.title = ContentEnricher.generate_seo_title(
-                    capsule.title,
-                    capsule.geo.region,
-                    capsule.type
-                )
-
-            # Generate SEO description if missing
-            if not capsule.seo.description or len(capsule.seo.description) < 20:
-                capsule.seo.description = ContentEnricher.generate_seo_description(
-                    capsule.title,
-                    capsule.content
-                )
-
-            # Update metadata timestamp
-            capsule.metadata.updated = datetime.now().strftime('%Y-%m-%d')
-
-            logger.debug(f"Enriched capsule: {capsule.id}")
-            return capsule
+            return ContentEnricher.apply_enrichment(capsule, analysis, idf)
 
         except Exception as e:
             logger.error(f"Error enriching capsule {capsule.id}: {str(e)}")
             return capsule
 
     @staticmethod
-    def enrich_collection(capsules: List[CapsuleModel]) -> List[CapsuleModel]:
+    def apply_enrichment(capsule: CapsuleModel, analysis: Optional[TextAnalysis] = None,
+                         idf: Optional[Dict[str, float]] = None) -> CapsuleModel:
+        """
+        Enrich a capsule in place, letting errors propagate
+
+        Args:
+            capsule: The capsule to enrich
+            analysis: Precomputed text analysis of the capsule
+            idf: Collection-wide keyword IDF weights (see keyword_idf)
+
+        Returns:
+            The enriched capsule
+        """
+        if analysis is None:
+            analysis = TextAnalyzer.analyze(capsule.title, capsule.content)
+
+        # Generate slug if not present or invalid
+        if not capsule.slug or capsule.slug == '**':
+            capsule.slug = ContentEnricher.generate_slug(capsule.title, capsule.type)
+
+        # Extract keywords if missing
+        if not capsule.seo.keywords or len(capsule.seo.keywords) == 0:
+            capsule.seo.keywords = ContentEnricher.extract_keywords(
+                capsule.title,
+                capsule.content,
+                capsule.type,
+                analysis,
+                idf
+            )
+
+        # Generate SEO title if missing or generic
+        if not capsule.seo.title or len(capsule.seo.title) < 10:
+            capsule.seo.title = ContentEnricher.generate_seo_title(
+                capsule.title,
+                capsule.geo.region,
+                capsule.type
+            )
+
+        # Generate SEO description if missing
+        if not capsule.seo.description or len(capsule.seo.description) < 20:
+            capsule.seo.description = ContentEnricher.generate_seo_description(
+                capsule.title,
+                capsule.content,
+                analysis=analysis
+            )
+
+        # Update metadata timestamp
+        capsule.metadata.updated = datetime.now().strftime('%Y-%m-%d')
+
+        logger.debug(f"Enriched capsule: {capsule.id}")
+        return capsule
+
+    @staticmethod
+    def enrich_collection(capsules: List[CapsuleModel],
+                          analyses: Optional[Dict[str, TextAnalysis]] = None,
+                          cache: Optional[EnrichmentCache] = None,
+                          workers: int = 1, chunk_size: int = 500,
+                          errors: Optional[List[str]] = None) -> List[CapsuleModel]:
         """
         Enrich a collection of capsules
 
         Args:
             capsules: List of capsules to enrich
+            analyses: Capsule ID -> precomputed text analysis (see
+                TextAnalyzer.analyze_collection)
+            cache: Enrichment cache; capsules with unchanged inputs reuse
+                their stored result and keep their update date
+            workers: Worker processes; values above 1 enrich the capsules
+                missing from the cache in chunks across a process pool
+            chunk_size: Capsules per pool task
+            errors: List collecting one message per capsule that failed to
+                enrich; failed capsules are returned unchanged and not cached
 
         Returns:
-            List of enriched capsules
+            List of enriched capsules, in input order
         """
-        enriched = []
-        for capsule in capsules:
-            enriched.append(ContentEnricher.enrich_capsule(capsule))
-
+        analyses = analyses or {}
+        capsule_analyses = [
+            analyses.get(c.id) or TextAnalyzer.analyze(c.title, c.content) for c in capsules
+        ]
+
+        # Keyword weights are relative to the whole collection
+        idf = ContentEnricher.keyword_idf(capsule_analyses)
+
+        # Restore cache hits; the rest still needs enriching. Extracted
+        # keywords are ranked again, as the IDF weights are not in the key
+        keys: Dict[int, str] = {}
+        extracted: Dict[int, bool] = {}
+        pending: List[int] = []
+        for i, (capsule, analysis) in enumerate(zip(capsules, capsule_analyses)):
+            if cache is not None:
+                keys[i] = cache.key(capsule, analysis)
+                extracted[i] = not capsule.seo.keywords
+                entry = cache.get(keys[i])
+                if entry is not None:
+                    cache.apply(capsule, entry)
+                    if entry['extracted']:
+                        capsule.seo.keywords = ContentEnricher.extract_keywords(
+                            capsule.title, capsule.content, capsule.type, analysis, idf
+                        )
+                    continue
+            pending.append(i)
+
+        if workers > 1 and len(pending) > chunk_size:
+            from enrich_parallel import enrich_parallel
+
+            failures = enrich_parallel([capsules[i] for i in pending], idf, workers, chunk_size)
+        else:
+            failures = []
+            for i in pending:
+                try:
+                    ContentEnricher.apply_enrichment(capsules[i], capsule_analyses[i], idf)
+                    failures.append(None)
+                except Exception as e:
+                    failures.append(str(e))
+
+        failed = 0
+        for i, failure in zip(pending, failures):
+            if failure is not None:
+                failed += 1
+                logger.warning(f"Failed to enrich capsule {capsules[i].id}: {failure}")
+                if errors is not None:
+                    errors.append(f"Capsule {capsules[i].id}: {failure}")
+            elif cache is not None:
+                cache.put(keys[i], capsules[i], extracted[i])
+
+        if failed:
+            logger.warning(f"Enrichment completed with {failed} errors")
+
+        enriched = list(capsules)
         logger.info(f"Enriched {len(enriched)} capsules")
         return enriched
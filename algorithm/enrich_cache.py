@@ -0,0 +1,144 @@
+"""
+Enrichment Cache Module
+Persists ContentEnricher output across runs, keyed by a hash of the enrichment inputs
+"""
+
+import hashlib
+import json
+import logging
+from pathlib import Path
+from typing import Any, Dict, Optional
+from models import CapsuleModel
+from analysis import TextAnalysis, TextAnalyzer
+
+logger = logging.getLogger(__name__)
+
+
+class EnrichmentCache:
+    """
+    On-disk cache of enriched slugs, SEO fields and update dates
+
+    Entries are keyed by a hash of everything enrich_capsule reads (type,
+    region, slug, SEO fields and the title/content hash), so an entry is
+    only reused for a capsule that would be enriched identically. A hit
+    restores the stored result, including metadata.updated, so unchanged
+    capsules keep the date they were last enriched on. Extracted keywords
+    are weighted against the whole collection, which the key does not
+    cover, so entries flag them ('extracted') and enrich_collection ranks
+    them again against the current collection on every hit. The cache is a
+    single JSON file; entries not used by the latest run are dropped on save.
+    """
+
+    # Bump when enrichment logic changes to invalidate existing entries
+    VERSION = 3
+
+    def __init__(self, path: Optional[Path] = None):
+        """
+        Initialize the cache and load existing entries
+
+        Args:
+            path: JSON file holding the cache; None keeps it in memory only
+        """
+        self.path = Path(path) if path is not None else None
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.used: Dict[str, Dict[str, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+
+        if self.path is not None and self.path.exists():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == self.VERSION:
+                    self.entries = data.get('entries', {})
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable enrichment cache {self.path}: {str(e)}")
+
+    @staticmethod
+    def key(capsule: CapsuleModel, analysis: Optional[TextAnalysis] = None) -> str:
+        """
+        Hash of a capsule's enrichment inputs
+
+        Args:
+            capsule: Capsule before enrichment
+            analysis: Precomputed text analysis providing the content hash
+
+        Returns:
+            SHA-256 hex digest
+        """
+        content_hash = (analysis.content_hash if analysis is not None
+                        else TextAnalyzer.content_hash(capsule.title, capsule.content))
+        inputs = [
+            EnrichmentCache.VERSION, capsule.type, capsule.geo.region, capsule.slug,
+            capsule.seo.title, capsule.seo.description, capsule.seo.keywords, content_hash
+        ]
+        return hashlib.sha256(json.dumps(inputs, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up an entry and count the hit or miss
+
+        Args:
+            key: Key from EnrichmentCache.key()
+
+        Returns:
+            Stored enrichment result, or None
+        """
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.used[key] = entry
+        return entry
+
+    def put(self, key: str, capsule: CapsuleModel, extracted: bool = False) -> None:
+        """
+        Store the enrichment result of a capsule
+
+        Args:
+            key: Key computed before enrichment
+            capsule: The enriched capsule
+            extracted: Whether its keywords were extracted, and so depend on
+                the collection's IDF weights
+        """
+        entry = {
+            'slug': capsule.slug,
+            'seo': capsule.seo.dict(),
+            'updated': capsule.metadata.updated,
+            'extracted': extracted,
+        }
+        self.entries[key] = entry
+        self.used[key] = entry
+
+    @staticmethod
+    def apply(capsule: CapsuleModel, entry: Dict[str, Any]) -> CapsuleModel:
+        """
+        Restore a stored enrichment result onto a capsule
+
+        Args:
+            capsule: Capsule before enrichment
+            entry: Result from get()
+
+        Returns:
+            The enriched capsule
+        """
+        capsule.slug = entry['slug']
+        # SEOModel or SEORecord, matching the capsule (see records.py)
+        capsule.seo = type(capsule.seo)(**entry['seo'])
+        capsule.metadata.updated = entry['updated']
+        return capsule
+
+    def save(self) -> None:
+        """Write the entries used in this run to disk"""
+        if self.path is None:
+            return
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_suffix(self.path.suffix + '.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': self.VERSION, 'entries': self.used}, f, ensure_ascii=False, separators=(',', ':'))
+        temp_path.replace(self.path)
+
+        logger.debug(f"Enrichment cache saved: {len(self.used)} entries")
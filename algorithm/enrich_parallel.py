@@ -0,0 +1,81 @@
+"""
+Parallel Enrichment Module
+Enriches chunks of capsules across a process pool
+"""
+
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+from models import CapsuleModel
+from enrich import ContentEnricher
+
+logger = logging.getLogger(__name__)
+
+# Per-process keyword IDF weights, installed once by the pool initializer
+_worker_idf: Optional[Dict[str, float]] = None
+
+
+def _init_worker(idf: Dict[str, float]) -> None:
+    """Install the collection-wide keyword weights in a worker process"""
+    global _worker_idf
+    _worker_idf = idf
+
+
+def _enrich_chunk(capsules: List[Dict[str, Any]]) -> List[Tuple[Optional[Dict[str, Any]], Optional[str]]]:
+    """Enrich a chunk of capsule dicts, returning (enriched fields, error) per capsule"""
+    results = []
+    for data in capsules:
+        try:
+            capsule = ContentEnricher.apply_enrichment(CapsuleModel(**data), idf=_worker_idf)
+            results.append(({
+                'slug': capsule.slug,
+                'seo': capsule.seo.dict(),
+                'metadata': capsule.metadata.dict(),
+            }, None))
+        except Exception as e:
+            results.append((None, str(e)))
+    return results
+
+
+def enrich_parallel(capsules: List[CapsuleModel], idf: Dict[str, float],
+                    workers: Optional[int] = None, chunk_size: int = 500) -> List[Optional[str]]:
+    """
+    Enrich capsules in place in a process pool
+
+    Capsules cross the process boundary as plain dicts, and only the
+    enriched fields (slug, SEO, metadata) come back. Workers analyze the
+    text of their own chunk. Results are collected in submission order and
+    written back to the matching capsule.
+
+    Args:
+        capsules: Capsules to enrich (modified in place)
+        idf: Collection-wide keyword IDF weights (see ContentEnricher.keyword_idf)
+        workers: Number of worker processes (defaults to the CPU count)
+        chunk_size: Capsules per task
+
+    Returns:
+        Error message per capsule, None where enrichment succeeded
+    """
+    workers = workers or os.cpu_count() or 1
+    chunks = [
+        [c.dict() for c in capsules[start:start + chunk_size]]
+        for start in range(0, len(capsules), chunk_size)
+    ]
+
+    failures: List[Optional[str]] = []
+    position = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(idf,)) as pool:
+        for results in pool.map(_enrich_chunk, chunks):
+            for fields, error in results:
+                if fields is not None:
+                    capsule = capsules[position]
+                    capsule.slug = fields['slug']
+                    # Models or records, matching the capsule (see records.py)
+                    capsule.seo = type(capsule.seo)(**fields['seo'])
+                    capsule.metadata = type(capsule.metadata)(**fields['metadata'])
+                failures.append(error)
+                position += 1
+
+    logger.debug(f"Parallel enrichment: {len(chunks)} chunks on {workers} workers")
+    return failures
@@ -3,10 +3,13 @@ Relationship Discovery & Graph Building Module
 Intelligently discovers and maps relationships between capsules
 """
 
+import heapq
 import logging
-from typing import List, Dict, Set, Tuple
+from typing import Iterable, List, Dict, Set, Tuple, Optional, Union
 from models import CapsuleModel
-import re
+from graph_index import GraphIndex, JaccardScorer, SimilarityScorer, geo_distance, jaccard, tokenize
+from graph_artifact import GraphArtifact
+from analysis import TextAnalysis
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +24,22 @@ class GraphBuilder:
         'guide': 2     # Middle level
     }
 
+    # Relationship thresholds and score weights
+    PARENT_THRESHOLD = 0.15
+    RELATED_THRESHOLD = 0.25
+    SIMILARITY_WEIGHT = 0.7
+    GEO_WEIGHT = 0.3
+    GEO_RADIUS_KM = 100
+
+    # Separator between type and region in sibling group IDs
+    SIBLING_GROUP_SEPARATOR = ':'
+
+    # Relationship discovery engines selectable in build_graph
+    ENGINES = ('python', 'numpy', 'minhash')
+
+    # Text similarity scorers selectable in build_graph
+    SCORERS = ('jaccard', 'tfidf')
+
     @staticmethod
     def calculate_similarity(text1: str, text2: str) -> float:
         """
@@ -33,27 +52,44 @@ class GraphBuilder:
         Returns:
             Similarity score between 0 and 1
         """
-        # Extract words
-        words1 = set(re.findall(r'\b\w{3,}\b', text1.lower()))
-        words2 = set(re.findall(r'\b\w{3,}\b', text2.lower()))
+        # Extract words and compare the word sets
+        return jaccard(tokenize(text1), tokenize(text2))
+
+    @staticmethod
+    def create_scorer(scorer: Union[str, SimilarityScorer] = 'jaccard') -> SimilarityScorer:
+        """
+        Resolve a scorer name or instance
 
-        if not words1 or not words2:
-            return 0.0
+        Args:
+            scorer: One of SCORERS, or a SimilarityScorer instance
+
+        Returns:
+            Unfitted SimilarityScorer
 
-        # Calculate Jaccard similarity
-        intersection = len(words1 & words2)
-        union = len(words1 | words2)
+        Raises:
+            ValueError: If the scorer name is unknown
+        """
+        if isinstance(scorer, SimilarityScorer):
+            return scorer
+        if scorer == 'jaccard':
+            return JaccardScorer()
+        if scorer == 'tfidf':
+            from graph_tfidf import TfidfScorer
 
-        return intersection / union if union > 0 else 0.0
+            return TfidfScorer()
+        raise ValueError(f"Unknown similarity scorer: {scorer}")
 
     @staticmethod
-    def find_parent_capsules(capsule: CapsuleModel, all_capsules: List[CapsuleModel]) -> List[str]:
+    def find_parent_capsules(capsule: CapsuleModel, all_capsules: List[CapsuleModel],
+                             index: Optional[GraphIndex] = None) -> List[str]:
         """
         Find parent capsules for a given capsule
 
         Args:
             capsule: The capsule to find parents for
             all_capsules: All available capsules
+            index: Optional per-run index; when given, only products sharing
+                a token with the capsule are scored
 
         Returns:
             List of parent capsule IDs
@@ -64,6 +100,9 @@ class GraphBuilder:
         if capsule.type == 'product':
             return parents
 
+        if index is not None:
+            return GraphBuilder.indexed_parents(index, index.id_to_index[capsule.id])
+
         # Places and guides can have product parents
         for other in all_capsules:
             if other.type == 'product':
@@ -73,23 +112,32 @@ class GraphBuilder:
                     capsule.title + ' ' + capsule.content
                 )
 
-                if similarity > 0.15:  # Threshold for parent relationship
+                if similarity > GraphBuilder.PARENT_THRESHOLD:
                     parents.append(other.id)
 
         return parents
 
     @staticmethod
-    def find_related_capsules(capsule: CapsuleModel, all_capsules: List[CapsuleModel]) -> List[str]:
+    def find_related_capsules(capsule: CapsuleModel, all_capsules: List[CapsuleModel],
+                              index: Optional[GraphIndex] = None) -> List[str]:
         """
         Find related capsules for a given capsule
 
         Args:
             capsule: The capsule to find related items for
             all_capsules: All available capsules
+            index: Optional per-run index; when given, only capsules sharing
+                a token or lying within GEO_RADIUS_KM (found through the
+                index's spatial grid) are scored. Every other
+                capsule scores 0 and could never pass the threshold, so the
+                result is identical to the exhaustive scan.
 
         Returns:
             List of related capsule IDs
         """
+        if index is not None:
+            return GraphBuilder.indexed_related(index, index.id_to_index[capsule.id])
+
         related = []
 
         for other in all_capsules:
@@ -110,13 +158,137 @@ class GraphBuilder:
             )
 
             # Combine scores
-            combined_score = (similarity * 0.7) + ((1 - min(geo_distance / 100, 1)) * 0.3)
+            combined_score = GraphBuilder.combine_scores(similarity, geo_distance)
 
-            if combined_score > 0.25:  # Threshold for related relationship
+            if combined_score > GraphBuilder.RELATED_THRESHOLD:
                 related.append(other.id)
 
         return related
 
+    @staticmethod
+    def indexed_parents(index: GraphIndex, position: int) -> List[str]:
+        """
+        Find parent capsules using only the per-run index
+
+        Args:
+            index: Per-run index
+            position: Position of the capsule in the run
+
+        Returns:
+            List of parent capsule IDs
+        """
+        if index.types[position] == 'product':
+            return []
+
+        products = [i for i in sorted(index.token_candidates(position)) if index.types[i] == 'product']
+        return [
+            index.ids[i] for i, similarity in zip(products, index.scores(position, products))
+            if similarity > GraphBuilder.PARENT_THRESHOLD
+        ]
+
+    @staticmethod
+    def indexed_related(index: GraphIndex, position: int) -> List[str]:
+        """
+        Find related capsules using only the per-run index
+
+        Args:
+            index: Per-run index
+            position: Position of the capsule in the run
+
+        Returns:
+            List of related capsule IDs
+        """
+        return [index.ids[i] for _, i in GraphBuilder.scored_related(index, position)]
+
+    @staticmethod
+    def scored_related(index: GraphIndex, position: int, top_k: Optional[int] = None,
+                       by_score: bool = False) -> List[Tuple[float, int]]:
+        """
+        Score related capsules using only the per-run index
+
+        Args:
+            index: Per-run index
+            position: Position of the capsule in the run
+            top_k: Keep only the k best edges (see rank_related)
+            by_score: Order edges by score (see rank_related)
+
+        Returns:
+            (combined score, position) pairs of related capsules
+        """
+        candidates = index.token_candidates(position)
+        candidates.update(index.geo_candidates(position, GraphBuilder.GEO_RADIUS_KM))
+        candidates = sorted(candidates)
+        similarities = index.scores(position, candidates)
+        lat, lng = index.geo.points[position]
+
+        def edges():
+            for i, similarity in zip(candidates, similarities):
+                other_lat, other_lng = index.geo.points[i]
+                geo_distance = GraphBuilder.calculate_geo_distance(lat, lng, other_lat, other_lng)
+                score = GraphBuilder.combine_scores(similarity, geo_distance)
+                if score > GraphBuilder.RELATED_THRESHOLD:
+                    yield score, i
+
+        return GraphBuilder.rank_related(edges(), top_k, by_score)
+
+    @staticmethod
+    def rank_related(edges: Iterable[Tuple[float, int]], top_k: Optional[int] = None,
+                     by_score: bool = False) -> List[Tuple[float, int]]:
+        """
+        Select the related edges to keep for one capsule
+
+        Args:
+            edges: (score, position) pairs in position order
+            top_k: Maximum number of edges, or None for all
+            by_score: Order unbounded edges by score instead of position
+
+        Returns:
+            The top_k edges by descending score (ties broken by position),
+            selected with a bounded heap; without top_k, all edges in
+            position order or, with by_score, in score order
+        """
+        key = lambda edge: (edge[0], -edge[1])
+        if top_k is not None:
+            return heapq.nlargest(top_k, edges, key=key)
+        if by_score:
+            return sorted(edges, key=key, reverse=True)
+        return list(edges)
+
+    @staticmethod
+    def related_limits(capsules: List[CapsuleModel],
+                       related_top_k: Optional[Union[int, Dict[str, int]]]) -> Optional[List[Optional[int]]]:
+        """
+        Resolve the related-link limit of every capsule
+
+        Args:
+            capsules: Capsules of the run
+            related_top_k: One k for all capsules, capsule type -> k, or None
+
+        Returns:
+            Limit per capsule position (None = unbounded, still ordered by
+            score), or None when top-k mode is off
+        """
+        if related_top_k is None:
+            return None
+        if isinstance(related_top_k, int):
+            return [related_top_k] * len(capsules)
+        return [related_top_k.get(c.type) for c in capsules]
+
+    @staticmethod
+    def combine_scores(similarity: float, geo_distance: float) -> float:
+        """
+        Combine text similarity and geographic distance into a related score
+
+        Args:
+            similarity: Text similarity between 0 and 1
+            geo_distance: Distance in kilometers
+
+        Returns:
+            Weighted score between 0 and 1
+        """
+        geo_score = 1 - min(geo_distance / GraphBuilder.GEO_RADIUS_KM, 1)
+        return (similarity * GraphBuilder.SIMILARITY_WEIGHT) + (geo_score * GraphBuilder.GEO_WEIGHT)
+
     @staticmethod
     def find_sibling_capsules(capsule: CapsuleModel, all_capsules: List[CapsuleModel]) -> List[str]:
         """
@@ -143,82 +315,341 @@ class GraphBuilder:
 
         return siblings
 
+    @staticmethod
+    def sibling_group_id(capsule: CapsuleModel) -> str:
+        """
+        ID of the sibling group a capsule belongs to
+
+        Args:
+            capsule: The capsule
+
+        Returns:
+            Group ID in format: type:region
+        """
+        return f"{capsule.type}{GraphBuilder.SIBLING_GROUP_SEPARATOR}{capsule.geo.region}"
+
+    @staticmethod
+    def get_sibling_groups(capsules: List[CapsuleModel]) -> Dict[str, List[str]]:
+        """
+        Collect compact sibling group membership
+
+        Args:
+            capsules: Capsules built with compact_siblings=True
+
+        Returns:
+            Group ID -> member capsule IDs, for groups with two or more members
+        """
+        groups: Dict[str, List[str]] = {}
+        for capsule in capsules:
+            if capsule.links.sibling_group is not None:
+                groups.setdefault(capsule.links.sibling_group, []).append(capsule.id)
+
+        return {group_id: members for group_id, members in groups.items() if len(members) > 1}
+
     @staticmethod
     def calculate_geo_distance(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
         """
-        Calculate approximate distance between two geographic points in kilometers
+        Calculate the great-circle distance between two points in kilometers
 
         Args:
             lat1, lng1: First point coordinates
             lat2, lng2: Second point coordinates
 
         Returns:
-            Distance in kilometers (approximate)
+            Distance in kilometers (haversine formula)
+        """
+        return geo_distance(lat1, lng1, lat2, lng2)
+
+    @staticmethod
+    def find_children(capsules: List[CapsuleModel], id_to_index: Dict[str, int]) -> List[List[str]]:
+        """
+        Derive children lists by inverting the parent links in one pass
+
+        Args:
+            capsules: Capsules whose parent links are already assigned
+            id_to_index: Capsule id -> position in capsules
+
+        Returns:
+            Children IDs per capsule position, in capsule order
         """
-        # Simple approximation using Pythagorean theorem
-        # For more accuracy, use Haversine formula
-        lat_diff = (lat2 - lat1) * 111  # 1 degree latitude ≈ 111 km
-        lng_diff = (lng2 - lng1) * 111 * (1 / (1 + ((lat1 + lat2) / 2) ** 2) ** 0.5)
+        children: List[List[str]] = [[] for _ in capsules]
+
+        for capsule in capsules:
+            for parent_id in capsule.links.parent:
+                position = id_to_index.get(parent_id)
+                if position is not None:
+                    children[position].append(capsule.id)
 
-        distance = (lat_diff ** 2 + lng_diff ** 2) ** 0.5
-        return distance
+        return children
 
     @staticmethod
-    def build_graph(capsules: List[CapsuleModel]) -> List[CapsuleModel]:
+    def build_graph(capsules: List[CapsuleModel], engine: str = 'python',
+                    minhash_permutations: int = 128, minhash_bands: int = 64,
+                    compact_siblings: bool = False, workers: int = 1,
+                    related_top_k: Optional[Union[int, Dict[str, int]]] = None,
+                    scorer: Union[str, SimilarityScorer] = 'jaccard',
+                    analyses: Optional[Dict[str, TextAnalysis]] = None) -> List[CapsuleModel]:
         """
         Build a knowledge graph by discovering relationships between all capsules
 
         Args:
             capsules: List of capsules to build graph for
+            engine: Relationship discovery engine, 'python', 'numpy' or
+                'minhash'. The numpy engine falls back to 'python' when NumPy
+                is missing; 'minhash' is approximate and may miss links.
+            minhash_permutations: MinHash signature length ('minhash' engine)
+            minhash_bands: Number of LSH bands ('minhash' engine)
+            compact_siblings: Reference a sibling group ID from each capsule
+                instead of storing the full sibling list on every member
+                (see get_sibling_groups)
+            workers: Worker processes for the 'python' engine; values above 1
+                shard the capsules across a process pool
+            related_top_k: Keep only the k highest-scoring related links per
+                capsule, either one k for all capsules or a dict of
+                capsule type -> k (types not listed stay unbounded). Kept
+                links are ordered by score and their scores are stored in
+                links.related_weights.
+            scorer: Text similarity scorer, 'jaccard' (word-set overlap) or
+                'tfidf' (cosine of TF-IDF vectors), or a SimilarityScorer.
+                The parent and related thresholds apply to its scores.
+            analyses: Capsule ID -> precomputed text analysis (see
+                TextAnalyzer.analyze_collection); avoids tokenizing again
 
         Returns:
             List of capsules with updated relationship links
         """
+        if engine not in GraphBuilder.ENGINES:
+            raise ValueError(f"Unknown graph engine: {engine}")
+
         logger.info("Building knowledge graph...")
 
-        for i, capsule in enumerate(capsules):
-            # Find parents
-            parents = GraphBuilder.find_parent_capsules(capsule, capsules)
-            capsule.links.parent = parents
+        # Tokenize every capsule once and index terms for candidate lookup
+        index = GraphIndex(capsules, GraphBuilder.create_scorer(scorer), analyses)
+
+        limits = GraphBuilder.related_limits(capsules, related_top_k)
 
-            # Find children (reverse of parent relationship)
-            children = [c.id for c in capsules if capsule.id in c.links.parent]
-            capsule.links.children = children
+        # Engines return parents as IDs and related links as (score, position)
+        parent_links = related_links = None
+        if engine == 'numpy':
+            from graph_numpy import HAS_NUMPY, NumpyGraphEngine
+
+            if HAS_NUMPY:
+                parent_links, related_links = NumpyGraphEngine(capsules, index).find_links(limits)
+            else:
+                logger.warning("NumPy is not installed, falling back to the python graph engine")
+        elif engine == 'python' and workers > 1:
+            from graph_parallel import find_links_parallel
 
-            # Find related capsules
-            related = GraphBuilder.find_related_capsules(capsule, capsules)
-            capsule.links.related = related
+            parent_links, related_links = find_links_parallel(index, workers, limits)
+        elif engine == 'minhash':
+            from graph_lsh import MinHashGraphEngine
 
-            # Find siblings
-            siblings = GraphBuilder.find_sibling_capsules(capsule, capsules)
-            capsule.links.siblings = siblings
+            parent_links, related_links = MinHashGraphEngine(
+                capsules, index, minhash_permutations, minhash_bands
+            ).find_links(limits)
+
+        # Pass 1: find parents for every capsule
+        for i, capsule in enumerate(capsules):
+            if parent_links is not None:
+                capsule.links.parent = parent_links[i]
+            else:
+                capsule.links.parent = GraphBuilder.find_parent_capsules(capsule, capsules, index)
+
+        # Pass 2: related capsules
+        for i, capsule in enumerate(capsules):
+            if related_links is not None:
+                edges = related_links[i]
+            else:
+                edges = GraphBuilder.scored_related(
+                    index, i, limits[i] if limits else None, limits is not None
+                )
+
+            capsule.links.related = [index.ids[j] for _, j in edges]
+            capsule.links.related_weights = (
+                [round(score, 4) for score, _ in edges] if limits is not None else None
+            )
 
             if (i + 1) % 10 == 0:
                 logger.debug(f"Processed {i + 1}/{len(capsules)} capsules")
 
+        # Pass 3: children and siblings
+        GraphBuilder._assign_derived_links(capsules, index, compact_siblings)
+
         logger.info(f"Knowledge graph built with {len(capsules)} capsules")
         return capsules
 
     @staticmethod
-    def get_graph_stats(capsules: List[CapsuleModel]) -> Dict[str, any]:
+    def update_graph(capsules: List[CapsuleModel], previous: List[CapsuleModel],
+                     changed: Set[str] = frozenset(), added: Set[str] = frozenset(),
+                     removed: Set[str] = frozenset(),
+                     compact_siblings: bool = False,
+                     scorer: Union[str, SimilarityScorer] = 'jaccard',
+                     analyses: Optional[Dict[str, TextAnalysis]] = None) -> List[CapsuleModel]:
+        """
+        Rebuild only the graph edges incident to changed capsules
+
+        Unaffected capsules keep their previous parent and related links,
+        minus links to dirty capsules, plus links re-scored against the
+        affected capsules. Scores are symmetric, so scoring each affected
+        capsule against its candidates is enough to patch both sides.
+        Children and siblings are re-derived in linear passes. The result
+        matches build_graph(capsules) with the python engine and unbounded
+        related lists (related_top_k is not supported here). Only scorers
+        whose pair scores depend on the two capsules alone (such as Jaccard)
+        give exact results; TF-IDF weights change with the whole corpus.
+
+        Args:
+            capsules: Current capsules (links are overwritten)
+            previous: Capsules of the previous graph, with their links
+            changed: IDs whose type, title, content or geo changed
+            added: IDs new since the previous graph
+            removed: IDs dropped since the previous graph
+            compact_siblings: See build_graph
+            scorer: See build_graph
+            analyses: See build_graph
+
+        Returns:
+            List of capsules with updated relationship links
+        """
+        logger.info("Updating knowledge graph incrementally...")
+
+        index = GraphIndex(capsules, GraphBuilder.create_scorer(scorer), analyses)
+        position = index.id_to_index
+        previous_links = {c.id: c.links for c in previous}
+        dirty = set(changed) | set(added) | set(removed)
+
+        # Capsules missing from the previous graph are treated as added
+        affected = {
+            i for i, capsule in enumerate(capsules)
+            if capsule.id in dirty or capsule.id not in previous_links
+        }
+
+        parents: List[List[str]] = []
+        related: List[List[str]] = []
+        for i, capsule in enumerate(capsules):
+            if i in affected:
+                parents.append(GraphBuilder.find_parent_capsules(capsule, capsules, index))
+                related.append(GraphBuilder.find_related_capsules(capsule, capsules, index))
+            else:
+                links = previous_links[capsule.id]
+                parents.append([p for p in links.parent if p in position and p not in dirty])
+                related.append([r for r in links.related if r in position and r not in dirty])
+
+        # Patch unaffected capsules from the affected side of each pair
+        for a in sorted(affected):
+            capsule = capsules[a]
+            candidates = index.token_candidates(a)
+            candidates.update(index.geo_candidates(a, GraphBuilder.GEO_RADIUS_KM))
+
+            others = sorted(candidates - affected)
+            for j, similarity in zip(others, index.scores(a, others)):
+                other = capsules[j]
+
+                if (capsule.type == 'product' and other.type != 'product' and
+                        similarity > GraphBuilder.PARENT_THRESHOLD):
+                    parents[j].append(capsule.id)
+
+                geo_distance = GraphBuilder.calculate_geo_distance(
+                    other.geo.lat, other.geo.lng,
+                    capsule.geo.lat, capsule.geo.lng
+                )
+                if GraphBuilder.combine_scores(similarity, geo_distance) > GraphBuilder.RELATED_THRESHOLD:
+                    related[j].append(capsule.id)
+
+        # Reused lists follow the previous capsule order, and patched lists
+        # have links appended; put both in current capsule order
+        for j in range(len(capsules)):
+            if j not in affected:
+                parents[j].sort(key=position.__getitem__)
+                related[j].sort(key=position.__getitem__)
+
+        for capsule, capsule_parents, capsule_related in zip(capsules, parents, related):
+            capsule.links.parent = capsule_parents
+            capsule.links.related = capsule_related
+            capsule.links.related_weights = None
+
+        GraphBuilder._assign_derived_links(capsules, index, compact_siblings)
+
+        logger.info(f"Knowledge graph updated: {len(affected)} of {len(capsules)} capsules rescored")
+        return capsules
+
+    @staticmethod
+    def diff_capsules(previous: List[CapsuleModel],
+                      current: List[CapsuleModel]) -> Tuple[Set[str], Set[str], Set[str]]:
+        """
+        Compare the graph inputs of two capsule lists
+
+        Only type, title, content and geo feed relationship discovery, so
+        other field changes (SEO, metadata) do not mark a capsule as changed.
+
+        Args:
+            previous: Capsules of the previous run
+            current: Capsules of the current run
+
+        Returns:
+            Tuple of (changed, added, removed) capsule ID sets
+        """
+        def graph_inputs(capsule: CapsuleModel) -> tuple:
+            return (capsule.type, capsule.title, capsule.content,
+                    capsule.geo.lat, capsule.geo.lng, capsule.geo.region)
+
+        before = {c.id: graph_inputs(c) for c in previous}
+        after = {c.id: graph_inputs(c) for c in current}
+
+        changed = {cid for cid, inputs in after.items() if cid in before and before[cid] != inputs}
+        added = set(after) - set(before)
+        removed = set(before) - set(after)
+        return changed, added, removed
+
+    @staticmethod
+    def _assign_derived_links(capsules: List[CapsuleModel], index: GraphIndex,
+                              compact_siblings: bool) -> None:
+        """Assign children (reverse of parents) and siblings to every capsule"""
+        children = GraphBuilder.find_children(capsules, index.id_to_index)
+        for i, capsule in enumerate(capsules):
+            capsule.links.children = children[i]
+
+            # Siblings are grouped by type and region in the index
+            if compact_siblings:
+                capsule.links.siblings = []
+                capsule.links.sibling_group = GraphBuilder.sibling_group_id(capsule)
+            else:
+                capsule.links.siblings = index.siblings(i)
+                capsule.links.sibling_group = None
+
+    @staticmethod
+    def get_graph_stats(capsules: Union[List[CapsuleModel], GraphArtifact]) -> Dict[str, any]:
         """
         Generate statistics about the knowledge graph
 
         Args:
-            capsules: List of capsules
+            capsules: List of capsules, or a CSR GraphArtifact (graph.json)
 
         Returns:
             Dictionary containing graph statistics
         """
+        if isinstance(capsules, GraphArtifact):
+            return GraphBuilder._artifact_stats(capsules)
+
         total_edges = 0
         connected_capsules = 0
         orphaned_capsules = 0
 
+        # Compact sibling groups stand for (members - 1) siblings per member
+        group_sizes: Dict[str, int] = {}
         for capsule in capsules:
+            if capsule.links.sibling_group is not None:
+                group_sizes[capsule.links.sibling_group] = group_sizes.get(capsule.links.sibling_group, 0) + 1
+
+        for capsule in capsules:
+            sibling_count = len(capsule.links.siblings)
+            if capsule.links.sibling_group is not None:
+                sibling_count += group_sizes[capsule.links.sibling_group] - 1
+
             edge_count = (len(capsule.links.parent) +
                          len(capsule.links.children) +
                          len(capsule.links.related) +
-                         len(capsule.links.siblings))
+                         sibling_count)
 
             total_edges += edge_count
 
@@ -234,3 +665,16 @@ class GraphBuilder:
             'orphaned_capsules': orphaned_capsules,
             'connectivity_percentage': (connected_capsules / len(capsules) * 100) if capsules else 0
         }
+
+    @staticmethod
+    def _artifact_stats(artifact: GraphArtifact) -> Dict[str, any]:
+        """Graph statistics computed from the CSR offsets alone"""
+        connected_capsules = sum(1 for i in range(len(artifact)) if artifact.degree(i) > 0)
+
+        return {
+            'total_capsules': len(artifact),
+            'total_edges': len(artifact.targets),
+            'connected_capsules': connected_capsules,
+            'orphaned_capsules': len(artifact) - connected_capsules,
+            'connectivity_percentage': (connected_capsules / len(artifact) * 100) if len(artifact) else 0
+        }
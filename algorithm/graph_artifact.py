@@ -0,0 +1,174 @@
+"""
+Graph Artifact Module
+Compact integer-indexed (CSR) representation of the knowledge graph
+"""
+
+import logging
+from typing import Any, Dict, List, Optional
+from models import CapsuleModel
+
+logger = logging.getLogger(__name__)
+
+
+class GraphArtifact:
+    """
+    Knowledge graph in compressed sparse row (CSR) form
+
+    Nodes are capsule IDs in capsule order. The outgoing edges of node i
+    are targets[offsets[i]:offsets[i + 1]], with the matching entries of
+    types (index into EDGE_TYPES) and weights. Serialized as graph.json,
+    the whole graph loads in one small request and is traversed by
+    integer position instead of string lookups. build records the options
+    the graph was built with, so an incremental rebuild can tell whether
+    the previous graph is an exact default build.
+    """
+
+    FORMAT = 'csr'
+    VERSION = 1
+    EDGE_TYPES = ('parent', 'children', 'related', 'siblings')
+
+    def __init__(self, nodes: List[str], offsets: List[int], targets: List[int],
+                 types: List[int], weights: Optional[List[float]] = None,
+                 build: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the artifact
+
+        Args:
+            nodes: Capsule IDs, one per node
+            offsets: Edge offsets per node (len(nodes) + 1 entries)
+            targets: Target node per edge
+            types: Edge type per edge (index into EDGE_TYPES)
+            weights: Optional weight per edge
+            build: Options the graph was built with (engine, scorer, ...)
+        """
+        self.nodes = nodes
+        self.offsets = offsets
+        self.targets = targets
+        self.types = types
+        self.weights = weights
+        self.build = build
+        self.node_index: Dict[str, int] = {node: i for i, node in enumerate(nodes)}
+
+    @classmethod
+    def from_capsules(cls, capsules: List[CapsuleModel],
+                      build: Optional[Dict[str, Any]] = None) -> 'GraphArtifact':
+        """
+        Build the artifact from capsule links
+
+        Compact sibling groups are expanded, and links to unknown IDs are
+        dropped. Related links carry their related_weights when present;
+        every other edge has weight 1.0.
+
+        Args:
+            capsules: Capsules with relationship links
+            build: Options the graph was built with
+
+        Returns:
+            GraphArtifact instance
+        """
+        nodes = [c.id for c in capsules]
+        node_index = {node: i for i, node in enumerate(nodes)}
+
+        groups: Dict[str, List[int]] = {}
+        for i, capsule in enumerate(capsules):
+            if capsule.links.sibling_group is not None:
+                groups.setdefault(capsule.links.sibling_group, []).append(i)
+
+        has_weights = any(c.links.related_weights for c in capsules)
+        offsets = [0]
+        targets: List[int] = []
+        types: List[int] = []
+        weights: List[float] = []
+
+        for i, capsule in enumerate(capsules):
+            links = capsule.links
+            siblings = [node_index[s] for s in links.siblings if s in node_index]
+            if links.sibling_group is not None:
+                siblings.extend(j for j in groups[links.sibling_group] if j != i)
+
+            related_weights = links.related_weights or [1.0] * len(links.related)
+            edges = (
+                [(node_index.get(p), 0, 1.0) for p in links.parent] +
+                [(node_index.get(c), 1, 1.0) for c in links.children] +
+                [(node_index.get(r), 2, w) for r, w in zip(links.related, related_weights)] +
+                [(j, 3, 1.0) for j in siblings]
+            )
+
+            for target, edge_type, weight in edges:
+                if target is None:
+                    continue
+                targets.append(target)
+                types.append(edge_type)
+                weights.append(weight)
+            offsets.append(len(targets))
+
+        return cls(nodes, offsets, targets, types, weights if has_weights else None, build)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'GraphArtifact':
+        """
+        Load the artifact from its serialized form (graph.json)
+
+        Args:
+            data: Dictionary produced by to_dict()
+
+        Returns:
+            GraphArtifact instance
+
+        Raises:
+            ValueError: If the format, version or edge types are not supported
+        """
+        if data.get('format') != cls.FORMAT or tuple(data.get('edge_types', ())) != cls.EDGE_TYPES:
+            raise ValueError("Unsupported graph artifact format")
+        if data.get('version') != cls.VERSION:
+            raise ValueError(f"Unsupported graph artifact version: {data.get('version')}")
+
+        return cls(data['nodes'], data['offsets'], data['targets'], data['types'], data.get('weights'),
+                   data.get('build'))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Serialize the artifact for graph.json
+
+        Returns:
+            Dictionary with the node table and CSR arrays
+        """
+        data = {
+            'format': self.FORMAT,
+            'version': self.VERSION,
+            'edge_types': list(self.EDGE_TYPES),
+            'nodes': self.nodes,
+            'offsets': self.offsets,
+            'targets': self.targets,
+            'types': self.types,
+        }
+        if self.weights is not None:
+            data['weights'] = self.weights
+        if self.build is not None:
+            data['build'] = self.build
+        return data
+
+    def degree(self, node: int) -> int:
+        """Number of outgoing edges of a node"""
+        return self.offsets[node + 1] - self.offsets[node]
+
+    def neighbors(self, node: int, edge_type: Optional[str] = None) -> List[int]:
+        """
+        Targets of a node's outgoing edges
+
+        Args:
+            node: Node position
+            edge_type: Restrict to one of EDGE_TYPES
+
+        Returns:
+            Target node positions in stored order
+        """
+        start, stop = self.offsets[node], self.offsets[node + 1]
+        if edge_type is None:
+            return self.targets[start:stop]
+
+        wanted = self.EDGE_TYPES.index(edge_type)
+        return [self.targets[e] for e in range(start, stop) if self.types[e] == wanted]
+
+    def __len__(self) -> int:
+        return len(self.nodes)
@@ -0,0 +1,417 @@
+"""
+Graph Index Module
+Per-run lookup structures that let the graph builder avoid all-pairs scans
+"""
+
+import logging
+import math
+import re
+from typing import AbstractSet, Dict, FrozenSet, List, Optional, Set, Tuple
+from models import CapsuleModel
+from analysis import TextAnalysis
+
+logger = logging.getLogger(__name__)
+
+# Same token definition the graph builder has always used for similarity
+TOKEN_PATTERN = re.compile(r'\b\w{3,}\b')
+
+# Mean Earth radius used for great-circle distances
+EARTH_RADIUS_KM = 6371.0
+
+
+def tokenize(text: str) -> FrozenSet[str]:
+    """
+    Split text into the set of lowercase tokens used for similarity scoring
+
+    Args:
+        text: Text to tokenize
+
+    Returns:
+        Frozen set of tokens (words of 3+ characters)
+    """
+    return frozenset(TOKEN_PATTERN.findall(text.lower()))
+
+
+def jaccard(tokens1: AbstractSet, tokens2: AbstractSet) -> float:
+    """
+    Jaccard similarity of two token sets
+
+    Args:
+        tokens1: First token set
+        tokens2: Second token set
+
+    Returns:
+        Similarity score between 0 and 1
+    """
+    if not tokens1 or not tokens2:
+        return 0.0
+
+    intersection = len(tokens1 & tokens2)
+    return intersection / (len(tokens1) + len(tokens2) - intersection)
+
+
+def geo_distance(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """
+    Calculate the great-circle distance between two points in kilometers
+
+    Args:
+        lat1, lng1: First point coordinates
+        lat2, lng2: Second point coordinates
+
+    Returns:
+        Distance in kilometers (haversine formula)
+    """
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    half_dphi = math.radians(lat2 - lat1) / 2
+    half_dlambda = math.radians(lng2 - lng1) / 2
+
+    a = math.sin(half_dphi) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(half_dlambda) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def geo_window(lat: float, radius_km: float) -> Tuple[float, float]:
+    """
+    Degree offsets that bound every point within radius_km of a latitude
+
+    Any point farther than these offsets in latitude or longitude is
+    guaranteed to be more than radius_km away under geo_distance().
+
+    Args:
+        lat: Latitude of the query point
+        radius_km: Search radius in kilometers
+
+    Returns:
+        Tuple of (max latitude offset, max longitude offset) in degrees.
+        A longitude offset of 180 means every longitude can match.
+    """
+    angle = radius_km / EARTH_RADIUS_KM
+    lat_offset = math.degrees(angle)
+
+    # Circles reaching a pole (or half the globe) cover every longitude
+    if abs(lat) + lat_offset >= 90 or angle >= math.pi / 2:
+        return lat_offset, 180.0
+
+    ratio = math.sin(angle) / math.cos(math.radians(lat))
+    if ratio >= 1:
+        return lat_offset, 180.0
+
+    return lat_offset, math.degrees(math.asin(ratio))
+
+
+def capsule_text(capsule: CapsuleModel) -> str:
+    """Return the text a capsule is compared on (title and content)"""
+    return capsule.title + ' ' + capsule.content
+
+
+class GeoGrid:
+    """
+    Uniform latitude/longitude grid over capsule coordinates
+
+    Points are bucketed into square cells of cell_degrees. A radius query
+    only visits the cells overlapping the bounding window from geo_window()
+    and then checks exact distances, so it touches a small fraction of the
+    collection when capsules are spread out.
+    """
+
+    def __init__(self, points: List[Tuple[float, float]], cell_degrees: float = 1.0):
+        """
+        Build the grid
+
+        Args:
+            points: (lat, lng) per capsule position
+            cell_degrees: Cell edge length in degrees
+        """
+        self.points = points
+        self.cell_degrees = cell_degrees
+        self.cells: Dict[Tuple[int, int], List[int]] = {}
+
+        for i, (lat, lng) in enumerate(points):
+            self.cells.setdefault(self._cell(lat, lng), []).append(i)
+
+    def _cell(self, lat: float, lng: float) -> Tuple[int, int]:
+        """Grid cell containing a point"""
+        return math.floor(lat / self.cell_degrees), math.floor(lng / self.cell_degrees)
+
+    def within(self, lat: float, lng: float, radius_km: float) -> List[Tuple[float, int]]:
+        """
+        Find points within a distance of a location
+
+        Args:
+            lat, lng: Query coordinates
+            radius_km: Search radius in kilometers
+
+        Returns:
+            (distance, position) pairs for points at most radius_km away
+        """
+        lat_offset, lng_offset = geo_window(lat, radius_km)
+        row_min, col_min = self._cell(lat - lat_offset, lng - lng_offset)
+        row_max, col_max = self._cell(lat + lat_offset, lng + lng_offset)
+
+        # Windows crossing the antimeridian wrap around; keep every column
+        if lng - lng_offset < -180 or lng + lng_offset > 180:
+            col_min, col_max = -math.inf, math.inf
+
+        # Wide windows can span more cells than are occupied; walk the
+        # occupied cells instead in that case
+        if (row_max - row_min + 1) * (col_max - col_min + 1) > len(self.cells):
+            cells = [
+                members for (row, col), members in self.cells.items()
+                if row_min <= row <= row_max and col_min <= col <= col_max
+            ]
+        else:
+            cells = [
+                self.cells[(row, col)]
+                for row in range(row_min, row_max + 1)
+                for col in range(col_min, col_max + 1)
+                if (row, col) in self.cells
+            ]
+
+        matches = []
+        for members in cells:
+            for i in members:
+                other_lat, other_lng = self.points[i]
+                distance = geo_distance(lat, lng, other_lat, other_lng)
+                if distance <= radius_km:
+                    matches.append((distance, i))
+
+        return matches
+
+
+class SimilarityScorer:
+    """
+    Text similarity measure used by the graph builder
+
+    A scorer is fitted once per run on a GraphIndex and then answers
+    similarity queries by capsule position. Scores must be symmetric, lie
+    between 0 and 1, and be 0 for capsules sharing no token, because the
+    engines only score the candidates found through the index postings.
+    The engines score one capsule against all its candidates at once
+    through scores(); scorers that can do that faster than pair by pair
+    override it.
+    """
+
+    # Name used to select the scorer in GraphBuilder.build_graph
+    name = ''
+
+    def fit(self, index: 'GraphIndex') -> None:
+        """
+        Prepare per-run data from a freshly built index
+
+        Args:
+            index: Index holding the capsules and their interned token sets
+        """
+        raise NotImplementedError
+
+    def similarity(self, index1: int, index2: int) -> float:
+        """
+        Similarity of two indexed capsules
+
+        Args:
+            index1: Position of the first capsule
+            index2: Position of the second capsule
+
+        Returns:
+            Similarity score between 0 and 1
+        """
+        raise NotImplementedError
+
+    def scores(self, index: int, candidates: List[int]) -> List[float]:
+        """
+        Similarities of one indexed capsule to each of several others
+
+        Args:
+            index: Position of the capsule
+            candidates: Positions of the capsules to score it against
+
+        Returns:
+            Similarity score per candidate, in candidate order
+        """
+        return [self.similarity(index, other) for other in candidates]
+
+
+class JaccardScorer(SimilarityScorer):
+    """Jaccard similarity of the interned token sets (the default scorer)"""
+
+    name = 'jaccard'
+
+    def fit(self, index: 'GraphIndex') -> None:
+        self.tokens = index.tokens
+
+    def similarity(self, index1: int, index2: int) -> float:
+        return jaccard(self.tokens[index1], self.tokens[index2])
+
+
+class GraphIndex:
+    """
+    Lookup structures built once per graph run
+
+    Holds an id -> position map, each capsule's token set and an inverted
+    index (token -> positions of capsules containing it). Two capsules that
+    share no token have a text similarity of exactly 0, so the postings
+    lists give the complete set of capsules worth scoring on text.
+
+    Tokens are interned to integer ids, so each capsule is tokenized exactly
+    once per run and pair similarity is an integer set intersection.
+
+    A GeoGrid over capsule coordinates answers radius queries without
+    measuring the distance to every capsule, and capsules are grouped by
+    (type, region) so sibling lookups are a single dict access.
+
+    Text similarity is delegated to a SimilarityScorer fitted on the index
+    (Jaccard by default).
+
+    Pickling drops the capsule models and text analyses and keeps only the
+    plain lookup data, which is all the scoring functions and lookups need
+    in worker processes.
+    """
+
+    def __init__(self, capsules: List[CapsuleModel], scorer: Optional[SimilarityScorer] = None,
+                 analyses: Optional[Dict[str, TextAnalysis]] = None):
+        """
+        Build the index
+
+        Args:
+            capsules: Capsules of the current run, in pipeline order
+            scorer: Text similarity scorer to fit on the index (defaults to
+                JaccardScorer)
+            analyses: Capsule ID -> precomputed text analysis; capsules
+                without one are tokenized here
+        """
+        self.capsules = capsules
+        self.analyses = analyses or {}
+        self.ids: List[str] = [c.id for c in capsules]
+        self.types: List[str] = [c.type for c in capsules]
+        self.regions: List[str] = [c.geo.region for c in capsules]
+        self.id_to_index: Dict[str, int] = {c.id: i for i, c in enumerate(capsules)}
+        self.vocabulary: Dict[str, int] = {}
+        self.tokens: List[FrozenSet[int]] = []
+        self.postings: Dict[int, List[int]] = {}
+
+        for i, capsule in enumerate(capsules):
+            analysis = self.analyses.get(capsule.id)
+            words = analysis.terms if analysis is not None else tokenize(capsule_text(capsule))
+            tokens = self.intern(words)
+            self.tokens.append(tokens)
+            for token in tokens:
+                self.postings.setdefault(token, []).append(i)
+
+        self.geo = GeoGrid([(c.geo.lat, c.geo.lng) for c in capsules])
+
+        self.sibling_groups: Dict[Tuple[str, str], List[int]] = {}
+        for i, group in enumerate(zip(self.types, self.regions)):
+            self.sibling_groups.setdefault(group, []).append(i)
+
+        self.scorer = scorer or JaccardScorer()
+        self.scorer.fit(self)
+
+        logger.debug(f"Graph index built: {len(capsules)} capsules, {len(self.postings)} terms")
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state['capsules'] = None
+        state['analyses'] = None
+        return state
+
+    def intern(self, words: AbstractSet[str]) -> FrozenSet[int]:
+        """
+        Map words to integer token ids, assigning new ids as needed
+
+        Args:
+            words: Words to intern
+
+        Returns:
+            Frozen set of token ids
+        """
+        vocabulary = self.vocabulary
+        return frozenset(vocabulary.setdefault(word, len(vocabulary)) for word in words)
+
+    def similarity(self, index1: int, index2: int) -> float:
+        """
+        Text similarity of two indexed capsules under the index's scorer
+
+        Args:
+            index1: Position of the first capsule
+            index2: Position of the second capsule
+
+        Returns:
+            Similarity score between 0 and 1
+        """
+        return self.scorer.similarity(index1, index2)
+
+    def scores(self, index: int, candidates: List[int]) -> List[float]:
+        """
+        Text similarities of one indexed capsule to each of several others
+
+        Args:
+            index: Position of the capsule
+            candidates: Positions of the capsules to score it against
+
+        Returns:
+            Similarity score per candidate, in candidate order
+        """
+        return self.scorer.scores(index, candidates)
+
+    def siblings(self, index: int) -> List[str]:
+        """
+        IDs of the other capsules sharing the capsule's type and region
+
+        Args:
+            index: Position of the capsule in the run
+
+        Returns:
+            Sibling capsule IDs in capsule order
+        """
+        return [
+            self.ids[i]
+            for i in self.sibling_groups[(self.types[index], self.regions[index])]
+            if i != index
+        ]
+
+    def token_candidates(self, index: int) -> Set[int]:
+        """
+        Find capsules sharing at least one token with the given capsule
+
+        Args:
+            index: Position of the capsule in the run
+
+        Returns:
+            Positions of capsules with non-zero text similarity (self excluded)
+        """
+        candidates: Set[int] = set()
+        for token in self.tokens[index]:
+            candidates.update(self.postings[token])
+        candidates.discard(index)
+        return candidates
+
+    def geo_candidates(self, index: int, radius_km: float) -> Set[int]:
+        """
+        Find capsules within a distance of the given capsule
+
+        Args:
+            index: Position of the capsule in the run
+            radius_km: Search radius in kilometers
+
+        Returns:
+            Positions of capsules at most radius_km away (self excluded)
+        """
+        lat, lng = self.geo.points[index]
+        candidates = {i for _, i in self.geo.within(lat, lng, radius_km)}
+        candidates.discard(index)
+        return candidates
+
+    def nearby(self, capsule_id: str, radius_km: float) -> List[str]:
+        """
+        Find capsules within a distance of a capsule, nearest first
+
+        Args:
+            capsule_id: ID of the capsule to search around
+            radius_km: Search radius in kilometers
+
+        Returns:
+            IDs of capsules at most radius_km away, ordered by distance
+        """
+        index = self.id_to_index[capsule_id]
+        lat, lng = self.geo.points[index]
+        matches = sorted(m for m in self.geo.within(lat, lng, radius_km) if m[1] != index)
+        return [self.ids[i] for _, i in matches]
@@ -0,0 +1,161 @@
+"""
+Approximate Similarity Module
+MinHash signatures and LSH banding for relationship discovery on very large collections
+"""
+
+import logging
+import random
+from typing import Dict, List, Optional, Set, Tuple
+from models import CapsuleModel
+from graph import GraphBuilder
+from graph_index import GraphIndex
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+logger = logging.getLogger(__name__)
+
+# Mersenne prime used by the universal hash family (a * x + b) mod P
+MERSENNE_PRIME = (1 << 31) - 1
+
+
+class MinHashGraphEngine:
+    """
+    Computes parent and related links from MinHash/LSH candidate pairs
+
+    Each capsule gets a MinHash signature of num_permutations values. The
+    signature is cut into bands of equal width, and capsules that agree on
+    every value of some band become candidate pairs. Candidates (plus
+    capsules within GEO_RADIUS_KM) are then scored exactly, so the engine
+    never reports a false link; it can only miss pairs whose signatures
+    never collide. A pair with Jaccard similarity s collides with
+    probability 1 - (1 - s^r)^b for b bands of r rows, so more bands lower
+    the similarity at which pairs are reliably found.
+    """
+
+    def __init__(self, capsules: List[CapsuleModel], index: GraphIndex,
+                 num_permutations: int = 128, bands: int = 64, seed: int = 1):
+        """
+        Compute signatures for every capsule
+
+        Args:
+            capsules: Capsules of the current run
+            index: Per-run index holding the interned token sets
+            num_permutations: MinHash signature length
+            bands: Number of LSH bands; must divide num_permutations
+            seed: Seed for the hash family, fixed for reproducible output
+        """
+        if num_permutations <= 0 or bands <= 0 or num_permutations % bands:
+            raise ValueError("bands must be positive and divide num_permutations")
+
+        self.capsules = capsules
+        self.index = index
+        self.num_permutations = num_permutations
+        self.bands = bands
+        self.rows = num_permutations // bands
+
+        rng = random.Random(seed)
+        self.hash_a = [rng.randrange(1, MERSENNE_PRIME) for _ in range(num_permutations)]
+        self.hash_b = [rng.randrange(0, MERSENNE_PRIME) for _ in range(num_permutations)]
+        if np is not None:
+            self._hash_a_column = np.array(self.hash_a, dtype=np.int64)[:, None]
+            self._hash_b_column = np.array(self.hash_b, dtype=np.int64)[:, None]
+        self.signatures = [self.signature(tokens) for tokens in index.tokens]
+
+    def signature(self, tokens) -> Tuple[int, ...]:
+        """
+        MinHash signature of a token id set
+
+        Args:
+            tokens: Interned token ids
+
+        Returns:
+            Tuple of num_permutations minimum hash values (empty for no tokens)
+        """
+        if not tokens:
+            return ()
+
+        if np is not None:
+            values = np.fromiter(tokens, dtype=np.int64, count=len(tokens))
+            hashes = (self._hash_a_column * values[None, :] + self._hash_b_column) % MERSENNE_PRIME
+            return tuple(hashes.min(axis=1).tolist())
+
+        return tuple(
+            min((a * x + b) % MERSENNE_PRIME for x in tokens)
+            for a, b in zip(self.hash_a, self.hash_b)
+        )
+
+    def candidate_pairs(self) -> Dict[int, Set[int]]:
+        """
+        Find capsules sharing at least one LSH band bucket
+
+        Returns:
+            Capsule position -> positions of its candidate partners
+        """
+        candidates: Dict[int, Set[int]] = {i: set() for i in range(len(self.capsules))}
+
+        for band in range(self.bands):
+            start = band * self.rows
+            buckets: Dict[Tuple[int, ...], List[int]] = {}
+            for i, signature in enumerate(self.signatures):
+                if signature:
+                    buckets.setdefault(signature[start:start + self.rows], []).append(i)
+
+            for members in buckets.values():
+                if len(members) < 2:
+                    continue
+                for i in members:
+                    candidates[i].update(members)
+
+        for i, partners in candidates.items():
+            partners.discard(i)
+
+        return candidates
+
+    def find_links(self, limits: Optional[List[Optional[int]]] = None
+                   ) -> Tuple[List[List[str]], List[List[Tuple[float, int]]]]:
+        """
+        Compute parent and related links for every capsule
+
+        Args:
+            limits: Related-link limit per capsule position (see
+                GraphBuilder.related_limits)
+
+        Returns:
+            Tuple of (parent IDs, related (score, position) pairs) per
+            capsule position
+        """
+        capsules = self.capsules
+        index = self.index
+        candidates = self.candidate_pairs()
+        parents: List[List[str]] = []
+        related: List[List[Tuple[float, int]]] = []
+
+        for i, capsule in enumerate(capsules):
+            capsule_parents = []
+            if capsule.type != 'product':
+                products = [j for j in sorted(candidates[i]) if capsules[j].type == 'product']
+                for j, similarity in zip(products, index.scores(i, products)):
+                    if similarity > GraphBuilder.PARENT_THRESHOLD:
+                        capsule_parents.append(capsules[j].id)
+            parents.append(capsule_parents)
+
+            edges = []
+            partners = sorted(candidates[i] | index.geo_candidates(i, GraphBuilder.GEO_RADIUS_KM))
+            for j, similarity in zip(partners, index.scores(i, partners)):
+                other = capsules[j]
+                geo_distance = GraphBuilder.calculate_geo_distance(
+                    capsule.geo.lat, capsule.geo.lng,
+                    other.geo.lat, other.geo.lng
+                )
+                score = GraphBuilder.combine_scores(similarity, geo_distance)
+                if score > GraphBuilder.RELATED_THRESHOLD:
+                    edges.append((score, j))
+            related.append(GraphBuilder.rank_related(
+                edges, limits[i] if limits else None, limits is not None
+            ))
+
+        logger.debug(f"MinHash candidates: {sum(map(len, candidates.values())) // 2} pairs")
+        return parents, related
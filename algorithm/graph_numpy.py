@@ -0,0 +1,171 @@
+"""
+Vectorized Graph Engine Module
+NumPy-backed relationship discovery using batched distance and similarity matrices
+"""
+
+import logging
+from typing import List, Optional, Tuple
+from models import CapsuleModel
+from graph import GraphBuilder
+from graph_index import EARTH_RADIUS_KM, GraphIndex, JaccardScorer
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+try:
+    from scipy import sparse
+except ImportError:  # pragma: no cover - depends on the environment
+    sparse = None
+
+logger = logging.getLogger(__name__)
+
+HAS_NUMPY = np is not None
+
+
+class NumpyGraphEngine:
+    """
+    Computes parent and related links with array operations
+
+    Pairwise haversine distances and Jaccard similarities are computed in
+    row blocks of BLOCK_SIZE capsules, and the GraphBuilder thresholds are
+    applied as boolean masks. Intersection counts come from the product of
+    the token-incidence matrix with its transpose (scipy.sparse when
+    available, a dense matrix over shared tokens otherwise). Other scorers
+    provide their own similarity_block.
+    """
+
+    BLOCK_SIZE = 1024
+
+    def __init__(self, capsules: List[CapsuleModel], index: GraphIndex):
+        """
+        Prepare coordinate and token-incidence arrays
+
+        Args:
+            capsules: Capsules of the current run
+            index: Per-run index holding the interned token sets
+        """
+        if not HAS_NUMPY:
+            raise ImportError("NumpyGraphEngine requires numpy")
+
+        self.capsules = capsules
+        self.scorer = index.scorer
+        self.ids = [c.id for c in capsules]
+        self.lat = np.radians(np.array([c.geo.lat for c in capsules], dtype=np.float64))
+        self.lng = np.radians(np.array([c.geo.lng for c in capsules], dtype=np.float64))
+        self.is_product = np.array([c.type == 'product' for c in capsules], dtype=bool)
+        self.sizes = np.array([len(tokens) for tokens in index.tokens], dtype=np.float64)
+        self.incidence = self._build_incidence(index)
+
+    @staticmethod
+    def _build_incidence(index: GraphIndex):
+        """
+        Build the capsule x token incidence matrix
+
+        Tokens found in a single capsule never contribute to an intersection,
+        so only tokens with two or more postings become columns.
+        """
+        shared = [token for token, postings in index.postings.items() if len(postings) > 1]
+        column = {token: j for j, token in enumerate(shared)}
+
+        rows, cols = [], []
+        for i, tokens in enumerate(index.tokens):
+            for token in tokens:
+                j = column.get(token)
+                if j is not None:
+                    rows.append(i)
+                    cols.append(j)
+
+        shape = (len(index.tokens), len(shared))
+        data = np.ones(len(rows), dtype=np.float32)
+        if sparse is not None:
+            return sparse.csr_matrix((data, (rows, cols)), shape=shape)
+
+        dense = np.zeros(shape, dtype=np.float32)
+        dense[rows, cols] = 1.0
+        return dense
+
+    def distance_block(self, start: int, stop: int):
+        """
+        Haversine distances from capsules [start, stop) to every capsule
+
+        Returns:
+            Array of shape (stop - start, n) in kilometers
+        """
+        lat1 = self.lat[start:stop, None]
+        lng1 = self.lng[start:stop, None]
+        half_dphi = (self.lat[None, :] - lat1) / 2
+        half_dlambda = (self.lng[None, :] - lng1) / 2
+
+        a = np.sin(half_dphi) ** 2 + np.cos(lat1) * np.cos(self.lat[None, :]) * np.sin(half_dlambda) ** 2
+        return 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(1.0, np.sqrt(a)))
+
+    def similarity_block(self, start: int, stop: int):
+        """
+        Text similarities from capsules [start, stop) to every capsule
+
+        Returns:
+            Array of shape (stop - start, n) with values between 0 and 1
+        """
+        if not isinstance(self.scorer, JaccardScorer):
+            return self.scorer.similarity_block(start, stop)
+
+        block = self.incidence[start:stop]
+        intersection = block @ self.incidence.T
+        if sparse is not None and sparse.issparse(intersection):
+            intersection = intersection.toarray()
+        intersection = np.asarray(intersection, dtype=np.float64)
+
+        union = self.sizes[start:stop, None] + self.sizes[None, :] - intersection
+        similarity = np.zeros_like(intersection)
+        np.divide(intersection, union, out=similarity, where=union > 0)
+
+        # Empty token sets have similarity 0 even with themselves
+        similarity[self.sizes[start:stop] == 0, :] = 0.0
+        similarity[:, self.sizes == 0] = 0.0
+        return similarity
+
+    def find_links(self, limits: Optional[List[Optional[int]]] = None
+                   ) -> Tuple[List[List[str]], List[List[Tuple[float, int]]]]:
+        """
+        Compute parent and related links for every capsule
+
+        Args:
+            limits: Related-link limit per capsule position (see
+                GraphBuilder.related_limits)
+
+        Returns:
+            Tuple of (parent IDs, related (score, position) pairs) per
+            capsule position
+        """
+        n = len(self.capsules)
+        parents: List[List[str]] = []
+        related: List[List[Tuple[float, int]]] = []
+
+        for start in range(0, n, self.BLOCK_SIZE):
+            stop = min(start + self.BLOCK_SIZE, n)
+            similarity = self.similarity_block(start, stop)
+            distance = self.distance_block(start, stop)
+
+            geo_score = 1 - np.minimum(distance / GraphBuilder.GEO_RADIUS_KM, 1)
+            combined = (similarity * GraphBuilder.SIMILARITY_WEIGHT) + (geo_score * GraphBuilder.GEO_WEIGHT)
+
+            related_mask = combined > GraphBuilder.RELATED_THRESHOLD
+            related_mask[np.arange(stop - start), np.arange(start, stop)] = False
+
+            parent_mask = (similarity > GraphBuilder.PARENT_THRESHOLD) & self.is_product[None, :]
+            parent_mask[self.is_product[start:stop], :] = False
+
+            for row in range(stop - start):
+                parents.append([self.ids[j] for j in np.flatnonzero(parent_mask[row])])
+
+                columns = np.flatnonzero(related_mask[row])
+                scores = combined[row, columns]
+                if limits is not None:
+                    # Descending score, ties broken by position
+                    order = np.lexsort((columns, -scores))[:limits[start + row]]
+                    columns, scores = columns[order], scores[order]
+                related.append(list(zip(scores.tolist(), columns.tolist())))
+
+        return parents, related
@@ -0,0 +1,75 @@
+"""
+Parallel Graph Building Module
+Shards relationship discovery across a process pool
+"""
+
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+from graph import GraphBuilder
+from graph_index import GraphIndex
+
+logger = logging.getLogger(__name__)
+
+# Per-process index and related limits, installed once by the pool initializer
+_worker_index: Optional[GraphIndex] = None
+_worker_limits: Optional[List[Optional[int]]] = None
+
+
+def _init_worker(index: GraphIndex, limits: Optional[List[Optional[int]]]) -> None:
+    """Install the shared per-run index in a worker process"""
+    global _worker_index, _worker_limits
+    _worker_index = index
+    _worker_limits = limits
+
+
+def _build_chunk(bounds: Tuple[int, int]) -> Tuple[List[List[str]], List[List[Tuple[float, int]]]]:
+    """Compute parent and related links for capsule positions [start, stop)"""
+    start, stop = bounds
+    parents = [GraphBuilder.indexed_parents(_worker_index, i) for i in range(start, stop)]
+    related = [
+        GraphBuilder.scored_related(
+            _worker_index, i, _worker_limits[i] if _worker_limits else None, _worker_limits is not None
+        )
+        for i in range(start, stop)
+    ]
+    return parents, related
+
+
+def find_links_parallel(index: GraphIndex, workers: Optional[int] = None,
+                        limits: Optional[List[Optional[int]]] = None,
+                        chunk_size: int = 256) -> Tuple[List[List[str]], List[List[Tuple[float, int]]]]:
+    """
+    Compute parent and related links for every capsule in a process pool
+
+    The index (tokens, postings, coordinates) is shipped to each worker once
+    through the pool initializer; tasks only carry position ranges. Results
+    are collected in submission order, so the output is identical to the
+    single-process build.
+
+    Args:
+        index: Per-run index of the capsules
+        workers: Number of worker processes (defaults to the CPU count)
+        limits: Related-link limit per capsule position (see
+            GraphBuilder.related_limits)
+        chunk_size: Capsule positions per task
+
+    Returns:
+        Tuple of (parent IDs, related (score, position) pairs) per capsule
+        position
+    """
+    workers = workers or os.cpu_count() or 1
+    n = len(index.ids)
+    chunks = [(start, min(start + chunk_size, n)) for start in range(0, n, chunk_size)]
+
+    parents: List[List[str]] = []
+    related: List[List[Tuple[float, int]]] = []
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(index, limits)) as pool:
+        for chunk_parents, chunk_related in pool.map(_build_chunk, chunks):
+            parents.extend(chunk_parents)
+            related.extend(chunk_related)
+
+    logger.debug(f"Parallel graph build: {len(chunks)} chunks on {workers} workers")
+    return parents, related
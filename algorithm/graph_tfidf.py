@@ -0,0 +1,136 @@
+"""
+TF-IDF Similarity Module
+Cosine similarity of TF-IDF weighted term vectors as a pluggable graph scorer
+"""
+
+import logging
+import math
+from collections import Counter
+from typing import Dict, List
+from graph_index import TOKEN_PATTERN, GraphIndex, SimilarityScorer, capsule_text
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+try:
+    from scipy import sparse
+except ImportError:  # pragma: no cover - depends on the environment
+    sparse = None
+
+logger = logging.getLogger(__name__)
+
+
+class TfidfScorer(SimilarityScorer):
+    """
+    Cosine similarity of TF-IDF vectors
+
+    Each capsule becomes an L2-normalized vector of sublinear term
+    frequency (1 + log count) times smoothed inverse document frequency
+    (1 + log((1 + n) / (1 + df))). Words found in most capsules, such as the
+    region name, get a low weight, so pairs are matched on the words that
+    set them apart. Vectors only cover the capsule's own tokens, so capsules
+    sharing no token still score exactly 0.
+
+    With scipy installed the run builds one sparse document-term matrix X,
+    and scores() reads a capsule's similarities to its candidates from its
+    cosine row X[i] @ X.T (see row()). Rows are computed per call and not
+    kept, so memory stays linear in the collection. Single pairs, and all
+    scores without scipy, are sparse dict dot products.
+    """
+
+    name = 'tfidf'
+
+    def fit(self, index: GraphIndex) -> None:
+        """
+        Weight every capsule's terms and build the document-term matrix
+
+        Args:
+            index: Index holding the capsules and their interned token sets
+        """
+        n = len(index.ids)
+        idf = {
+            token: 1 + math.log((1 + n) / (1 + len(postings)))
+            for token, postings in index.postings.items()
+        }
+
+        self.vectors: List[Dict[int, float]] = []
+        for capsule in index.capsules:
+            analysis = index.analyses.get(capsule.id)
+            if analysis is not None:
+                counts = analysis.term_counts
+            else:
+                counts = Counter(TOKEN_PATTERN.findall(capsule_text(capsule).lower()))
+            vector = {
+                index.vocabulary[word]: (1 + math.log(count)) * idf[index.vocabulary[word]]
+                for word, count in counts.items()
+            }
+            norm = math.sqrt(sum(w * w for w in vector.values()))
+            self.vectors.append({token: w / norm for token, w in vector.items()} if norm else {})
+
+        self.vocabulary_size = len(index.vocabulary)
+        self.matrix = None
+        self.transposed = None
+        if sparse is not None:
+            self.matrix = self._build_matrix()
+            # Row products against a CSR transpose skip a CSC conversion per row
+            self.transposed = self.matrix.T.tocsr()
+            logger.debug(f"TF-IDF matrix: {self.matrix.nnz} non-zero entries")
+
+    def _build_matrix(self):
+        """Document-term matrix of the normalized vectors (dense without scipy)"""
+        rows, cols, data = [], [], []
+        for i, vector in enumerate(self.vectors):
+            rows.extend([i] * len(vector))
+            cols.extend(vector.keys())
+            data.extend(vector.values())
+
+        shape = (len(self.vectors), self.vocabulary_size)
+        if sparse is not None:
+            return sparse.csr_matrix((data, (rows, cols)), shape=shape)
+
+        dense = np.zeros(shape)
+        dense[rows, cols] = data
+        return dense
+
+    def similarity(self, index1: int, index2: int) -> float:
+        vector1, vector2 = self.vectors[index1], self.vectors[index2]
+        if len(vector2) < len(vector1):
+            vector1, vector2 = vector2, vector1
+        return min(1.0, sum(w * vector2.get(token, 0.0) for token, w in vector1.items()))
+
+    def row(self, index: int):
+        """
+        Cosine similarities of one capsule to every capsule
+
+        Args:
+            index: Position of the capsule
+
+        Returns:
+            Array of n similarities (requires scipy)
+        """
+        return (self.matrix[index] @ self.transposed).toarray().ravel()
+
+    def scores(self, index: int, candidates: List[int]) -> List[float]:
+        if self.transposed is None or not candidates:
+            return super().scores(index, candidates)
+        row = self.row(index)
+        return [min(1.0, float(row[other])) for other in candidates]
+
+    def similarity_block(self, start: int, stop: int):
+        """
+        Similarities from capsules [start, stop) to every capsule
+
+        Used by the numpy graph engine in place of its Jaccard matrices.
+
+        Returns:
+            Array of shape (stop - start, n) with values between 0 and 1
+        """
+        if self.matrix is None:
+            self.matrix = self._build_matrix()
+
+        block = self.matrix[start:stop] @ self.matrix.T
+        if sparse is not None and sparse.issparse(block):
+            block = block.toarray()
+        return np.minimum(np.asarray(block, dtype=np.float64), 1.0)
@@ -1,41 +1,572 @@
 """
 Data Ingestion Module
-Fetches live data from ApsnyTravel.ru and handles data validation
+Fetches live data from ApsnyTravel.ru (or a local snapshot) and handles data validation
 """
 
+import codecs
+import gzip
+import hashlib
+import itertools
 import json
+import mmap
+import os
+import uuid
+import zlib
 import requests
-from typing import Dict, Any, Optional
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+from urllib.request import url2pathname
 from datetime import datetime
 import logging
 
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - depends on the environment
+    zstandard = None
+
 logger = logging.getLogger(__name__)
 
+HAS_ZSTD = zstandard is not None
+
+# Leading bytes of compressed bodies; compression is detected from these,
+# whatever the file name or Content-Encoding says
+GZIP_MAGIC = b'\x1f\x8b'
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+# Content codings offered to the source; urllib3 only decodes zstd with
+# its own optional dependency, so undecoded zstd bodies are handled here
+ACCEPT_ENCODING = requests.utils.DEFAULT_ACCEPT_ENCODING
+if HAS_ZSTD and 'zstd' not in ACCEPT_ENCODING:
+    ACCEPT_ENCODING += ', zstd'
+
+# Characters that may continue a JSON number
+NUMBER_CHARS = frozenset('0123456789+-.eE')
+
+# File names read from a snapshot directory
+SNAPSHOT_SUFFIXES = ('.json', '.json.gz', '.json.zst')
+
 
 class DataIngestionError(Exception):
     """Custom exception for data ingestion errors"""
-    pass
+
+    def __init__(self, message: str, retryable: bool = False):
+        """
+        Args:
+            message: Error description
+            retryable: Whether the same request may succeed later (timeouts,
+                connection errors, HTTP 429 and 5xx)
+        """
+        super().__init__(message)
+        self.retryable = retryable
+
+
+class CapsuleStream:
+    """
+    Incremental parser for the capsules array of a capsules.json byte stream
+
+    Iterating yields one capsule dict at a time while reading the stream in
+    chunks. Only the unparsed tail of the text is buffered, so peak memory
+    is about one chunk plus the largest single capsule (its text and its
+    dict), independent of the feed size. Other top-level keys are kept in
+    metadata. The checks of DataIngestor.validate_raw_data and the counts
+    of get_data_stats are computed on the fly.
+    """
+
+    def __init__(self, chunks: Iterable[Any], key: str = 'capsules', shards: bool = False):
+        """
+        Initialize the stream
+
+        Args:
+            chunks: Raw body chunks (e.g. response.iter_content()), or with
+                shards an iterable of such chunk iterables
+            key: Top-level key holding the capsule array
+            shards: Parse each chunk iterable as its own document (e.g. the
+                shards of a snapshot directory) and yield the capsules of all
+                of them. Every document must hold exactly one JSON object;
+                data after it is an error, as with json.loads
+        """
+        self.key = key
+        self.metadata: Dict[str, Any] = {}
+        self.count = 0
+        self.types: Dict[str, int] = {}
+        self.regions: Dict[str, int] = {}
+        self.content_hash: Optional[str] = None
+        self._documents = iter(chunks) if shards else iter([chunks])
+        self._chunks: Iterator[bytes] = iter(())
+        self._json = json.JSONDecoder()
+        self._hash = hashlib.sha256()
+        self._start(())
+
+    def _start(self, chunks: Iterable[bytes]) -> None:
+        """Begin parsing a new document read from chunks"""
+        self._chunks = iter(chunks)
+        # A leading UTF-8 BOM is dropped, as json.loads does for bytes
+        self._text = codecs.getincrementaldecoder('utf-8-sig')()
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        """Append the next chunk to the buffer, dropping parsed text; False at the end"""
+        while not self._eof:
+            try:
+                chunk = next(self._chunks, None)
+                if chunk is None:
+                    self._eof = True
+                    text = self._text.decode(b'', final=True)
+                else:
+                    self._hash.update(chunk)
+                    text = self._text.decode(chunk)
+            except requests.exceptions.RequestException as e:
+                raise DataIngestionError(f"Connection error: {str(e)}", retryable=True)
+            except UnicodeDecodeError as e:
+                raise DataIngestionError(f"Failed to parse JSON response: {str(e)}")
+            except OSError as e:
+                raise DataIngestionError(f"Failed to read data: {str(e)}")
+
+            if text:
+                self._buffer = self._buffer[self._pos:] + text
+                self._pos = 0
+                return True
+        return False
+
+    def _peek(self) -> Optional[str]:
+        """Next non-whitespace character, or None at the end of the stream"""
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in ' \t\n\r':
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return None
+
+    def _value(self) -> Any:
+        """Decode the JSON value at the current position, reading more as needed"""
+        self._peek()
+        while True:
+            try:
+                value, end = self._json.raw_decode(self._buffer, self._pos)
+                # A number ending at the end of the buffer, or where the buffer
+                # ends in a partial fraction or exponent ("1." or "1e"), may
+                # continue in the next chunk
+                if self._eof or (end < len(self._buffer) and self._buffer[end] not in NUMBER_CHARS):
+                    self._pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise DataIngestionError("Failed to parse JSON response")
+            self._fill()
+
+    def _separator(self, closing: str) -> bool:
+        """Consume ',' (True) or the closing bracket (False)"""
+        char = self._peek()
+        if char not in (',', closing):
+            raise DataIngestionError("Failed to parse JSON response")
+        self._pos += 1
+        return char == ','
+
+    def _record(self, capsule: Any) -> None:
+        """Update the running statistics with one capsule"""
+        self.count += 1
+        if isinstance(capsule, dict):
+            ctype = capsule.get('type', 'unknown')
+            self.types[ctype] = self.types.get(ctype, 0) + 1
+            region = capsule.get('geo', {}).get('region', 'unknown')
+            self.regions[region] = self.regions.get(region, 0) + 1
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for chunks in self._documents:
+            self._start(chunks)
+            yield from self._document()
+            # Peeking reads to the end of the document, so content_hash
+            # covers the whole body
+            if self._peek() is not None:
+                raise DataIngestionError("Failed to parse JSON response: extra data after the document")
+        self.content_hash = self._hash.hexdigest()
+
+        if self.count == 0:
+            raise DataIngestionError("No capsules found in data")
+
+        logger.info(f"Raw data validation passed: {self.count} capsules found")
+
+    def _document(self) -> Iterator[Dict[str, Any]]:
+        """Yield the capsules of the document at the current position"""
+        if self._peek() != '{':
+            raise DataIngestionError("Data must be a dictionary")
+        self._pos += 1
+
+        found = False
+        if self._peek() == '}':
+            self._pos += 1
+        else:
+            while True:
+                key = self._value()
+                if self._peek() != ':':
+                    raise DataIngestionError("Failed to parse JSON response")
+                self._pos += 1
+
+                if key == self.key and not found:
+                    found = True
+                    if self._peek() != '[':
+                        raise DataIngestionError(f"'{self.key}' must be a list")
+                    self._pos += 1
+
+                    if self._peek() == ']':
+                        self._pos += 1
+                    else:
+                        while True:
+                            capsule = self._value()
+                            self._record(capsule)
+                            yield capsule
+                            if not self._separator(']'):
+                                break
+                else:
+                    self.metadata.setdefault(key, self._value())
+
+                if not self._separator('}'):
+                    break
+
+        if not found:
+            raise DataIngestionError(f"Data must contain '{self.key}' key")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Statistics of the capsules read so far (see DataIngestor.get_data_stats)
+
+        Returns:
+            Dictionary containing statistics
+        """
+        return {
+            'total_capsules': self.count,
+            'types': self.types,
+            'regions': self.regions,
+            'timestamp': datetime.now().isoformat()
+        }
+
+    def close(self) -> None:
+        """Release the underlying stream"""
+        for source in (self._chunks, self._documents):
+            close = getattr(source, 'close', None)
+            if close is not None:
+                close()
 
 
 class DataIngestor:
-    """Handles fetching and initial validation of data from ApsnyTravel.ru"""
+    """
+    Handles fetching and initial validation of data from ApsnyTravel.ru
+
+    Besides HTTP(S) URLs, the source may be a file:// URL or a plain path to
+    a local snapshot: one capsules.json file, or a directory of sharded
+    *.json files, each a capsules.json document, whose capsule arrays are
+    concatenated in file name order. Local files are read through mmap.
+    Gzip and zstd compressed bodies and snapshot files (.json.gz,
+    .json.zst) are decompressed transparently.
+    """
 
-    def __init__(self, source_url: str = "https://apsnytravel.ru/capsules.json", timeout: int = 30):
+    # zstd level of the raw snapshots written with snapshot_dir
+    SNAPSHOT_LEVEL = 10
+
+    # Bytes read per chunk by fetch_live_data
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, source_url: str = "https://apsnytravel.ru/capsules.json", timeout: int = 30,
+                 cache_dir: Optional[str] = None, session: Optional[requests.Session] = None,
+                 snapshot_dir: Optional[str] = None):
         """
         Initialize the data ingestor
 
         Args:
             source_url: The URL to fetch capsules.json from
             timeout: Request timeout in seconds
+            cache_dir: Directory for the feed cache; when set, the last body
+                and its ETag/Last-Modified are stored there and requests are
+                made conditional
+            session: Shared session to send requests through; it is left
+                open by close()
+            snapshot_dir: Directory receiving a zstd-compressed copy of every
+                feed body fetched over HTTP (gzip without zstandard)
         """
         self.source_url = source_url
+        self.local_path = self._local_path(source_url)
         self.timeout = timeout
-        self.session = requests.Session()
+        self.owns_session = session is None
+        self.session = session or requests.Session()
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.snapshot_dir = Path(snapshot_dir) if snapshot_dir else None
+        self.not_modified = False
+        self.content_hash: Optional[str] = None
+
+    @staticmethod
+    def _local_path(source_url: str) -> Optional[Path]:
+        """Filesystem path of a file:// URL or plain path, None for HTTP(S)"""
+        parsed = urlparse(source_url)
+        if parsed.scheme == 'file':
+            return Path(url2pathname(parsed.path))
+        if parsed.scheme in ('http', 'https'):
+            return None
+        return Path(source_url)
+
+    def _local_files(self) -> List[Path]:
+        """The snapshot file, or the shards of a snapshot directory in name order"""
+        if self.local_path.is_dir():
+            files = sorted(p for p in self.local_path.iterdir() if p.name.endswith(SNAPSHOT_SUFFIXES))
+            if not files:
+                raise DataIngestionError(f"No JSON shards found in {self.local_path}")
+            return files
+        if not self.local_path.is_file():
+            raise DataIngestionError(f"Snapshot not found: {self.local_path}")
+        return [self.local_path]
+
+    @staticmethod
+    @contextmanager
+    def _mapped(path: Path):
+        """Read-only memory map of a file (an empty buffer for an empty file)"""
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                yield b''
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                if hasattr(mapped, 'madvise'):
+                    mapped.madvise(mmap.MADV_SEQUENTIAL)
+                yield mapped
+
+    @staticmethod
+    def _file_state(files: List[Path]) -> List[List[Any]]:
+        """Name, size and modification time of each snapshot file"""
+        return [[str(path), stat.st_size, stat.st_mtime_ns] for path, stat in ((p, p.stat()) for p in files)]
+
+    def _load_local_meta(self) -> Dict[str, Any]:
+        """File state and SHA-256 of the snapshot as last read"""
+        if not self.cache_dir:
+            return {}
+        try:
+            with open(self._cache_paths()[1], 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _store_local_meta(self, files: List[Path], content_hash: str) -> None:
+        """Record the file state and SHA-256 of the snapshot just read"""
+        if not self.cache_dir:
+            return
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        with open(self._cache_paths()[1], 'w', encoding='utf-8') as f:
+            json.dump({'files': self._file_state(files), 'sha256': content_hash}, f)
+
+    def _fetch_local(self) -> Dict[str, Any]:
+        """
+        Load a local snapshot
+
+        The files are parsed through a CapsuleStream over their memory maps
+        (see stream_live_data), so the raw bytes are never copied into the
+        heap and both modes accept the same snapshots. Each shard is parsed
+        as its own document. content_hash covers the decompressed JSON.
+        Shards after the first contribute their capsules; their other
+        top-level keys only fill in keys the earlier shards lack.
+        not_modified is set when the content hash matches the one recorded
+        by the previous read.
+        """
+        files = self._local_files()
+        stream = CapsuleStream(self._read_local(files, self.CHUNK_SIZE, store=False), shards=True)
+        capsules = list(stream)
+
+        self.content_hash = stream.content_hash
+        self.not_modified = self._load_local_meta().get('sha256') == self.content_hash
+        self._store_local_meta(files, self.content_hash)
+        return {**stream.metadata, 'capsules': capsules}
+
+    def _read_file(self, path: Path, chunk_size: int) -> Iterator[bytes]:
+        """Chunks of a file as views into its memory map"""
+        with self._mapped(path) as buffer:
+            view = memoryview(buffer)
+            try:
+                for start in range(0, len(view), chunk_size):
+                    # Released before the map is closed
+                    with view[start:start + chunk_size] as chunk:
+                        yield chunk
+            finally:
+                view.release()
+
+    def _read_local(self, files: List[Path], chunk_size: int, store: bool) -> Iterator[Iterator[bytes]]:
+        """Decompressed chunks of the snapshot files, one chunk iterator per file"""
+        digest = hashlib.sha256() if store else None
+
+        def read(path: Path) -> Iterator[bytes]:
+            size = 0
+            for chunk in self._decompress(self._read_file(path, chunk_size)):
+                size += len(chunk)
+                if digest is not None:
+                    digest.update(chunk)
+                yield chunk
+            # An empty shard is more likely a failed write than an empty feed
+            if size == 0:
+                raise DataIngestionError(f"Shard {path.name} is empty")
+
+        for path in files:
+            yield read(path)
+
+        if store:
+            self._store_local_meta(files, digest.hexdigest())
+
+    @staticmethod
+    def _decompress(chunks: Iterable[bytes]) -> Iterator[bytes]:
+        """
+        Decompress a gzip or zstd body chunk by chunk
+
+        The codec is detected from the leading bytes; other data is passed
+        through unchanged. Concatenated gzip members and zstd frames are
+        all decoded.
+
+        Args:
+            chunks: Body chunks
+
+        Returns:
+            Iterator over the decompressed chunks
+
+        Raises:
+            DataIngestionError: If the body is zstd and zstandard is not
+                installed, or it is corrupt
+        """
+        chunks = iter(chunks)
+        pending, size = [], 0
+        for chunk in chunks:
+            size += len(chunk)
+            # Chunks shorter than the magic number are copied, their buffer
+            # may be released before they are used
+            pending.append(chunk if size >= len(ZSTD_MAGIC) else bytes(chunk))
+            if size >= len(ZSTD_MAGIC):
+                break
+        head = b''.join(bytes(c[:len(ZSTD_MAGIC)]) for c in pending)
+
+        if head.startswith(ZSTD_MAGIC):
+            if zstandard is None:
+                raise DataIngestionError("zstandard is required to read zstd-compressed data")
+            new_decoder = lambda: zstandard.ZstdDecompressor().decompressobj()
+        elif head.startswith(GZIP_MAGIC):
+            new_decoder = lambda: zlib.decompressobj(zlib.MAX_WBITS | 16)
+        else:
+            yield from pending
+            yield from chunks
+            return
+
+        decoder = new_decoder()
+        try:
+            for chunk in itertools.chain(pending, chunks):
+                while chunk:
+                    # Data after the end of a member/frame starts the next one
+                    if decoder.eof:
+                        decoder = new_decoder()
+                    data = decoder.decompress(chunk)
+                    if data:
+                        yield data
+                    chunk = decoder.unused_data if decoder.eof else b''
+        except (zlib.error, getattr(zstandard, 'ZstdError', zlib.error)) as e:
+            raise DataIngestionError(f"Failed to decompress data: {str(e)}")
+
+        if not decoder.eof:
+            raise DataIngestionError("Failed to decompress data: truncated body")
+
+    def _open_snapshot(self) -> Tuple[Path, Path, Any]:
+        """
+        Open a new raw snapshot for writing
+
+        The name carries the fetch time, the source and a random suffix, so
+        two fetches within the same second never overwrite each other.
+
+        Returns:
+            Tuple of (temporary path, final path, compressed writer)
+        """
+        name = f"{datetime.now().strftime('%Y%m%dT%H%M%S')}-{self._source_key()}-{uuid.uuid4().hex[:8]}"
+        self.snapshot_dir.mkdir(parents=True, exist_ok=True)
+        if zstandard is not None:
+            path = self.snapshot_dir / f"{name}.json.zst"
+            temp_path = path.with_name(path.name + '.tmp')
+            writer = zstandard.ZstdCompressor(level=self.SNAPSHOT_LEVEL).stream_writer(open(temp_path, 'wb'))
+        else:
+            logger.warning("zstandard is not installed, writing a gzip snapshot")
+            path = self.snapshot_dir / f"{name}.json.gz"
+            temp_path = path.with_name(path.name + '.tmp')
+            writer = gzip.open(temp_path, 'wb')
+        return temp_path, path, writer
+
+    def _source_key(self) -> str:
+        """Short hash identifying the source URL in file names"""
+        return hashlib.sha256(self.source_url.encode('utf-8')).hexdigest()[:16]
+
+    def _cache_paths(self):
+        """Body and validator files of the feed cache for this source URL"""
+        name = self._source_key()
+        return self.cache_dir / f"{name}.json", self.cache_dir / f"{name}.meta.json"
+
+    def _load_validators(self) -> Dict[str, str]:
+        """ETag/Last-Modified of the cached body, if the body is present"""
+        body_path, meta_path = self._cache_paths()
+        if not body_path.exists() or not meta_path.exists():
+            return {}
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def _response_validators(response: requests.Response) -> Dict[str, str]:
+        """ETag/Last-Modified headers of a response"""
+        return {
+            key: response.headers[header]
+            for key, header in (('etag', 'ETag'), ('last_modified', 'Last-Modified'))
+            if header in response.headers
+        }
+
+    def load_cached_data(self) -> Optional[Dict[str, Any]]:
+        """
+        Load the last good body of the source from the feed cache
+
+        Sets content_hash to the SHA-256 of the cached body.
+
+        Returns:
+            Dictionary containing the cached data, or None without a cached
+            copy
+        """
+        if not self.cache_dir:
+            return None
+        try:
+            body = self._cache_paths()[0].read_bytes()
+            data = json.loads(body)
+        except (OSError, ValueError):
+            return None
+
+        self.content_hash = hashlib.sha256(body).hexdigest()
+        return data
+
+    def _conditional_get(self, stream: bool = False) -> Tuple[requests.Response, Dict[str, str]]:
+        """
+        GET the source, conditional on the cached copy when there is one
+
+        Returns:
+            Tuple of (response, validators of the cached copy)
+        """
+        headers = {'Accept-Encoding': ACCEPT_ENCODING}
+        validators = self._load_validators() if self.cache_dir else {}
+        if 'etag' in validators:
+            headers['If-None-Match'] = validators['etag']
+        if 'last_modified' in validators:
+            headers['If-Modified-Since'] = validators['last_modified']
+
+        response = self.session.get(self.source_url, timeout=self.timeout, headers=headers, stream=stream)
+        return response, validators
 
     def fetch_live_data(self) -> Dict[str, Any]:
         """
         Fetch live capsules.json from ApsnyTravel.ru
 
+        With a cache directory, the request carries If-None-Match and
+        If-Modified-Since from the cached copy. A 304 response returns the
+        cached body and sets not_modified. content_hash is set to the
+        SHA-256 of the body either way.
+
         Returns:
             Dictionary containing the fetched data
 
@@ -44,24 +575,162 @@ class DataIngestor:
         """
         try:
             logger.info(f"Fetching data from {self.source_url}...")
-            response = self.session.get(self.source_url, timeout=self.timeout)
-            response.raise_for_status()
-
-            data = response.json()
+            if self.local_path is not None:
+                data = self._fetch_local()
+                logger.info(f"Successfully loaded {len(data.get('capsules', []))} capsules")
+                return data
+
+            response, validators = self._conditional_get(stream=True)
+
+            if response.status_code == 304 and validators:
+                response.close()
+                body = self._cache_paths()[0].read_bytes()
+                self.not_modified = True
+                logger.info("Source not modified, using cached copy")
+            else:
+                response.raise_for_status()
+                # The compressed body is never held whole: it is decompressed
+                # chunk by chunk into the cache and snapshot as it arrives
+                body = b''.join(self._read_response(response, self.CHUNK_SIZE, close_session=False))
+                self.not_modified = False
+
+            self.content_hash = hashlib.sha256(body).hexdigest()
+            data = json.loads(body)
             logger.info(f"Successfully fetched {len(data.get('capsules', []))} capsules")
             return data
 
         except requests.exceptions.Timeout:
-            raise DataIngestionError(f"Request timeout after {self.timeout} seconds")
+            raise DataIngestionError(f"Request timeout after {self.timeout} seconds", retryable=True)
         except requests.exceptions.ConnectionError as e:
-            raise DataIngestionError(f"Connection error: {str(e)}")
+            raise DataIngestionError(f"Connection error: {str(e)}", retryable=True)
         except requests.exceptions.HTTPError as e:
-            raise DataIngestionError(f"HTTP error: {response.status_code} - {str(e)}")
-        except json.JSONDecodeError:
+            raise DataIngestionError(f"HTTP error: {response.status_code} - {str(e)}",
+                                     retryable=response.status_code == 429 or response.status_code >= 500)
+        except (json.JSONDecodeError, UnicodeDecodeError):
             raise DataIngestionError("Failed to parse JSON response")
+        except DataIngestionError:
+            raise
+        except OSError as e:
+            raise DataIngestionError(f"Failed to read data: {str(e)}")
         except Exception as e:
             raise DataIngestionError(f"Unexpected error during data ingestion: {str(e)}")
 
+    def stream_live_data(self, chunk_size: int = 64 * 1024) -> CapsuleStream:
+        """
+        Open the source as a stream of capsule dicts
+
+        The body is parsed incrementally (see CapsuleStream) instead of
+        being loaded whole. With a cache directory the request is
+        conditional like fetch_live_data: a 304 streams the cached copy
+        from disk, and a fresh body is copied to the cache while it is
+        parsed. The session is closed once the stream is exhausted or
+        closed. A local snapshot is streamed from its memory maps; it counts
+        as not modified when the size and modification time of every file
+        match the previous read.
+
+        Args:
+            chunk_size: Bytes read from the response per chunk
+
+        Returns:
+            CapsuleStream over the source
+
+        Raises:
+            DataIngestionError: If the request fails
+        """
+        try:
+            logger.info(f"Streaming data from {self.source_url}...")
+            if self.local_path is not None:
+                files = self._local_files()
+                meta = self._load_local_meta()
+                self.not_modified = meta.get('files') == self._file_state(files)
+                self.content_hash = meta.get('sha256') if self.not_modified else None
+                return CapsuleStream(self._read_local(files, chunk_size, store=not self.not_modified),
+                                     shards=True)
+
+            response, validators = self._conditional_get(stream=True)
+
+            if response.status_code == 304 and validators:
+                response.close()
+                self.not_modified = True
+                self.content_hash = validators.get('sha256')
+                logger.info("Source not modified, streaming cached copy")
+                chunks = self._read_cached(chunk_size)
+            else:
+                response.raise_for_status()
+                self.not_modified = False
+                chunks = self._read_response(response, chunk_size)
+
+            return CapsuleStream(chunks)
+
+        except requests.exceptions.Timeout:
+            raise DataIngestionError(f"Request timeout after {self.timeout} seconds", retryable=True)
+        except requests.exceptions.ConnectionError as e:
+            raise DataIngestionError(f"Connection error: {str(e)}", retryable=True)
+        except requests.exceptions.HTTPError as e:
+            raise DataIngestionError(f"HTTP error: {response.status_code} - {str(e)}",
+                                     retryable=response.status_code == 429 or response.status_code >= 500)
+
+    def _read_cached(self, chunk_size: int) -> Iterator[bytes]:
+        """Chunks of the cached body"""
+        try:
+            with open(self._cache_paths()[0], 'rb') as f:
+                while True:
+                    chunk = f.read(chunk_size)
+                    if not chunk:
+                        break
+                    yield chunk
+        finally:
+            self.close()
+
+    def _read_response(self, response: requests.Response, chunk_size: int,
+                       close_session: bool = True) -> Iterator[bytes]:
+        """
+        Decompressed chunks of a fresh body, copied to the cache when it has
+        validators and to a raw snapshot when snapshot_dir is set. The
+        session is closed afterwards unless close_session is False.
+        """
+        validators = self._response_validators(response) if self.cache_dir else {}
+        copy = snapshot = None
+
+        try:
+            if validators:
+                body_path, meta_path = self._cache_paths()
+                temp_path = body_path.with_suffix('.tmp')
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                copy = open(temp_path, 'wb')
+                digest = hashlib.sha256()
+            if self.snapshot_dir:
+                snapshot_temp_path, snapshot_path, snapshot = self._open_snapshot()
+
+            for chunk in self._decompress(response.iter_content(chunk_size)):
+                if copy is not None:
+                    digest.update(chunk)
+                    copy.write(chunk)
+                if snapshot is not None:
+                    snapshot.write(chunk)
+                yield chunk
+
+            # Only a complete body replaces the cached copy or becomes a snapshot
+            if copy is not None:
+                copy.close()
+                temp_path.replace(body_path)
+                validators['sha256'] = self.content_hash = digest.hexdigest()
+                with open(meta_path, 'w', encoding='utf-8') as f:
+                    json.dump(validators, f)
+            if snapshot is not None:
+                snapshot.close()
+                snapshot_temp_path.replace(snapshot_path)
+                logger.info(f"Raw snapshot saved to {snapshot_path}")
+        finally:
+            if copy is not None:
+                copy.close()
+            if snapshot is not None:
+                snapshot.close()
+                snapshot_temp_path.unlink(missing_ok=True)
+            response.close()
+            if close_session:
+                self.close()
+
     def validate_raw_data(self, data: Dict[str, Any]) -> bool:
         """
         Perform basic validation on the fetched data
@@ -120,8 +789,9 @@ class DataIngestor:
         }
 
     def close(self):
-        """Close the session"""
-        self.session.close()
+        """Close the session, unless it is shared"""
+        if self.owns_session:
+            self.session.close()
 
 
 def ingest_data(source_url: str = "https://apsnytravel.ru/capsules.json") -> Dict[str, Any]:
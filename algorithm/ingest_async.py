@@ -0,0 +1,231 @@
+"""
+Multi-Source Ingestion Module
+Fetches several capsule feeds concurrently and merges them into one raw collection
+"""
+
+import asyncio
+import hashlib
+import logging
+import random
+from typing import Any, Dict, List, Optional, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from ingest import DataIngestor, DataIngestionError
+
+logger = logging.getLogger(__name__)
+
+
+class FeedSource:
+    """A capsule feed to ingest"""
+
+    def __init__(self, url: str, name: Optional[str] = None, timeout: int = 30):
+        """
+        Args:
+            url: URL of the feed's capsules.json
+            name: Source name recorded in each capsule's metadata.source
+                (defaults to the URL)
+            timeout: Request timeout in seconds for this source
+        """
+        self.url = url
+        self.name = name or url
+        self.timeout = timeout
+
+
+class AsyncIngestor:
+    """
+    Ingests several feeds concurrently
+
+    Feeds are fetched by DataIngestor instances that share one
+    connection-pooled requests session, so the conditional feed cache and
+    the error handling of single-source ingestion apply to every source.
+    The blocking requests run in worker threads driven by asyncio. A
+    semaphore caps how many run at once, and retryable failures (timeouts,
+    connection errors, HTTP 429/5xx) are retried with jittered exponential
+    backoff. A source that still fails contributes its last good body from
+    the feed cache; without one, the whole ingestion fails, so a partial
+    collection is never published.
+    """
+
+    # How to resolve a capsule ID present in more than one source:
+    # first/last source in the configured order wins, the most recently
+    # updated capsule wins (metadata.updated, ties go to the earlier
+    # source), or fail the ingestion
+    CONFLICT_RULES = ('first', 'last', 'newest', 'error')
+
+    def __init__(self, sources: List[Union[str, FeedSource]], max_concurrency: int = 4,
+                 retries: int = 3, backoff: float = 0.5, max_backoff: float = 10.0,
+                 conflict: str = 'first', cache_dir: Optional[str] = None,
+                 snapshot_dir: Optional[str] = None):
+        """
+        Initialize the ingestor
+
+        Args:
+            sources: Feed URLs or FeedSource objects, in priority order
+            max_concurrency: Maximum number of feeds fetched at once
+            retries: Retries per source after the first attempt
+            backoff: Base delay in seconds; retry n waits a random time
+                between 0 and min(max_backoff, backoff * 2**n)
+            max_backoff: Upper bound of a single retry delay
+            conflict: Rule for duplicate capsule IDs (see CONFLICT_RULES)
+            cache_dir: Feed cache directory for conditional requests
+            snapshot_dir: Directory receiving a compressed copy of every body
+        """
+        if conflict not in self.CONFLICT_RULES:
+            raise ValueError(f"Unknown conflict rule: {conflict}")
+
+        self.sources = [s if isinstance(s, FeedSource) else FeedSource(s) for s in sources]
+        names = [s.name for s in self.sources]
+        duplicates = sorted({name for name in names if names.count(name) > 1})
+        if duplicates:
+            raise ValueError(f"Duplicate source names: {', '.join(duplicates)}")
+        self.max_concurrency = max_concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.conflict = conflict
+        self.cache_dir = cache_dir
+        self.snapshot_dir = snapshot_dir
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_concurrency, pool_maxsize=max_concurrency)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self.results: List[Dict[str, Any]] = []
+
+    async def _fetch_source(self, source: FeedSource, semaphore: asyncio.Semaphore) -> Dict[str, Any]:
+        """Fetch one source with retries, returning its data or error"""
+        ingestor = DataIngestor(source.url, timeout=source.timeout, cache_dir=self.cache_dir,
+                                session=self.session, snapshot_dir=self.snapshot_dir)
+        result = {'name': source.name, 'url': source.url, 'data': None, 'error': None,
+                  'not_modified': False, 'stale': False, 'content_hash': None, 'attempts': 0}
+
+        for attempt in range(self.retries + 1):
+            result['attempts'] = attempt + 1
+            try:
+                async with semaphore:
+                    data = await asyncio.to_thread(ingestor.fetch_live_data)
+                ingestor.validate_raw_data(data)
+                result.update(data=data, error=None, not_modified=ingestor.not_modified,
+                              content_hash=ingestor.content_hash)
+                return result
+
+            except DataIngestionError as e:
+                result['error'] = str(e)
+                if not e.retryable or attempt == self.retries:
+                    break
+                delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+                logger.warning(f"Fetching {source.name} failed ({str(e)}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+        cached = ingestor.load_cached_data()
+        if cached is not None:
+            try:
+                ingestor.validate_raw_data(cached)
+                result.update(data=cached, stale=True, content_hash=ingestor.content_hash)
+                logger.warning(f"Source {source.name} failed ({result['error']}), using its last good copy")
+                return result
+            except DataIngestionError:
+                pass
+
+        logger.error(f"✗ Source {source.name} failed: {result['error']}")
+        return result
+
+    async def fetch_all(self) -> Dict[str, Any]:
+        """
+        Fetch every source concurrently and merge the results
+
+        Returns:
+            Raw collection with the merged 'capsules' list and one summary
+            per source under 'sources'
+
+        Raises:
+            DataIngestionError: If a source failed without a cached copy, or
+                on an ID conflict with the 'error' rule
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.results = await asyncio.gather(*(self._fetch_source(s, semaphore) for s in self.sources))
+        return self.merge(self.results)
+
+    def fetch(self) -> Dict[str, Any]:
+        """Synchronous wrapper around fetch_all()"""
+        return asyncio.run(self.fetch_all())
+
+    def merge(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Merge per-source results into one raw collection
+
+        Each capsule's metadata.source is set to the name of its source.
+        Capsules keep the order of their source and of the source list.
+        Sources served from their cached copy are marked 'stale'.
+
+        Args:
+            results: Per-source results in source order
+
+        Returns:
+            Raw collection dictionary
+
+        Raises:
+            DataIngestionError: If a source has no data, or on an ID conflict
+                with the 'error' rule
+        """
+        failed = [r for r in results if r['data'] is None]
+        if failed:
+            raise DataIngestionError(
+                "Sources failed without a cached copy: " +
+                ', '.join(f"{r['name']} ({r['error']})" for r in failed)
+            )
+
+        merged: Dict[str, Dict[str, Any]] = {}
+        conflicts = 0
+        for result in results:
+            for capsule in result['data']['capsules']:
+                capsule = dict(capsule)
+                capsule['metadata'] = {**(capsule.get('metadata') or {}), 'source': result['name']}
+
+                capsule_id = capsule.get('id')
+                previous = merged.get(capsule_id)
+                if previous is None:
+                    merged[capsule_id] = capsule
+                    continue
+
+                conflicts += 1
+                if self.conflict == 'error':
+                    raise DataIngestionError(
+                        f"Capsule {capsule_id} found in {previous['metadata']['source']} and {result['name']}"
+                    )
+                if self.conflict == 'last' or (
+                        self.conflict == 'newest' and
+                        str(capsule['metadata'].get('updated', '')) > str(previous['metadata'].get('updated', ''))):
+                    # Replace the earlier capsule in place
+                    merged[capsule_id] = capsule
+
+        if conflicts:
+            logger.info(f"Resolved {conflicts} duplicate capsule IDs ({self.conflict} wins)")
+
+        return {
+            'capsules': list(merged.values()),
+            'sources': [
+                {key: r[key] for key in ('name', 'url', 'error', 'not_modified', 'stale', 'attempts')} |
+                {'capsules': len(r['data']['capsules'])}
+                for r in results
+            ],
+        }
+
+    @property
+    def not_modified(self) -> bool:
+        """True if every source answered 304 Not Modified"""
+        return bool(self.results) and all(r['not_modified'] for r in self.results)
+
+    @property
+    def content_hash(self) -> Optional[str]:
+        """Combined hash of every source body, None if a source failed"""
+        if not self.results or any(r['content_hash'] is None for r in self.results):
+            return None
+        return hashlib.sha256(''.join(r['content_hash'] for r in self.results).encode('utf-8')).hexdigest()
+
+    def close(self) -> None:
+        """Close the shared session"""
+        self.session.close()
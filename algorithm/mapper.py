@@ -3,10 +3,11 @@ Schema Mapping & Validation Module
 Maps source data to CapsuleOS schema and validates integrity
 """
 
+import itertools
 import logging
-from typing import Dict, Any, List
+from typing import Dict, Any, Iterable, List, Tuple
 from models import CapsuleModel, CapsuleCollectionModel, GeoModel, SEOModel, LinksModel, MetadataModel
-from pydantic import ValidationError
+from pydantic import TypeAdapter, ValidationError
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +20,12 @@ class SchemaMappingError(Exception):
 class SchemaMapper:
     """Maps source data to CapsuleOS schema"""
 
+    # Validates a whole batch of source capsules in one call (bulk mode)
+    CAPSULE_LIST_ADAPTER = TypeAdapter(List[CapsuleModel])
+
+    # Source capsules validated per call in bulk mode
+    BULK_BATCH_SIZE = 1000
+
     @staticmethod
     def map_capsule(source_capsule: Dict[str, Any]) -> CapsuleModel:
         """
@@ -65,7 +72,10 @@ class SchemaMapper:
                 parent=links_data.get('parent', []),
                 children=links_data.get('children', []),
                 related=links_data.get('related', []),
-                siblings=links_data.get('siblings', [])
+                siblings=links_data.get('siblings', []),
+                related_weights=links_data.get('related_weights'),
+                recommended=links_data.get('recommended'),
+                sibling_group=links_data.get('sibling_group')
             )
 
             # Map metadata
@@ -101,12 +111,68 @@ class SchemaMapper:
             raise SchemaMappingError(f"Unexpected error mapping capsule: {str(e)}")
 
     @staticmethod
-    def map_collection(source_data: Dict[str, Any]) -> CapsuleCollectionModel:
+    def map_batch(source_capsules: List[Dict[str, Any]], offset: int = 0
+                  ) -> Tuple[List[CapsuleModel], List[Tuple[int, str]]]:
+        """
+        Validate a batch of source capsules with CAPSULE_LIST_ADAPTER
+
+        The whole batch is validated in one call, with the defaults of
+        map_capsule expressed in the models. If any capsule fails, the
+        errors are grouped by list index and the remaining capsules are
+        validated again without them.
+
+        Args:
+            source_capsules: Source capsule dicts
+            offset: Index of the first capsule in the whole collection
+
+        Returns:
+            Tuple of (mapped capsules, (index, error message) per failed capsule)
+        """
+        try:
+            return SchemaMapper.CAPSULE_LIST_ADAPTER.validate_python(source_capsules), []
+        except ValidationError as e:
+            failures: Dict[int, List[str]] = {}
+            for error in e.errors():
+                location = '.'.join(str(part) for part in error['loc'][1:]) or 'capsule'
+                failures.setdefault(error['loc'][0], []).append(f"{location}: {error['msg']}")
+
+        valid = [c for i, c in enumerate(source_capsules) if i not in failures]
+        errors = []
+        for i, messages in sorted(failures.items()):
+            capsule_id = source_capsules[i].get('id') if isinstance(source_capsules[i], dict) else None
+            errors.append((offset + i, f"Validation error for capsule {capsule_id}: {'; '.join(messages)}"))
+        return SchemaMapper.CAPSULE_LIST_ADAPTER.validate_python(valid), errors
+
+    @staticmethod
+    def map_collection(source_data: Dict[str, Any], bulk: bool = False) -> CapsuleCollectionModel:
         """
         Map a collection of source capsules to CapsuleOS schema
 
         Args:
             source_data: The source data dictionary
+            bulk: Validate capsules in batches (see map_batch) instead of
+                one at a time
+
+        Returns:
+            A validated CapsuleCollectionModel instance
+
+        Raises:
+            SchemaMappingError: If mapping fails
+        """
+        return SchemaMapper.map_capsules(source_data.get('capsules', []), bulk=bulk)
+
+    @staticmethod
+    def map_capsules(source_capsules: Iterable[Dict[str, Any]], bulk: bool = False) -> CapsuleCollectionModel:
+        """
+        Map source capsules to a CapsuleOS collection
+
+        Source capsules are not retained beyond one batch, so a stream (see
+        ingest.CapsuleStream) is mapped without holding the raw feed.
+
+        Args:
+            source_capsules: Source capsule dicts, e.g. a CapsuleStream
+            bulk: Validate BULK_BATCH_SIZE capsules per call (see map_batch)
+                instead of mapping them one at a time
 
         Returns:
             A validated CapsuleCollectionModel instance
@@ -115,17 +181,30 @@ class SchemaMapper:
             SchemaMappingError: If mapping fails
         """
         try:
-            source_capsules = source_data.get('capsules', [])
             mapped_capsules = []
             errors = []
 
-            for i, source_capsule in enumerate(source_capsules):
-                try:
-                    mapped_capsule = SchemaMapper.map_capsule(source_capsule)
-                    mapped_capsules.append(mapped_capsule)
-                except SchemaMappingError as e:
-                    errors.append(f"Capsule {i}: {str(e)}")
-                    logger.warning(f"Failed to map capsule {i}: {str(e)}")
+            if bulk:
+                source_capsules = iter(source_capsules)
+                offset = 0
+                while True:
+                    batch = list(itertools.islice(source_capsules, SchemaMapper.BULK_BATCH_SIZE))
+                    if not batch:
+                        break
+                    capsules, failures = SchemaMapper.map_batch(batch, offset)
+                    mapped_capsules.extend(capsules)
+                    for i, message in failures:
+                        errors.append(f"Capsule {i}: {message}")
+                        logger.warning(f"Failed to map capsule {i}: {message}")
+                    offset += len(batch)
+            else:
+                for i, source_capsule in enumerate(source_capsules):
+                    try:
+                        mapped_capsule = SchemaMapper.map_capsule(source_capsule)
+                        mapped_capsules.append(mapped_capsule)
+                    except SchemaMappingError as e:
+                        errors.append(f"Capsule {i}: {str(e)}")
+                        logger.warning(f"Failed to map capsule {i}: {str(e)}")
 
             if errors:
                 logger.warning(f"Mapping completed with {len(errors)} errors")
@@ -4,15 +4,15 @@ Defines the canonical data structure for capsules using Pydantic
 """
 
 from typing import List, Optional, Dict, Any
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field, field_validator, model_validator
 from datetime import datetime
 
 
 class GeoModel(BaseModel):
     """Geospatial data for a capsule"""
-    lat: float = Field(..., description="Latitude coordinate")
-    lng: float = Field(..., description="Longitude coordinate")
-    region: str = Field(..., description="Geographical region")
+    lat: float = Field(default=0.0, description="Latitude coordinate")
+    lng: float = Field(default=0.0, description="Longitude coordinate")
+    region: str = Field(default="unknown", description="Geographical region")
 
     class Config:
         json_schema_extra = {
@@ -30,6 +30,9 @@ class LinksModel(BaseModel):
     children: List[str] = Field(default_factory=list, description="Child capsule IDs")
     related: List[str] = Field(default_factory=list, description="Related capsule IDs")
     siblings: List[str] = Field(default_factory=list, description="Sibling capsule IDs")
+    related_weights: Optional[List[float]] = Field(default=None, description="Scores of the related links (top-k mode)")
+    recommended: Optional[List[str]] = Field(default=None, description="Ranked recommendation capsule IDs")
+    sibling_group: Optional[str] = Field(default=None, description="Sibling group ID (compact sibling output)")
 
     class Config:
         json_schema_extra = {
@@ -60,8 +63,8 @@ class SEOModel(BaseModel):
 
 class MetadataModel(BaseModel):
     """Metadata about the capsule"""
-    created: str = Field(..., description="Creation date in YYYY-MM-DD format")
-    updated: str = Field(..., description="Last updated date in YYYY-MM-DD format")
+    created: str = Field(default="2025-01-01", description="Creation date in YYYY-MM-DD format")
+    updated: str = Field(default="2025-12-02", description="Last updated date in YYYY-MM-DD format")
     source: str = Field(default="apsnytravel.ru", description="Source of the content")
     version: str = Field(default="1.0", description="Content version")
 
@@ -77,26 +80,54 @@ class MetadataModel(BaseModel):
 
 
 class CapsuleModel(BaseModel):
-    """Canonical data model for a single capsule"""
-    id: str = Field(..., description="Unique identifier")
+    """
+    Canonical data model for a single capsule
+
+    Defaults are those of the source feed: a capsule needs only an id, type
+    and title, and the slug and SEO fields default to values derived from
+    them.
+    """
+    id: str = Field(..., min_length=1, description="Unique identifier")
     type: str = Field(..., description="Type: product, place, or guide")
-    tier: int = Field(..., description="Content hierarchy tier")
-    slug: str = Field(..., description="URL-friendly slug")
-    title: str = Field(..., description="Main title")
-    emoji: str = Field(..., description="Representative emoji")
-    geo: GeoModel = Field(..., description="Geospatial information")
+    tier: int = Field(default=2, description="Content hierarchy tier")
+    slug: str = Field(..., description="URL-friendly slug (defaults to type/id)")
+    title: str = Field(..., min_length=1, description="Main title")
+    emoji: str = Field(default="📍", description="Representative emoji")
+    geo: GeoModel = Field(default_factory=GeoModel, description="Geospatial information")
     links: LinksModel = Field(default_factory=LinksModel, description="Relationship links")
-    seo: SEOModel = Field(..., description="SEO metadata")
-    content: str = Field(..., description="Full content (Markdown)")
+    seo: SEOModel = Field(..., description="SEO metadata (defaults derived from the title)")
+    content: str = Field(default="", description="Full content (Markdown)")
     metadata: MetadataModel = Field(default_factory=MetadataModel, description="Content metadata")
 
-    @validator('type')
+    @model_validator(mode='before')
+    @classmethod
+    def derive_defaults(cls, data: Any) -> Any:
+        """Fill in a missing slug and SEO fields from the id, type and title"""
+        if not isinstance(data, dict):
+            return data
+
+        data = dict(data)
+        data.setdefault('slug', f"{data.get('type')}/{data.get('id')}")
+        title = data.get('title')
+        seo = data.get('seo', {})
+        if isinstance(title, str) and isinstance(seo, dict):
+            data['seo'] = {
+                'title': title,
+                'description': f"Discover {title}",
+                'keywords': [title.lower()],
+                **seo
+            }
+        return data
+
+    @field_validator('type')
+    @classmethod
     def validate_type(cls, v):
         if v not in ['product', 'place', 'guide']:
             raise ValueError('type must be one of: product, place, guide')
         return v
 
-    @validator('tier')
+    @field_validator('tier')
+    @classmethod
     def validate_tier(cls, v):
         if v not in [1, 2, 3]:
             raise ValueError('tier must be 1, 2, or 3')
@@ -3,17 +3,24 @@ Orchestrator Module
 Manages the execution of the entire algorithm pipeline
 """
 
+import hashlib
 import json
 import logging
 import sys
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Union
 
-from ingest import DataIngestor, DataIngestionError
+from ingest import CapsuleStream, DataIngestor, DataIngestionError
+from ingest_async import AsyncIngestor, FeedSource
 from mapper import SchemaMapper, SchemaMappingError
+from analysis import TextAnalysis, TextAnalyzer
 from enrich import ContentEnricher
+from enrich_cache import EnrichmentCache
 from graph import GraphBuilder
+from graph_artifact import GraphArtifact
+from recommend import Recommender
+from records import to_models, to_records
 from models import CapsuleCollectionModel
 
 # Configure logging
@@ -32,17 +39,74 @@ logger = logging.getLogger(__name__)
 class AlgorithmOrchestrator:
     """Orchestrates the entire data synchronization and enrichment pipeline"""
 
+    # Files written by the serialization stage
+    OUTPUT_FILES = ('capsules.json', 'graph.json', 'search-index.json', 'structured-data.json')
+
     def __init__(self, source_url: str = "https://apsnytravel.ru/capsules.json",
-                 output_dir: str = "../client/public"):
+                 output_dir: str = "../client/public",
+                 graph_engine: str = "python",
+                 graph_options: Optional[Dict[str, Any]] = None,
+                 incremental_graph: bool = False,
+                 recommendation_options: Optional[Dict[str, Any]] = None,
+                 enrichment_cache: Optional[str] = None,
+                 enrichment_workers: int = 1,
+                 feed_cache_dir: Optional[str] = None,
+                 streaming_ingestion: bool = False,
+                 sources: Optional[List[Union[str, FeedSource]]] = None,
+                 source_options: Optional[Dict[str, Any]] = None,
+                 snapshot_dir: Optional[str] = None,
+                 bulk_mapping: bool = False,
+                 capsule_records: bool = False):
         """
         Initialize the orchestrator
 
         Args:
             source_url: URL to fetch capsules.json from
             output_dir: Directory to write output files to
+            graph_engine: Graph building engine ('python', 'numpy' or 'minhash')
+            graph_options: Extra keyword arguments for GraphBuilder.build_graph
+            incremental_graph: Patch the graph from the previous capsules.json
+                in output_dir, rescoring only changed capsules
+            recommendation_options: Keyword arguments for Recommender.recommend
+                (count, damping, iterations, max_entries)
+            enrichment_cache: JSON file for the enrichment cache; unchanged
+                capsules reuse their previous enrichment (None disables it)
+            enrichment_workers: Worker processes for content enrichment
+            feed_cache_dir: Directory caching the source feed for conditional
+                requests; when the source is not modified and the outputs
+                were built from it with the same settings, the run stops
+                after ingestion
+            streaming_ingestion: Parse the feed incrementally and map capsules
+                as they arrive instead of loading the whole body first
+            sources: Feed URLs or FeedSource objects fetched concurrently and
+                merged, replacing source_url (streaming is not used)
+            source_options: Keyword arguments for AsyncIngestor
+                (max_concurrency, retries, backoff, max_backoff, conflict)
+            snapshot_dir: Directory receiving a zstd-compressed raw snapshot
+                of every feed fetched over HTTP (None disables it)
+            bulk_mapping: Validate source capsules in batches through one
+                TypeAdapter instead of mapping them one at a time
+            capsule_records: Carry capsules through the stages after mapping
+                as slotted CapsuleRecord objects, validated back into models
+                before serialization
         """
         self.source_url = source_url
         self.output_dir = Path(output_dir)
+        self.graph_engine = graph_engine
+        self.graph_options = graph_options or {}
+        self.incremental_graph = incremental_graph
+        self.recommendation_options = recommendation_options or {}
+        self.enrichment_cache = Path(enrichment_cache) if enrichment_cache else None
+        self.enrichment_workers = enrichment_workers
+        self.feed_cache_dir = Path(feed_cache_dir) if feed_cache_dir else None
+        self.source_unchanged = False
+        self.source_hash: Optional[str] = None
+        self.streaming_ingestion = streaming_ingestion
+        self.sources = sources or []
+        self.source_options = source_options or {}
+        self.snapshot_dir = Path(snapshot_dir) if snapshot_dir else None
+        self.bulk_mapping = bulk_mapping
+        self.capsule_records = capsule_records
         self.output_dir.mkdir(parents=True, exist_ok=True)
 
     def run(self) -> bool:
@@ -64,6 +128,10 @@ class AlgorithmOrchestrator:
             if not raw_data:
                 return False
 
+            if self._outputs_current():
+                logger.info("✓ Source not modified and outputs are current, nothing to do")
+                return True
+
             # Stage 2: Schema Mapping & Validation
             logger.info("\n[Stage 2] Schema Mapping & Validation")
             logger.info("-" * 70)
@@ -71,22 +139,33 @@ class AlgorithmOrchestrator:
             if not collection:
                 return False
 
-            # Stage 3: Content Enrichment
-            logger.info("\n[Stage 3] Content Enrichment")
+            # Stage 3: Text Analysis
+            logger.info("\n[Stage 3] Text Analysis")
             logger.info("-" * 70)
-            collection = self._enrich_content(collection)
+            analyses = self._analyze_text(collection)
 
-            # Stage 4: Relationship Discovery
-            logger.info("\n[Stage 4] Relationship Discovery & Graph Building")
+            # Stage 4: Content Enrichment
+            logger.info("\n[Stage 4] Content Enrichment")
             logger.info("-" * 70)
-            collection = self._build_graph(collection)
+            collection = self._enrich_content(collection, analyses)
 
-            # Stage 5: Data Serialization
-            logger.info("\n[Stage 5] Data Serialization")
+            # Stage 5: Relationship Discovery
+            logger.info("\n[Stage 5] Relationship Discovery & Graph Building")
+            logger.info("-" * 70)
+            collection = self._build_graph(collection, analyses)
+
+            # Stage 6: Recommendation Ranking
+            logger.info("\n[Stage 6] Recommendation Ranking")
+            logger.info("-" * 70)
+            collection = self._rank_recommendations(collection)
+
+            # Stage 7: Data Serialization
+            logger.info("\n[Stage 7] Data Serialization")
             logger.info("-" * 70)
             success = self._serialize_data(collection)
             if not success:
                 return False
+            self._write_stamp()
 
             logger.info("\n" + "=" * 70)
             logger.info("✅ Pipeline completed successfully!")
@@ -97,16 +176,30 @@ class AlgorithmOrchestrator:
             logger.error(f"Pipeline failed: {str(e)}", exc_info=True)
             return False
 
-    def _ingest_data(self) -> Dict[str, Any]:
+    def _ingest_data(self) -> Union[Dict[str, Any], CapsuleStream]:
         """
         Stage 1: Ingest data from source
 
         Returns:
-            Raw data dictionary or None if failed
+            Raw data dictionary, a CapsuleStream in streaming mode (validated
+            while it is mapped), or None if failed
         """
         try:
-            ingestor = DataIngestor(self.source_url)
+            if self.sources:
+                return self._ingest_sources()
+
+            ingestor = DataIngestor(self.source_url, cache_dir=self.feed_cache_dir, snapshot_dir=self.snapshot_dir)
+            if self.streaming_ingestion:
+                stream = ingestor.stream_live_data()
+                self.source_unchanged = ingestor.not_modified
+                self.source_hash = ingestor.content_hash
+
+                logger.info(f"✓ Data stream opened")
+                return stream
+
             raw_data = ingestor.fetch_live_data()
+            self.source_unchanged = ingestor.not_modified
+            self.source_hash = ingestor.content_hash
             ingestor.validate_raw_data(raw_data)
             stats = ingestor.get_data_stats(raw_data)
 
@@ -122,7 +215,90 @@ class AlgorithmOrchestrator:
             logger.error(f"✗ Data ingestion failed: {str(e)}")
             return None
 
-    def _map_and_validate(self, raw_data: Dict[str, Any]) -> CapsuleCollectionModel:
+    def _ingest_sources(self) -> Dict[str, Any]:
+        """Fetch and merge every configured source concurrently"""
+        ingestor = AsyncIngestor(self.sources, cache_dir=self.feed_cache_dir, snapshot_dir=self.snapshot_dir,
+                                 **self.source_options)
+        try:
+            raw_data = ingestor.fetch()
+        finally:
+            ingestor.close()
+        self.source_unchanged = ingestor.not_modified
+        self.source_hash = ingestor.content_hash
+
+        logger.info(f"✓ Data ingested from {len(self.sources)} sources")
+        for source in raw_data['sources']:
+            status = f"{source['capsules']} capsules"
+            if source['stale']:
+                status += f" from the last good copy (failed: {source['error']})"
+            logger.info(f"  {source['name']}: {status}")
+        logger.info(f"  Total capsules: {len(raw_data['capsules'])}")
+        return raw_data
+
+    def _stamp_path(self) -> Path:
+        """Record of the source and settings the current outputs were built from"""
+        return self.feed_cache_dir / 'pipeline-stamp.json'
+
+    @staticmethod
+    def code_fingerprint() -> str:
+        """
+        Hash of the algorithm source code and enrichment cache version
+
+        A deploy that changes how outputs are built invalidates the stamp, so
+        an unchanged feed is processed again with the new code.
+
+        Returns:
+            SHA-256 hex digest of every algorithm module
+        """
+        digest = hashlib.sha256(f"enrichment-cache-{EnrichmentCache.VERSION}".encode('utf-8'))
+        for module in sorted(Path(__file__).resolve().parent.glob('*.py')):
+            digest.update(module.name.encode('utf-8'))
+            digest.update(module.read_bytes())
+        return digest.hexdigest()
+
+    def _current_stamp(self) -> Dict[str, Any]:
+        """Source hash, settings and code fingerprints of this run"""
+        settings = {
+            'output_dir': str(self.output_dir.resolve()),
+            'graph_engine': self.graph_engine,
+            'graph_options': self.graph_options,
+            'incremental_graph': self.incremental_graph,
+            'recommendation_options': self.recommendation_options,
+            'sources': [getattr(s, 'url', s) for s in self.sources],
+            'source_options': self.source_options,
+        }
+        fingerprint = hashlib.sha256(json.dumps(settings, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+        return {'source': self.source_hash, 'settings': fingerprint, 'code': self.code_fingerprint()}
+
+    def _outputs_current(self) -> bool:
+        """
+        Check whether the outputs already reflect the unmodified source
+
+        Returns:
+            True if the source returned 304, every output file exists and
+            the stamp matches this run's source, settings and code
+        """
+        if not self.source_unchanged or self.feed_cache_dir is None:
+            return False
+        if not all((self.output_dir / name).exists() for name in self.OUTPUT_FILES):
+            return False
+
+        try:
+            with open(self._stamp_path(), 'r', encoding='utf-8') as f:
+                return json.load(f) == self._current_stamp()
+        except (OSError, ValueError):
+            return False
+
+    def _write_stamp(self) -> None:
+        """Record the source and settings of a successful run"""
+        if self.feed_cache_dir is None or self.source_hash is None:
+            return
+
+        self.feed_cache_dir.mkdir(parents=True, exist_ok=True)
+        with open(self._stamp_path(), 'w', encoding='utf-8') as f:
+            json.dump(self._current_stamp(), f)
+
+    def _map_and_validate(self, raw_data: Union[Dict[str, Any], CapsuleStream]) -> CapsuleCollectionModel:
         """
         Stage 2: Map and validate data
 
@@ -130,32 +306,78 @@ class AlgorithmOrchestrator:
             CapsuleCollectionModel or None if failed
         """
         try:
-            collection = SchemaMapper.map_collection(raw_data)
+            if isinstance(raw_data, CapsuleStream):
+                try:
+                    collection = SchemaMapper.map_capsules(raw_data, bulk=self.bulk_mapping)
+                finally:
+                    raw_data.close()
+                self.source_hash = raw_data.content_hash
+
+                stats = raw_data.get_stats()
+                logger.info(f"  Total capsules: {stats['total_capsules']}")
+                logger.info(f"  Types: {stats['types']}")
+                logger.info(f"  Regions: {stats['regions']}")
+            else:
+                collection = SchemaMapper.map_collection(raw_data, bulk=self.bulk_mapping)
             SchemaMapper.validate_collection(collection)
 
             logger.info(f"✓ Schema mapping completed")
             logger.info(f"  Capsules mapped: {len(collection.capsules)}")
             logger.info(f"  Mapping errors: {collection.metadata.get('errors', 0)}")
 
+            # Records are validated again in _serialize_data
+            if self.capsule_records:
+                collection.capsules = to_records(collection.capsules)
+
             return collection
 
         except SchemaMappingError as e:
             logger.error(f"✗ Schema mapping failed: {str(e)}")
             return None
 
-    def _enrich_content(self, collection: CapsuleCollectionModel) -> CapsuleCollectionModel:
+    def _analyze_text(self, collection: CapsuleCollectionModel) -> Dict[str, TextAnalysis]:
+        """
+        Stage 3: Analyze capsule text once for the later stages
+
+        Returns:
+            Capsule ID -> TextAnalysis (empty if analysis failed; later
+            stages then analyze on demand)
+        """
+        try:
+            analyses = TextAnalyzer.analyze_collection(collection.capsules)
+
+            logger.info(f"✓ Text analysis completed")
+            logger.info(f"  Tokens: {sum(len(a.tokens) for a in analyses.values())}")
+
+            return analyses
+
+        except Exception as e:
+            logger.error(f"✗ Text analysis failed: {str(e)}")
+            return {}
+
+    def _enrich_content(self, collection: CapsuleCollectionModel,
+                        analyses: Optional[Dict[str, TextAnalysis]] = None) -> CapsuleCollectionModel:
         """
-        Stage 3: Enrich content
+        Stage 4: Enrich content
 
         Returns:
             Enriched CapsuleCollectionModel
         """
         try:
-            enriched_capsules = ContentEnricher.enrich_collection(collection.capsules)
+            cache = EnrichmentCache(self.enrichment_cache) if self.enrichment_cache else None
+            errors = []
+            enriched_capsules = ContentEnricher.enrich_collection(
+                collection.capsules, analyses, cache, workers=self.enrichment_workers, errors=errors
+            )
             collection.capsules = enriched_capsules
+            collection.metadata['enrichment_errors'] = len(errors)
 
             logger.info(f"✓ Content enrichment completed")
-            logger.info(f"  Capsules enriched: {len(enriched_capsules)}")
+            logger.info(f"  Capsules enriched: {len(enriched_capsules) - len(errors)}")
+            logger.info(f"  Enrichment errors: {len(errors)}")
+            if cache is not None:
+                cache.save()
+                logger.info(f"  Enrichment cache: {cache.hits} hits, {cache.misses} misses")
 
             return collection
 
@@ -163,15 +385,35 @@ class AlgorithmOrchestrator:
             logger.error(f"✗ Content enrichment failed: {str(e)}")
             return collection
 
-    def _build_graph(self, collection: CapsuleCollectionModel) -> CapsuleCollectionModel:
+    def _build_graph(self, collection: CapsuleCollectionModel,
+                     analyses: Optional[Dict[str, TextAnalysis]] = None) -> CapsuleCollectionModel:
         """
-        Stage 4: Build knowledge graph
+        Stage 5: Build knowledge graph
 
         Returns:
             CapsuleCollectionModel with graph relationships
         """
         try:
-            capsules_with_graph = GraphBuilder.build_graph(collection.capsules)
+            # Incremental updates keep unbounded related lists and corpus-independent
+            # Jaccard scores, so top-k, TF-IDF and approximate runs rebuild in full
+            incremental = (self.incremental_graph and
+                           self.graph_engine != 'minhash' and
+                           self.graph_options.get('related_top_k') is None and
+                           self.graph_options.get('scorer', 'jaccard') == 'jaccard')
+            previous = self._load_previous_capsules() if incremental else None
+            if previous:
+                changed, added, removed = GraphBuilder.diff_capsules(previous, collection.capsules)
+                logger.info(f"  Incremental update: {len(changed)} changed, "
+                            f"{len(added)} added, {len(removed)} removed")
+                capsules_with_graph = GraphBuilder.update_graph(
+                    collection.capsules, previous, changed, added, removed,
+                    compact_siblings=self.graph_options.get('compact_siblings', False),
+                    analyses=analyses
+                )
+            else:
+                capsules_with_graph = GraphBuilder.build_graph(
+                    collection.capsules, engine=self.graph_engine, analyses=analyses, **self.graph_options
+                )
             collection.capsules = capsules_with_graph
 
             stats = GraphBuilder.get_graph_stats(capsules_with_graph)
@@ -186,17 +428,75 @@ class AlgorithmOrchestrator:
             logger.error(f"✗ Graph building failed: {str(e)}")
             return collection
 
+    def _rank_recommendations(self, collection: CapsuleCollectionModel) -> CapsuleCollectionModel:
+        """
+        Stage 6: Rank recommendations with personalized PageRank
+
+        Returns:
+            CapsuleCollectionModel with recommendation lists
+        """
+        try:
+            collection.capsules = Recommender.recommend(collection.capsules, **self.recommendation_options)
+
+            logger.info(f"✓ Recommendations ranked")
+            logger.info(f"  Capsules with recommendations: "
+                        f"{sum(1 for c in collection.capsules if c.links.recommended)}/{len(collection.capsules)}")
+
+            return collection
+
+        except Exception as e:
+            logger.error(f"✗ Recommendation ranking failed: {str(e)}")
+            return collection
+
+    def _graph_build_options(self) -> Dict[str, Any]:
+        """Options that shape the graph, as recorded in graph.json"""
+        options = {'engine': self.graph_engine}
+        options.update((k, v) for k, v in self.graph_options.items() if k != 'workers')
+        return json.loads(json.dumps(options, sort_keys=True, default=str))
+
+    def _load_previous_capsules(self) -> Optional[list]:
+        """
+        Load the capsules of the previous run from output_dir
+
+        The previous graph is only reused when its graph.json records the
+        same build options as this run.
+
+        Returns:
+            List of CapsuleModel or None if no usable previous output exists
+        """
+        capsules_file = self.output_dir / 'capsules.json'
+        graph_file = self.output_dir / 'graph.json'
+        if not capsules_file.exists() or not graph_file.exists():
+            return None
+
+        try:
+            with open(graph_file, 'r', encoding='utf-8') as f:
+                build = json.load(f).get('build')
+            if build != self._graph_build_options():
+                logger.info(f"  Previous graph built with different options, rebuilding in full")
+                return None
+
+            with open(capsules_file, 'r', encoding='utf-8') as f:
+                return SchemaMapper.map_collection(json.load(f), bulk=self.bulk_mapping).capsules
+
+        except (OSError, json.JSONDecodeError, SchemaMappingError) as e:
+            logger.warning(f"Previous graph unavailable, rebuilding in full: {str(e)}")
+            return None
+
     def _serialize_data(self, collection: CapsuleCollectionModel) -> bool:
         """
-        Stage 5: Serialize data to JSON files
+        Stage 7: Serialize data to JSON files
 
         Returns:
             True if successful, False otherwise
         """
         try:
+            if self.capsule_records:
+                collection.capsules = to_models(collection.capsules)
+
             # Prepare output data
             output_data = {
-                'capsules': [c.dict() for c in collection.capsules],
+                'capsules': [c.dict(exclude_none=True) for c in collection.capsules],
                 'metadata': {
                     'total': len(collection.capsules),
                     'generated': datetime.now().isoformat(),
@@ -205,6 +505,11 @@ class AlgorithmOrchestrator:
                 }
             }
 
+            # Compact sibling output: group membership is emitted once
+            sibling_groups = GraphBuilder.get_sibling_groups(collection.capsules)
+            if sibling_groups:
+                output_data['sibling_groups'] = sibling_groups
+
             # Write capsules.json
             capsules_file = self.output_dir / 'capsules.json'
             with open(capsules_file, 'w', encoding='utf-8') as f:
@@ -212,6 +517,14 @@ class AlgorithmOrchestrator:
 
             logger.info(f"✓ Generated capsules.json ({capsules_file.stat().st_size / 1024:.1f} KB)")
 
+            # Generate compact CSR graph artifact
+            graph_artifact = GraphArtifact.from_capsules(collection.capsules, self._graph_build_options())
+            graph_file = self.output_dir / 'graph.json'
+            with open(graph_file, 'w', encoding='utf-8') as f:
+                json.dump(graph_artifact.to_dict(), f, ensure_ascii=False, separators=(',', ':'))
+
+            logger.info(f"✓ Generated graph.json ({graph_file.stat().st_size / 1024:.1f} KB)")
+
             # Generate search index
             search_index = self._generate_search_index(collection.capsules)
             search_file = self.output_dir / 'search-index.json'
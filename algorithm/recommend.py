@@ -0,0 +1,189 @@
+"""
+Recommendation Ranking Module
+Precomputes "you may also like" lists with personalized PageRank over the knowledge graph
+"""
+
+import heapq
+import logging
+from typing import Dict, List
+from models import CapsuleModel
+from graph_artifact import GraphArtifact
+
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+    sparse = None
+
+logger = logging.getLogger(__name__)
+
+
+class Recommender:
+    """Ranks recommendations per capsule by personalized PageRank"""
+
+    # Source capsules processed together in the sparse matrix path
+    BLOCK_SIZE = 512
+
+    @staticmethod
+    def transition_weights(artifact: GraphArtifact) -> List[float]:
+        """
+        Row-normalized edge weights of the graph's random walk
+
+        Args:
+            artifact: CSR graph
+
+        Returns:
+            Probability of following each edge; the edges of every node with
+            outgoing edges sum to 1
+        """
+        weights = artifact.weights or [1.0] * len(artifact.targets)
+        normalized = []
+        for node in range(len(artifact)):
+            start, stop = artifact.offsets[node], artifact.offsets[node + 1]
+            total = sum(weights[start:stop])
+            normalized.extend(w / total if total > 0 else 0.0 for w in weights[start:stop])
+        return normalized
+
+    @staticmethod
+    def personalized_pagerank(artifact: GraphArtifact, damping: float = 0.85,
+                              iterations: int = 20, max_entries: int = 200) -> List[Dict[int, float]]:
+        """
+        Personalized PageRank vector from every node
+
+        Runs power iteration x = (1 - d) * s + d * x P for all sources at
+        once, where s restarts at the source and mass reaching a node without
+        outgoing edges also returns to the source. After each step only the
+        max_entries largest scores of each vector are kept (ties go to the
+        lower node position), rescaled so the vector still sums to 1. This
+        keeps the vectors sparse however dense the graph is. Uses
+        scipy.sparse when available and plain dict vectors otherwise.
+
+        Args:
+            artifact: CSR graph over all link types
+            damping: Probability of following an edge instead of restarting
+            iterations: Number of power iteration steps
+            max_entries: Scores kept per vector after each step
+
+        Returns:
+            Node position -> score, per source node
+        """
+        probabilities = Recommender.transition_weights(artifact)
+        if sparse is not None:
+            return Recommender._pagerank_sparse(artifact, probabilities, damping, iterations, max_entries)
+        return Recommender._pagerank_python(artifact, probabilities, damping, iterations, max_entries)
+
+    @staticmethod
+    def _pagerank_sparse(artifact: GraphArtifact, probabilities: List[float], damping: float,
+                         iterations: int, max_entries: int) -> List[Dict[int, float]]:
+        """Power iteration over blocks of sources with sparse matrix products"""
+        n = len(artifact)
+        # Damping is folded into the transition matrix once
+        transition = sparse.csr_matrix(
+            (damping * np.array(probabilities), np.array(artifact.targets, dtype=np.int64),
+             np.array(artifact.offsets, dtype=np.int64)),
+            shape=(n, n)
+        )
+        dangling = (np.diff(transition.indptr) == 0).astype(np.float64)
+
+        scores: List[Dict[int, float]] = []
+        for start in range(0, n, Recommender.BLOCK_SIZE):
+            stop = min(start + Recommender.BLOCK_SIZE, n)
+            rows = np.arange(stop - start)
+            restart = sparse.csr_matrix((np.ones(stop - start), (rows, np.arange(start, stop))), shape=(stop - start, n))
+
+            x = restart.copy()
+            for _ in range(iterations):
+                dangling_mass = x @ dangling
+                x = (x @ transition) + sparse.diags((1 - damping) + damping * dangling_mass) @ restart
+                x = Recommender._truncate_rows(sparse.csr_matrix(x), max_entries)
+
+            for row in range(stop - start):
+                begin, end = x.indptr[row], x.indptr[row + 1]
+                scores.append(dict(zip(x.indices[begin:end].tolist(), x.data[begin:end].tolist())))
+
+        return scores
+
+    @staticmethod
+    def _truncate_rows(x, max_entries: int):
+        """Keep the max_entries largest entries of each CSR row, rescaled to the row's mass"""
+        x.sum_duplicates()
+        lengths = np.diff(x.indptr)
+        if lengths.max(initial=0) <= max_entries:
+            return x
+
+        data, indices, indptr = [], [], [0]
+        for row in range(x.shape[0]):
+            begin, end = x.indptr[row], x.indptr[row + 1]
+            row_data, row_indices = x.data[begin:end], x.indices[begin:end]
+            if end - begin > max_entries:
+                keep = np.lexsort((row_indices, -row_data))[:max_entries]
+                keep.sort()
+                kept = row_data[keep]
+                row_data, row_indices = kept * (row_data.sum() / kept.sum()), row_indices[keep]
+            data.append(row_data)
+            indices.append(row_indices)
+            indptr.append(indptr[-1] + len(row_data))
+
+        return sparse.csr_matrix((np.concatenate(data), np.concatenate(indices), np.array(indptr)), shape=x.shape)
+
+    @staticmethod
+    def _pagerank_python(artifact: GraphArtifact, probabilities: List[float], damping: float,
+                         iterations: int, max_entries: int) -> List[Dict[int, float]]:
+        """Power iteration with one dict vector per source"""
+        offsets, targets = artifact.offsets, artifact.targets
+        scores: List[Dict[int, float]] = []
+
+        for source in range(len(artifact)):
+            x = {source: 1.0}
+            for _ in range(iterations):
+                y: Dict[int, float] = {}
+                restart = 1 - damping
+                for node, mass in x.items():
+                    start, stop = offsets[node], offsets[node + 1]
+                    if start == stop:
+                        restart += damping * mass
+                        continue
+                    for e in range(start, stop):
+                        y[targets[e]] = y.get(targets[e], 0.0) + damping * mass * probabilities[e]
+                y[source] = y.get(source, 0.0) + restart
+                if len(y) > max_entries:
+                    kept = heapq.nlargest(max_entries, y.items(), key=lambda item: (item[1], -item[0]))
+                    scale = sum(y.values()) / sum(score for _, score in kept)
+                    y = {node: score * scale for node, score in sorted(kept)}
+                x = y
+            scores.append(x)
+
+        return scores
+
+    @staticmethod
+    def recommend(capsules: List[CapsuleModel], count: int = 10, damping: float = 0.85,
+                  iterations: int = 20, max_entries: int = 200) -> List[CapsuleModel]:
+        """
+        Store a ranked recommendation list on every capsule
+
+        Args:
+            capsules: Capsules with relationship links (after build_graph)
+            count: Recommendations kept per capsule
+            damping: PageRank damping factor
+            iterations: Power iteration steps
+            max_entries: Scores kept per PageRank vector (at least count)
+
+        Returns:
+            Capsules with links.recommended set, best first
+        """
+        logger.info("Ranking recommendations...")
+
+        artifact = GraphArtifact.from_capsules(capsules)
+        scores = Recommender.personalized_pagerank(artifact, damping, iterations, max(max_entries, count + 1))
+
+        for i, capsule in enumerate(capsules):
+            ranked = heapq.nlargest(
+                count,
+                ((score, node) for node, score in scores[i].items() if node != i),
+                key=lambda item: (item[0], -item[1])
+            )
+            capsule.links.recommended = [artifact.nodes[node] for _, node in ranked]
+
+        logger.info(f"Ranked recommendations for {len(capsules)} capsules")
+        return capsules
@@ -0,0 +1,180 @@
+"""
+Capsule Record Module
+Lightweight slotted capsule representation for the in-pipeline hot path
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+from models import CapsuleModel
+from mapper import SchemaMapper
+
+
+def _record_dict(record: Any, exclude_none: bool) -> Dict[str, Any]:
+    """Convert a record and its nested records to a dict, like BaseModel.dict()"""
+    data = {}
+    for name in record.__slots__:
+        value = getattr(record, name)
+        if isinstance(value, (GeoRecord, LinksRecord, SEORecord, MetadataRecord)):
+            value = _record_dict(value, exclude_none)
+        elif isinstance(value, list):
+            value = list(value)
+        elif value is None and exclude_none:
+            continue
+        data[name] = value
+    return data
+
+
+@dataclass(slots=True)
+class GeoRecord:
+    """Geospatial data for a capsule (see GeoModel)"""
+    lat: float = 0.0
+    lng: float = 0.0
+    region: str = "unknown"
+
+    def dict(self, exclude_none: bool = False) -> Dict[str, Any]:
+        """Field values as a dict"""
+        return _record_dict(self, exclude_none)
+
+
+@dataclass(slots=True)
+class LinksRecord:
+    """Relationship links to other capsules (see LinksModel)"""
+    parent: List[str] = field(default_factory=list)
+    children: List[str] = field(default_factory=list)
+    related: List[str] = field(default_factory=list)
+    siblings: List[str] = field(default_factory=list)
+    related_weights: Optional[List[float]] = None
+    recommended: Optional[List[str]] = None
+    sibling_group: Optional[str] = None
+
+    def dict(self, exclude_none: bool = False) -> Dict[str, Any]:
+        """Field values as a dict"""
+        return _record_dict(self, exclude_none)
+
+
+@dataclass(slots=True)
+class SEORecord:
+    """SEO metadata for a capsule (see SEOModel)"""
+    title: str
+    description: str
+    keywords: List[str]
+
+    def dict(self, exclude_none: bool = False) -> Dict[str, Any]:
+        """Field values as a dict"""
+        return _record_dict(self, exclude_none)
+
+
+@dataclass(slots=True)
+class MetadataRecord:
+    """Metadata about the capsule (see MetadataModel)"""
+    created: str = "2025-01-01"
+    updated: str = "2025-12-02"
+    source: str = "apsnytravel.ru"
+    version: str = "1.0"
+
+    def dict(self, exclude_none: bool = False) -> Dict[str, Any]:
+        """Field values as a dict"""
+        return _record_dict(self, exclude_none)
+
+
+@dataclass(slots=True)
+class CapsuleRecord:
+    """
+    Slotted, unvalidated counterpart of CapsuleModel
+
+    Has the same fields and nesting as CapsuleModel, so pipeline stages read
+    and assign attributes (capsule.links.parent = ...) the same way on
+    either. Attribute access and assignment skip pydantic, and a record
+    holds no per-instance __dict__. Records are only created from validated
+    models (from_model) and validated again when turned back into models
+    (to_model), so validation runs at the ingest and serialization
+    boundaries only.
+    """
+    id: str
+    type: str
+    tier: int
+    slug: str
+    title: str
+    emoji: str
+    geo: GeoRecord
+    links: LinksRecord
+    seo: SEORecord
+    content: str
+    metadata: MetadataRecord
+
+    @classmethod
+    def from_model(cls, capsule: CapsuleModel) -> 'CapsuleRecord':
+        """
+        Build a record from a validated capsule
+
+        List fields are shared with the model rather than copied, so the
+        model should not be used afterwards.
+
+        Args:
+            capsule: The validated capsule
+
+        Returns:
+            A CapsuleRecord with the capsule's values
+        """
+        geo, links, seo, metadata = capsule.geo, capsule.links, capsule.seo, capsule.metadata
+        return cls(
+            id=capsule.id,
+            type=capsule.type,
+            tier=capsule.tier,
+            slug=capsule.slug,
+            title=capsule.title,
+            emoji=capsule.emoji,
+            geo=GeoRecord(geo.lat, geo.lng, geo.region),
+            links=LinksRecord(links.parent, links.children, links.related, links.siblings,
+                              links.related_weights, links.recommended, links.sibling_group),
+            seo=SEORecord(seo.title, seo.description, seo.keywords),
+            content=capsule.content,
+            metadata=MetadataRecord(metadata.created, metadata.updated, metadata.source, metadata.version)
+        )
+
+    def to_model(self) -> CapsuleModel:
+        """
+        Validate the record back into a CapsuleModel
+
+        Returns:
+            A validated CapsuleModel instance
+
+        Raises:
+            pydantic.ValidationError: If a stage left an invalid value
+        """
+        return CapsuleModel.model_validate(self.dict())
+
+    def dict(self, exclude_none: bool = False) -> Dict[str, Any]:
+        """
+        Field values as a dict, nested records included
+
+        Args:
+            exclude_none: Leave out fields set to None
+
+        Returns:
+            Dict shaped like CapsuleModel.dict()
+        """
+        return _record_dict(self, exclude_none)
+
+
+def to_records(capsules: Iterable[CapsuleModel]) -> List[CapsuleRecord]:
+    """Convert validated capsules to records (see CapsuleRecord.from_model)"""
+    return [CapsuleRecord.from_model(c) for c in capsules]
+
+
+def to_models(capsules: Iterable[Any]) -> List[CapsuleModel]:
+    """
+    Validate records back into models in one TypeAdapter call
+
+    Args:
+        capsules: CapsuleRecord objects; CapsuleModel objects pass through
+
+    Returns:
+        List of validated CapsuleModel instances, in input order
+
+    Raises:
+        pydantic.ValidationError: If a stage left an invalid value
+    """
+    return SchemaMapper.CAPSULE_LIST_ADAPTER.validate_python(
+        [c.dict() if isinstance(c, CapsuleRecord) else c for c in capsules]
+    )
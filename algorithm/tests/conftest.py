@@ -0,0 +1,61 @@
+"""
+Shared fixtures for the algorithm tests
+
+The algorithm modules import each other by bare name (from graph import
+GraphBuilder), as when run from the algorithm directory, so that directory
+is put on sys.path here.
+"""
+
+import copy
+import json
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+ALGORITHM_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ALGORITHM_DIR))
+
+from mapper import SchemaMapper  # noqa: E402
+
+SAMPLE_FEED = ALGORITHM_DIR.parent / 'client' / 'public' / 'capsules.json'
+
+
+def synthesize_raw(count: int, seed: int = 1):
+    """
+    Synthetic source capsules varied from the sample feed
+
+    Each capsule copies a sample capsule, keeps a random 60% of its words and
+    jitters its coordinates by up to half a degree, like the benchmark script.
+    """
+    with open(SAMPLE_FEED, 'r', encoding='utf-8') as f:
+        source = json.load(f)['capsules']
+
+    rng = random.Random(seed)
+    capsules = []
+    for i in range(count):
+        capsule = copy.deepcopy(source[i % len(source)])
+        words = capsule['content'].split()
+        capsule['content'] = ' '.join(w for w in words if rng.random() < 0.6)
+        capsule['id'] = f"{capsule['id']}-{i}"
+        capsule['slug'] = f"{capsule['slug']}-{i}"
+        capsule['geo']['lat'] += rng.uniform(-0.5, 0.5)
+        capsule['geo']['lng'] += rng.uniform(-0.5, 0.5)
+        capsule['links'] = {}
+        capsules.append(capsule)
+    return capsules
+
+
+@pytest.fixture
+def raw_capsules():
+    """Factory for synthetic source capsule dicts"""
+    return synthesize_raw
+
+
+@pytest.fixture
+def make_capsules():
+    """Factory for mapped synthetic capsules"""
+    def make(count: int, seed: int = 1):
+        return SchemaMapper.map_collection({'capsules': synthesize_raw(count, seed)}).capsules
+    return make
@@ -0,0 +1,78 @@
+"""
+The shared text analysis must match the per-stage regexes it replaced
+"""
+
+import json
+import re
+
+import pytest
+
+from analysis import TextAnalyzer
+from conftest import SAMPLE_FEED
+
+# title, content
+TEXTS = [
+    ('', ''),
+    ('Title only', ''),
+    ('', 'No title. Just content!'),
+    ('Gagra', 'Gagra... Gagra?! The sea; the sea, the mountains - 2024 edition.'),
+    ('Punctuation', "Don't stop: e-mail, co-op, snake_case and a.b.c! Why?? Yes!!! End."),
+    ('Numbers', 'Open 9-18, tickets 1500 RUB, route M27 at 43.08N 40.8E.'),
+    ('Озеро Рица', 'Озеро Рица — жемчужина Абхазии. Высота 950 м! Вода холодная? Да, очень.'),
+    ('Mixed Сухум', 'Сухум (Sukhum) и Новый Афон: пещера, монастырь. ÉTÉ café naïve; ß straße.'),
+    ('No punctuation', 'one two three four five six seven'),
+    ('Edge', '...!!!???'),
+    ('Spaces', '   Leading and trailing spaces.   Second sentence.  Third.  '),
+    ('Newlines', 'Line one\nstill one. Line\ttwo!\n\nLine three?'),
+]
+
+
+def replaced_terms(title, content):
+    """Graph tokens: tokenize(capsule_text(capsule)) before the analysis stage"""
+    return frozenset(re.findall(r'\b\w{3,}\b', (title + ' ' + content).lower()))
+
+
+def replaced_keyword_counts(content):
+    """Keyword frequencies from ContentEnricher.extract_keywords"""
+    word_freq = {}
+    for word in re.findall(r'\b\w{4,}\b', content.lower()):
+        word_freq[word] = word_freq.get(word, 0) + 1
+    return word_freq
+
+
+def replaced_sentences(content):
+    """Leading sentences from ContentEnricher.generate_seo_description"""
+    return re.split(r'[.!?]+', content)[:2]
+
+
+def assert_matches_replaced_regexes(title, content):
+    analysis = TextAnalyzer.analyze(title, content)
+
+    assert analysis.terms == replaced_terms(title, content)
+    # Order matters: keywords are ranked by a stable sort on the counts
+    assert list(analysis.keyword_counts.items()) == list(replaced_keyword_counts(content).items())
+    assert analysis.sentences == replaced_sentences(content)
+
+
+@pytest.mark.parametrize('title, content', TEXTS)
+def test_analysis_matches_replaced_regexes(title, content):
+    assert_matches_replaced_regexes(title, content)
+
+
+def test_sample_feed_matches_replaced_regexes():
+    with open(SAMPLE_FEED, 'r', encoding='utf-8') as f:
+        for capsule in json.load(f)['capsules']:
+            assert_matches_replaced_regexes(capsule['title'], capsule['content'])
+
+
+def test_analysis_of_cyrillic_and_empty_text():
+    analysis = TextAnalyzer.analyze('Озеро Рица', 'Озеро Рица — жемчужина Абхазии. Высота 950 м!')
+    assert analysis.terms == {'озеро', 'рица', 'жемчужина', 'абхазии', 'высота', '950'}
+    assert analysis.term_counts['озеро'] == 2
+    assert dict(analysis.keyword_counts) == {'озеро': 1, 'рица': 1, 'жемчужина': 1, 'абхазии': 1, 'высота': 1}
+    assert analysis.sentences == ['Озеро Рица — жемчужина Абхазии', ' Высота 950 м']
+
+    empty = TextAnalyzer.analyze('', '')
+    assert empty.tokens == [] and empty.terms == frozenset()
+    assert dict(empty.keyword_counts) == {}
+    assert empty.sentences == ['']
@@ -0,0 +1,73 @@
+"""
+Cached and parallel enrichment must give the same result as a fresh sequential run
+"""
+
+import multiprocessing
+
+import pytest
+
+from enrich import ContentEnricher
+from enrich_cache import EnrichmentCache
+from mapper import SchemaMapper
+
+
+def test_cached_keywords_follow_the_current_idf(raw_capsules):
+    raw = raw_capsules(150)
+    for capsule in raw:
+        capsule['seo']['keywords'] = []
+
+    def enrich(count, cache=None):
+        capsules = SchemaMapper.map_collection({'capsules': raw[:count]}).capsules
+        return ContentEnricher.enrich_collection(capsules, cache=cache)
+
+    cache = EnrichmentCache()
+    enrich(100, cache)
+    # More capsules change the IDF weights of the 100 cached ones
+    cached = enrich(150, cache)
+    assert cache.hits == 100
+
+    assert [c.seo.dict() for c in cached] == [c.seo.dict() for c in enrich(150)]
+
+
+def test_parallel_enrichment_matches_sequential(raw_capsules, monkeypatch):
+    # The failing enrichment below reaches the workers by forking
+    if multiprocessing.get_start_method() != 'fork':
+        pytest.skip("needs fork-started worker processes")
+
+    raw = raw_capsules(100)
+    for capsule in raw:
+        capsule['seo']['keywords'] = []
+    broken = {raw[5]['id'], raw[63]['id']}
+
+    apply_enrichment = ContentEnricher.apply_enrichment
+
+    def failing(capsule, analysis=None, idf=None):
+        if capsule.id in broken:
+            raise ValueError("broken capsule")
+        return apply_enrichment(capsule, analysis, idf)
+
+    monkeypatch.setattr(ContentEnricher, 'apply_enrichment', staticmethod(failing))
+
+    def enrich(workers, cache):
+        capsules = SchemaMapper.map_collection({'capsules': raw}).capsules
+        errors = []
+        # Five chunks, so the pool is used
+        ContentEnricher.enrich_collection(capsules, cache=cache, workers=workers, chunk_size=20, errors=errors)
+        return capsules, errors
+
+    sequential, sequential_errors = enrich(1, EnrichmentCache())
+    cache = EnrichmentCache()
+    parallel, parallel_errors = enrich(2, cache)
+
+    assert [c.model_dump() for c in parallel] == [c.model_dump() for c in sequential]
+    assert parallel_errors == sequential_errors
+    assert sorted(parallel_errors) == sorted(f"Capsule {i}: broken capsule" for i in broken)
+
+    # Failed capsules are returned unchanged and not cached
+    unchanged = SchemaMapper.map_collection({'capsules': raw}).capsules
+    assert [c.seo.keywords for c in parallel if c.id in broken] == [[], []]
+    assert [c.model_dump() for c in parallel if c.id in broken] == \
+        [c.model_dump() for c in unchanged if c.id in broken]
+    assert len(cache.entries) == 98
+    enrich(2, cache)
+    assert (cache.hits, cache.misses) == (98, 100 + 2)
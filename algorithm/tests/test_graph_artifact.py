@@ -0,0 +1,30 @@
+"""
+CSR graph artifact (graph.json)
+"""
+
+import pytest
+
+from graph import GraphBuilder
+from graph_artifact import GraphArtifact
+
+
+def test_artifact_round_trip(make_capsules):
+    capsules = GraphBuilder.build_graph(make_capsules(40), related_top_k=3)
+    data = GraphArtifact.from_capsules(capsules).to_dict()
+
+    assert GraphArtifact.from_dict(data).to_dict() == data
+
+
+@pytest.mark.parametrize('change', [
+    {'version': 0},
+    {'version': GraphArtifact.VERSION + 1},
+    {'version': None},
+    {'format': 'adjacency'},
+    {'edge_types': ['parent', 'children', 'related']},
+])
+def test_from_dict_rejects_unsupported_artifacts(make_capsules, change):
+    data = GraphArtifact.from_capsules(GraphBuilder.build_graph(make_capsules(10))).to_dict()
+    data.update(change)
+
+    with pytest.raises(ValueError, match='Unsupported graph artifact'):
+        GraphArtifact.from_dict(data)
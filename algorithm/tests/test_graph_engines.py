@@ -0,0 +1,66 @@
+"""
+Graph engines must produce the same links as the default python engine
+"""
+
+import math
+
+import pytest
+
+from graph import GraphBuilder
+from graph_index import geo_distance, geo_window
+
+
+def links_of(capsules):
+    """Every link list of every capsule, in capsule order"""
+    return [c.links.dict() for c in capsules]
+
+
+def test_geo_distance_is_great_circle():
+    assert geo_distance(43.0, 40.0, 43.0, 40.0) == 0
+    assert geo_distance(43.0, 40.0, 44.0, 40.0) == pytest.approx(111.195, abs=1e-3)
+    # East-west distances shrink with cos(lat), and wrap at the antimeridian
+    assert geo_distance(43.0, 40.0, 43.0, 41.0) == pytest.approx(111.195 * math.cos(math.radians(43)), rel=1e-3)
+    assert geo_distance(0.0, 179.9, 0.0, -179.9) == pytest.approx(22.239, abs=1e-3)
+
+
+def test_geo_window_bounds_every_match():
+    for lat in (0.0, 43.0, 70.0):
+        lat_offset, lng_offset = geo_window(lat, 100)
+        assert geo_distance(lat, 40.0, lat + lat_offset * 1.001, 40.0) > 100
+        assert geo_distance(lat, 40.0, lat, 40.0 + lng_offset * 1.001) > 100
+        assert lng_offset < 3
+
+
+def test_numpy_engine_matches_python(make_capsules):
+    pytest.importorskip('numpy')
+    expected = GraphBuilder.build_graph(make_capsules(300), engine='python')
+    actual = GraphBuilder.build_graph(make_capsules(300), engine='numpy')
+
+    assert links_of(actual) == links_of(expected)
+    assert sum(len(c.links.related) for c in expected) > 0
+
+
+def test_numpy_engine_matches_python_with_top_k(make_capsules):
+    pytest.importorskip('numpy')
+    expected = GraphBuilder.build_graph(make_capsules(300), engine='python', related_top_k=5)
+    actual = GraphBuilder.build_graph(make_capsules(300), engine='numpy', related_top_k=5)
+
+    assert links_of(actual) == links_of(expected)
+
+
+def test_minhash_engine_adds_no_false_links(make_capsules):
+    exact = GraphBuilder.build_graph(make_capsules(300), engine='python')
+    approx = GraphBuilder.build_graph(make_capsules(300), engine='minhash')
+
+    for expected, actual in zip(exact, approx):
+        assert set(actual.links.parent) <= set(expected.links.parent)
+        assert set(actual.links.related) <= set(expected.links.related)
+    assert sum(len(c.links.related) for c in approx) > 0
+
+
+@pytest.mark.parametrize('scorer', ['jaccard', 'tfidf'])
+def test_parallel_build_matches_single_process(make_capsules, scorer):
+    expected = GraphBuilder.build_graph(make_capsules(150), scorer=scorer)
+    actual = GraphBuilder.build_graph(make_capsules(150), scorer=scorer, workers=2)
+
+    assert links_of(actual) == links_of(expected)
@@ -0,0 +1,75 @@
+"""
+Incremental graph updates must match a full rebuild
+"""
+
+import json
+import logging
+import random
+
+from graph import GraphBuilder
+from mapper import SchemaMapper
+from orchestrator import AlgorithmOrchestrator
+from conftest import SAMPLE_FEED
+
+
+def graph_links(capsules):
+    """Link lists of every capsule by ID"""
+    return {
+        c.id: (c.links.parent, c.links.children, c.links.related, c.links.siblings)
+        for c in capsules
+    }
+
+
+def edit_feed(raw, seed: int = 7):
+    """Change, move, drop, add and reorder capsules of a source feed"""
+    rng = random.Random(seed)
+    raw = [dict(c, geo=dict(c['geo'])) for c in raw]
+    for i in rng.sample(range(len(raw)), 6):
+        raw[i]['content'] = raw[rng.randrange(len(raw))]['content']
+    for i in rng.sample(range(len(raw)), 3):
+        raw[i]['geo']['lat'] += 0.8
+    del raw[10:13]
+    rng.shuffle(raw)
+    return raw
+
+
+def test_update_graph_matches_full_build(raw_capsules):
+    previous = GraphBuilder.build_graph(
+        SchemaMapper.map_collection({'capsules': raw_capsules(200)}).capsules
+    )
+
+    # Capsules 200-203 are new
+    current = edit_feed(raw_capsules(204))
+    incremental = SchemaMapper.map_collection({'capsules': current}).capsules
+    full = SchemaMapper.map_collection({'capsules': current}).capsules
+
+    changed, added, removed = GraphBuilder.diff_capsules(previous, incremental)
+    assert changed and len(added) == 4 and len(removed) == 3
+
+    GraphBuilder.update_graph(incremental, previous, changed, added, removed)
+    GraphBuilder.build_graph(full)
+
+    assert [c.id for c in incremental] == [c.id for c in full]
+    assert graph_links(incremental) == graph_links(full)
+
+
+def test_previous_graph_with_other_options_is_rebuilt(tmp_path, caplog):
+    feed = tmp_path / 'capsules.json'
+    feed.write_text(SAMPLE_FEED.read_text(encoding='utf-8'), encoding='utf-8')
+    output_dir = tmp_path / 'public'
+
+    assert AlgorithmOrchestrator(str(feed), str(output_dir)).run()
+    with open(output_dir / 'graph.json', 'r', encoding='utf-8') as f:
+        assert json.load(f)['build'] == {'engine': 'python'}
+
+    def rerun():
+        return AlgorithmOrchestrator(str(feed), str(output_dir), incremental_graph=True,
+                                     graph_options={'compact_siblings': True})
+
+    with caplog.at_level(logging.INFO):
+        assert rerun()._load_previous_capsules() is None
+    assert "different options" in caplog.text
+
+    # A full rebuild records the new options, so the next run can patch it
+    assert rerun().run()
+    assert rerun()._load_previous_capsules()
@@ -0,0 +1,63 @@
+"""
+GraphIndex lookups must match a scan of every capsule
+"""
+
+import pickle
+
+import graph_index
+from graph_index import GeoGrid, GraphIndex, geo_distance
+
+
+def brute_force_nearby(capsules, capsule, radius_km):
+    """IDs within radius_km of a capsule, nearest first, by measuring every capsule"""
+    matches = sorted(
+        (geo_distance(capsule.geo.lat, capsule.geo.lng, other.geo.lat, other.geo.lng), i)
+        for i, other in enumerate(capsules) if other.id != capsule.id
+    )
+    return [capsules[i].id for distance, i in matches if distance <= radius_km]
+
+
+def spread(capsules):
+    """Move synthetic capsules onto a 10 x 10 degree area"""
+    for i, capsule in enumerate(capsules):
+        capsule.geo.lat += (i * 7 % 10) - 5
+        capsule.geo.lng += (i * 3 % 10) - 5
+    return capsules
+
+
+def test_nearby_matches_brute_force(make_capsules):
+    capsules = spread(make_capsules(300))
+    index = GraphIndex(capsules)
+
+    for capsule in capsules[:40]:
+        for radius_km in (25, 100, 400):
+            assert index.nearby(capsule.id, radius_km) == brute_force_nearby(capsules, capsule, radius_km)
+
+
+def test_within_measures_only_nearby_cells(make_capsules, monkeypatch):
+    capsules = spread(make_capsules(300))
+    grid = GeoGrid([(c.geo.lat, c.geo.lng) for c in capsules])
+
+    measured = []
+    monkeypatch.setattr(graph_index, 'geo_distance', lambda *args: measured.append(1) or geo_distance(*args))
+    for lat, lng in grid.points[:40]:
+        grid.within(lat, lng, 100)
+
+    # A full scan would measure 40 * 300 distances
+    assert len(measured) < 40 * len(capsules) / 4
+
+
+def test_pickled_index_answers_lookups(make_capsules):
+    capsules = spread(make_capsules(120))
+    index = GraphIndex(capsules)
+    restored = pickle.loads(pickle.dumps(index))
+
+    assert restored.capsules is None
+    for capsule in capsules[:20]:
+        assert restored.nearby(capsule.id, 100) == index.nearby(capsule.id, 100)
+        position = index.id_to_index[capsule.id]
+        assert restored.siblings(position) == index.siblings(position)
+        assert restored.siblings(position) == [
+            c.id for c in capsules
+            if c.id != capsule.id and (c.type, c.geo.region) == (capsule.type, capsule.geo.region)
+        ]
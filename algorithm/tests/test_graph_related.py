@@ -0,0 +1,71 @@
+"""
+Top-k related links
+"""
+
+import pytest
+
+from graph import GraphBuilder
+
+# (score, position) pairs in position order, with ties at 0.5 and 0.3
+EDGES = [(0.3, 0), (0.5, 1), (0.9, 2), (0.5, 3), (0.3, 4), (0.5, 5), (0.1, 6)]
+
+
+def related(capsules):
+    """Capsule ID -> (related IDs, related weights)"""
+    return {c.id: (c.links.related, c.links.related_weights) for c in capsules}
+
+
+def test_rank_related_orders_by_score_then_position():
+    assert GraphBuilder.rank_related(iter(EDGES)) == EDGES
+    assert GraphBuilder.rank_related(iter(EDGES), by_score=True) == [
+        (0.9, 2), (0.5, 1), (0.5, 3), (0.5, 5), (0.3, 0), (0.3, 4), (0.1, 6)
+    ]
+    # Ties at the cut keep the lowest positions
+    assert GraphBuilder.rank_related(iter(EDGES), 3) == [(0.9, 2), (0.5, 1), (0.5, 3)]
+    assert GraphBuilder.rank_related(iter(EDGES), 5, by_score=True) == [
+        (0.9, 2), (0.5, 1), (0.5, 3), (0.5, 5), (0.3, 0)
+    ]
+    assert GraphBuilder.rank_related(iter(EDGES), 0) == []
+    assert GraphBuilder.rank_related(iter(EDGES), 100) == GraphBuilder.rank_related(iter(EDGES), by_score=True)
+
+
+def test_top_k_keeps_the_best_links_in_descending_order(make_capsules):
+    capsules = GraphBuilder.build_graph(make_capsules(150))
+    positions = {c.id: i for i, c in enumerate(capsules)}
+    unbounded = related(capsules)
+    ranked = related(GraphBuilder.build_graph(make_capsules(150), related_top_k={}))
+    top = related(GraphBuilder.build_graph(make_capsules(150), related_top_k=5))
+
+    assert any(len(ids) > 5 for ids, _ in unbounded.values())
+    for capsule_id, (ids, weights) in unbounded.items():
+        ranked_ids, ranked_weights = ranked[capsule_id]
+        assert weights is None
+        # An empty per-type dict keeps every link, ordered by score
+        assert sorted(ranked_ids, key=positions.get) == ids
+        assert ranked_weights == sorted(ranked_weights, reverse=True)
+
+        top_ids, top_weights = top[capsule_id]
+        assert top_ids == ranked_ids[:5]
+        assert top_weights == ranked_weights[:5]
+
+
+def test_top_k_per_type(make_capsules):
+    ranked = related(GraphBuilder.build_graph(make_capsules(150), related_top_k={}))
+    capsules = GraphBuilder.build_graph(make_capsules(150), related_top_k={'place': 2, 'guide': 0})
+
+    types = {c.type for c in capsules}
+    assert {'place', 'guide'} < types
+    for capsule in capsules:
+        ids, weights = ranked[capsule.id]
+        k = {'place': 2, 'guide': 0}.get(capsule.type, len(ids))
+        assert capsule.links.related == ids[:k]
+        assert capsule.links.related_weights == weights[:k]
+
+
+@pytest.mark.parametrize('engine', ['python', 'numpy'])
+def test_top_k_none_matches_unbounded_output(make_capsules, engine):
+    expected = [c.model_dump() for c in GraphBuilder.build_graph(make_capsules(150), engine=engine)]
+    actual = [c.model_dump() for c in GraphBuilder.build_graph(make_capsules(150), engine=engine,
+                                                               related_top_k=None)]
+    assert actual == expected
+    assert all(c['links']['related_weights'] is None for c in actual)
@@ -0,0 +1,50 @@
+"""
+Similarity scorers
+"""
+
+import itertools
+
+import pytest
+
+from graph import GraphBuilder
+from graph_index import GraphIndex
+from graph_tfidf import TfidfScorer
+
+
+def test_tfidf_rows_match_dict_dot_products(make_capsules):
+    pytest.importorskip('scipy')
+    scorer = TfidfScorer()
+    GraphIndex(make_capsules(120), scorer)
+    assert scorer.matrix is not None
+
+    def cosine(i, j):
+        return min(1.0, sum(w * scorer.vectors[j].get(t, 0.0) for t, w in scorer.vectors[i].items()))
+
+    everyone = list(range(120))
+    for i in range(0, 120, 7):
+        expected = [cosine(i, j) for j in everyone]
+        assert scorer.scores(i, everyone) == pytest.approx(expected, abs=1e-12)
+        assert scorer.row(i)[everyone] == pytest.approx(expected, abs=1e-12)
+        # Pair scores do not depend on the order of calls
+        assert [scorer.similarity(j, i) for j in everyone] == pytest.approx(expected, abs=1e-12)
+
+
+@pytest.mark.parametrize('scorer', ['jaccard', 'tfidf'])
+def test_scores_match_pair_similarities(make_capsules, scorer):
+    index = GraphIndex(make_capsules(80), GraphBuilder.create_scorer(scorer))
+
+    for i in range(0, 80, 9):
+        candidates = sorted(index.token_candidates(i))
+        assert index.scores(i, candidates) == pytest.approx(
+            [index.similarity(i, j) for j in candidates], abs=1e-12)
+    assert index.scores(0, []) == []
+
+
+def test_tfidf_scores_are_zero_without_shared_tokens(make_capsules):
+    capsules = make_capsules(60)
+    scorer = TfidfScorer()
+    index = GraphIndex(capsules, scorer)
+
+    for i, j in itertools.combinations(range(60), 2):
+        if not index.tokens[i] & index.tokens[j]:
+            assert scorer.similarity(i, j) == 0
@@ -0,0 +1,252 @@
+"""
+Feed ingestion: streaming parser, conditional requests and the pipeline skip
+"""
+
+import functools
+import gzip
+import hashlib
+import http.server
+import json
+import threading
+
+import pytest
+
+from ingest import CapsuleStream, DataIngestionError, DataIngestor
+from ingest_async import AsyncIngestor, FeedSource
+from orchestrator import AlgorithmOrchestrator
+from conftest import SAMPLE_FEED
+
+
+def chunked(body: bytes, size: int):
+    """Split a body into chunks of size bytes"""
+    return [body[i:i + size] for i in range(0, len(body), size)]
+
+
+DOCUMENTS = [
+    b'{"capsules": [{"id": "a", "geo": {"region": "x"}, "w": 1.5e-3}, {"id": "b", "v": [10, 20.25]}],'
+    b' "tail": 1.5}',
+    b'{"version": -0.125, "capsules": [1e5, -0.25, true, null, "\u00e9t\u00e9"], "count": 123}',
+    '{"capsules": [{"title": "Озеро Рица"}], "n": 7}'.encode('utf-8'),
+]
+
+
+@pytest.mark.parametrize('document', DOCUMENTS)
+@pytest.mark.parametrize('size', [1, 2, 3, 7, 64 * 1024])
+def test_stream_matches_json_loads_at_every_chunk_size(document, size):
+    expected = json.loads(document)
+    stream = CapsuleStream(chunked(document, size))
+
+    assert list(stream) == expected.pop('capsules')
+    assert stream.metadata == expected
+    assert stream.count == len(json.loads(document)['capsules'])
+
+
+@pytest.mark.parametrize('size', [1, 2, 64 * 1024])
+def test_stream_accepts_a_byte_order_mark(size):
+    body = b'\xef\xbb\xbf' + DOCUMENTS[2]
+    assert list(CapsuleStream(chunked(body, size))) == json.loads(body)['capsules']
+    # Only at the start of the document
+    with pytest.raises(DataIngestionError):
+        list(CapsuleStream(chunked(DOCUMENTS[2].replace(b'[', b'[\xef\xbb\xbf'), size)))
+
+
+@pytest.mark.parametrize('size', [1, 64 * 1024])
+def test_stream_rejects_data_after_the_document(size):
+    for body in (b'{"capsules": [1]} x', b'{"capsules": [1]}{"capsules": [2]}'):
+        with pytest.raises(DataIngestionError):
+            list(CapsuleStream(chunked(body, size)))
+
+    assert list(CapsuleStream(chunked(b'{"capsules": [1]}\n  ', size))) == [1]
+    documents = [chunked(b'{"capsules": [1]} ', size), chunked(b'{"capsules": [2]}', size)]
+    assert list(CapsuleStream(documents, shards=True)) == [1, 2]
+
+
+class QuietHandler(http.server.SimpleHTTPRequestHandler):
+    """Static file handler without request logging"""
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def feed_server(tmp_path):
+    """Serve tmp_path/www over HTTP; yields the base URL"""
+    root = tmp_path / 'www'
+    root.mkdir()
+    handler = functools.partial(QuietHandler, directory=str(root))
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def sample_feed(tmp_path, feed_server):
+    """URL of the sample feed served over HTTP"""
+    (tmp_path / 'www' / 'capsules.json').write_bytes(SAMPLE_FEED.read_bytes())
+    return f"{feed_server}/capsules.json"
+
+
+def test_byte_order_mark_is_accepted_in_both_modes(tmp_path, feed_server):
+    body = b'\xef\xbb\xbf{"capsules": [{"id": "a"}]}'
+    (tmp_path / 'www' / 'capsules.json').write_bytes(body)
+    (tmp_path / 'capsules.json').write_bytes(body)
+
+    for source in (f"{feed_server}/capsules.json", str(tmp_path / 'capsules.json')):
+        assert DataIngestor(source).fetch_live_data() == {'capsules': [{'id': 'a'}]}
+        assert list(DataIngestor(source).stream_live_data()) == [{'id': 'a'}]
+
+
+def test_not_modified_uses_cached_copy(tmp_path, sample_feed):
+    cache_dir = str(tmp_path / 'cache')
+    first = DataIngestor(sample_feed, cache_dir=cache_dir)
+    data = first.fetch_live_data()
+    assert not first.not_modified
+
+    second = DataIngestor(sample_feed, cache_dir=cache_dir)
+    assert second.fetch_live_data() == data
+    assert second.not_modified
+    assert second.content_hash == first.content_hash
+
+    stream = DataIngestor(sample_feed, cache_dir=cache_dir).stream_live_data()
+    assert list(stream) == data['capsules']
+    assert stream.content_hash == first.content_hash
+
+
+def test_unchanged_feed_skips_the_pipeline(tmp_path, sample_feed, monkeypatch):
+    mapped = []
+    map_and_validate = AlgorithmOrchestrator._map_and_validate
+    monkeypatch.setattr(AlgorithmOrchestrator, '_map_and_validate',
+                        lambda self, raw: mapped.append(1) or map_and_validate(self, raw))
+
+    def run():
+        return AlgorithmOrchestrator(sample_feed, str(tmp_path / 'public'),
+                                     feed_cache_dir=str(tmp_path / 'cache')).run()
+
+    assert run() and len(mapped) == 1
+    assert run() and len(mapped) == 1
+
+    # New algorithm code rebuilds the outputs of an unchanged feed
+    monkeypatch.setattr(AlgorithmOrchestrator, 'code_fingerprint', staticmethod(lambda: 'new code'))
+    assert run() and len(mapped) == 2
+    assert run() and len(mapped) == 2
+
+
+@pytest.fixture
+def shard_dir(tmp_path):
+    """Snapshot directory of two shards, the second gzip-compressed"""
+    shards = tmp_path / 'shards'
+    shards.mkdir()
+    (shards / 'a.json').write_text(json.dumps({'capsules': [{'id': 'a'}, {'id': 'b'}], 'version': '1'}))
+    (shards / 'b.json.gz').write_bytes(gzip.compress(json.dumps(
+        {'capsules': [{'id': 'c'}], 'version': '2', 'extra': 1.5}).encode('utf-8')))
+    return shards
+
+
+def test_local_fetch_and_stream_agree(tmp_path, shard_dir):
+    cache_dir = str(tmp_path / 'cache')
+    ingestor = DataIngestor(str(shard_dir), cache_dir=cache_dir)
+    data = ingestor.fetch_live_data()
+    assert data == {'capsules': [{'id': 'a'}, {'id': 'b'}, {'id': 'c'}], 'version': '1', 'extra': 1.5}
+    assert not ingestor.not_modified
+
+    again = DataIngestor(str(shard_dir), cache_dir=cache_dir)
+    assert again.fetch_live_data() == data
+    assert again.not_modified
+
+    stream = DataIngestor(str(shard_dir)).stream_live_data()
+    assert list(stream) == data['capsules']
+    assert stream.content_hash == ingestor.content_hash
+
+
+def local_modes(source):
+    """Read a local snapshot with fetch_live_data and with stream_live_data"""
+    yield lambda: DataIngestor(str(source)).fetch_live_data()
+    yield lambda: list(DataIngestor(str(source)).stream_live_data())
+
+
+def test_concatenated_documents_fail_in_both_modes(tmp_path):
+    snapshot = tmp_path / 'capsules.json'
+    snapshot.write_bytes(b'{"capsules": [{"id": "a"}]}{"capsules": [{"id": "b"}]}')
+
+    for read in local_modes(snapshot):
+        with pytest.raises(DataIngestionError, match='extra data'):
+            read()
+
+
+def test_truncated_shard_fails_in_both_modes(tmp_path):
+    shards = tmp_path / 'shards'
+    shards.mkdir()
+    # Together the two shards would form one valid document
+    (shards / 'a.json').write_bytes(b'{"capsules": [{"id": "a"},')
+    (shards / 'b.json').write_bytes(b' {"id": "b"}]}')
+
+    for read in local_modes(shards):
+        with pytest.raises(DataIngestionError):
+            read()
+
+
+def test_empty_shard_fails_in_both_modes(shard_dir):
+    (shard_dir / 'c.json').write_bytes(b'')
+
+    with pytest.raises(DataIngestionError, match='c.json is empty'):
+        DataIngestor(str(shard_dir)).fetch_live_data()
+    with pytest.raises(DataIngestionError, match='c.json is empty'):
+        list(DataIngestor(str(shard_dir)).stream_live_data())
+
+
+def test_snapshots_of_the_same_second_are_kept(tmp_path, sample_feed):
+    snapshot_dir = tmp_path / 'snapshots'
+    data = [DataIngestor(sample_feed, snapshot_dir=str(snapshot_dir)).fetch_live_data() for _ in range(2)]
+
+    snapshots = sorted(snapshot_dir.iterdir())
+    assert len(snapshots) == 2
+    for snapshot, fetched in zip(snapshots, data):
+        assert DataIngestor(str(snapshot)).fetch_live_data() == fetched
+
+
+def test_compressed_body_is_decompressed(tmp_path, feed_server):
+    (tmp_path / 'www' / 'capsules.json.gz').write_bytes(gzip.compress(SAMPLE_FEED.read_bytes()))
+    ingestor = DataIngestor(f"{feed_server}/capsules.json.gz")
+
+    assert ingestor.fetch_live_data() == json.loads(SAMPLE_FEED.read_bytes())
+    assert ingestor.content_hash == hashlib.sha256(SAMPLE_FEED.read_bytes()).hexdigest()
+
+
+def test_source_names_must_be_unique():
+    AsyncIngestor(['https://a.example/capsules.json', 'https://b.example/capsules.json'])
+    with pytest.raises(ValueError, match='Duplicate source names'):
+        AsyncIngestor([FeedSource('https://a.example/capsules.json', name='feed'),
+                       FeedSource('https://b.example/capsules.json', name='feed')])
+
+
+def test_failed_source_uses_its_last_good_copy(tmp_path, feed_server):
+    www = tmp_path / 'www'
+    (www / 'a.json').write_text(json.dumps({'capsules': [{'id': 'a', 'metadata': None}]}))
+    (www / 'b.json').write_text(json.dumps({'capsules': [{'id': 'b'}]}))
+    sources = [f"{feed_server}/a.json", f"{feed_server}/b.json"]
+
+    def fetch():
+        ingestor = AsyncIngestor(sources, cache_dir=str(tmp_path / 'cache'), retries=0)
+        try:
+            return ingestor.fetch()
+        finally:
+            ingestor.close()
+
+    data = fetch()
+    assert [c['metadata']['source'] for c in data['capsules']] == sources
+    assert not any(s['stale'] for s in data['sources'])
+
+    (www / 'b.json').unlink()
+    data = fetch()
+    assert [c['id'] for c in data['capsules']] == ['a', 'b']
+    assert [s['stale'] for s in data['sources']] == [False, True]
+
+    # Without a cached copy the whole ingestion fails
+    sources.append(f"{feed_server}/c.json")
+    with pytest.raises(DataIngestionError, match='c.json'):
+        fetch()
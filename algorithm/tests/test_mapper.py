@@ -0,0 +1,51 @@
+"""
+Bulk and per-capsule schema mapping must map the same capsules
+"""
+
+from mapper import SchemaMapper
+
+EDGE_CASES = [
+    # Only the required fields
+    {'id': 'minimal', 'type': 'place', 'title': 'Minimal'},
+    # Every field, with link fields written by the graph stages
+    {
+        'id': 'full', 'type': 'guide', 'tier': 3, 'slug': 'guide/full', 'title': 'Full', 'emoji': '🧭',
+        'geo': {'lat': 43.1, 'lng': 40.2, 'region': 'gagra'},
+        'links': {
+            'parent': ['minimal'], 'children': [], 'related': ['minimal'], 'siblings': [],
+            'related_weights': [0.5], 'recommended': ['minimal'], 'sibling_group': 'guide:gagra',
+        },
+        'seo': {'title': 'SEO', 'description': 'Described', 'keywords': ['a', 'b']},
+        'content': 'Text', 'metadata': {'created': '2024-01-01', 'source': 'feed'},
+        'unknown': 'ignored',
+    },
+    # Partial nested objects fall back to the defaults
+    {'id': 'partial', 'type': 'product', 'title': 'Partial', 'geo': {'region': 'sukhum'},
+     'seo': {'description': 'Only a description'}, 'links': {'related': ['full']}},
+    # Coordinates given as numeric strings are coerced
+    {'id': 'string-coords', 'type': 'place', 'title': 'Coords', 'geo': {'lat': '43.5', 'lng': '40'}},
+    # Invalid records
+    {'id': 'bad-coords', 'type': 'place', 'title': 'Bad', 'geo': {'lat': 'north', 'lng': 40}},
+    {'id': 'bad-type', 'type': 'hotel', 'title': 'Bad type'},
+    {'id': 'bad-tier', 'type': 'place', 'title': 'Bad tier', 'tier': 7},
+    {'id': 'no-title', 'type': 'place'},
+    {'type': 'place', 'title': 'No id'},
+    {'id': 'null-content', 'type': 'place', 'title': 'Null content', 'content': None},
+    'not a capsule',
+]
+
+
+def test_bulk_mapping_matches_per_capsule():
+    per_capsule = SchemaMapper.map_collection({'capsules': EDGE_CASES})
+    bulk = SchemaMapper.map_collection({'capsules': EDGE_CASES}, bulk=True)
+
+    assert [c.model_dump() for c in bulk.capsules] == [c.model_dump() for c in per_capsule.capsules]
+    assert [c.id for c in per_capsule.capsules] == ['minimal', 'full', 'partial', 'string-coords']
+    assert bulk.metadata == per_capsule.metadata
+    assert per_capsule.metadata['errors'] == 7
+
+    links = per_capsule.capsules[1].links
+    assert links.related_weights == [0.5]
+    assert links.recommended == ['minimal']
+    assert links.sibling_group == 'guide:gagra'
+
@@ -0,0 +1,74 @@
+"""
+Personalized PageRank recommendations
+"""
+
+import pytest
+
+from graph import GraphBuilder
+from graph_artifact import GraphArtifact
+from recommend import Recommender
+
+
+def star(leaves: int) -> GraphArtifact:
+    """Hub node 0 linked both ways to every leaf"""
+    nodes = [f"n{i}" for i in range(leaves + 1)]
+    offsets = [0, leaves] + [leaves + i for i in range(1, leaves + 1)]
+    targets = list(range(1, leaves + 1)) + [0] * leaves
+    return GraphArtifact(nodes, offsets, targets, [3] * len(targets))
+
+
+def pagerank_paths(artifact, max_entries):
+    """Scores of the sparse and the pure-Python power iteration"""
+    probabilities = Recommender.transition_weights(artifact)
+    args = (artifact, probabilities, 0.85, 20, max_entries)
+    return Recommender._pagerank_sparse(*args), Recommender._pagerank_python(*args)
+
+
+def assert_scores_match(actual, expected):
+    assert len(actual) == len(expected)
+    for row, other in zip(actual, expected):
+        assert row.keys() == other.keys()
+        for node, score in row.items():
+            assert score == pytest.approx(other[node], rel=1e-9, abs=1e-15)
+
+
+@pytest.mark.parametrize('max_entries', [10_000, 20])
+def test_sparse_and_python_paths_agree(make_capsules, max_entries):
+    pytest.importorskip('scipy')
+    capsules = GraphBuilder.build_graph(make_capsules(120), related_top_k=8)
+    artifact = GraphArtifact.from_capsules(capsules)
+
+    sparse_scores, python_scores = pagerank_paths(artifact, max_entries)
+    assert_scores_match(sparse_scores, python_scores)
+    for row in python_scores:
+        assert len(row) <= max_entries
+        assert sum(row.values()) == pytest.approx(1.0)
+
+
+def test_truncation_keeps_ties_by_position():
+    pytest.importorskip('scipy')
+    sparse_scores, python_scores = pagerank_paths(star(50), 5)
+    assert_scores_match(sparse_scores, python_scores)
+    # A leaf keeps itself, the hub and the lowest-numbered leaves
+    assert sorted(python_scores[7]) == [0, 1, 2, 3, 7]
+
+
+def test_dense_graph_gets_full_rankings():
+    # Every leaf spreads less than 1e-3 to each other leaf through the hub
+    artifact = star(1500)
+    scores = Recommender.personalized_pagerank(artifact)
+    assert all(len(row) == 200 for row in scores)
+
+    for i, row in enumerate(scores):
+        ranked = sorted((node for node in row if node != i), key=lambda node: (-row[node], node))
+        assert ranked[0] == (0 if i else 1)
+
+
+def test_recommend_fills_every_list(make_capsules):
+    capsules = GraphBuilder.build_graph(make_capsules(400))
+    degrees = [len(c.links.related) for c in capsules]
+    assert sum(degrees) / len(degrees) > 50
+
+    Recommender.recommend(capsules, count=10)
+    assert all(len(c.links.recommended) == 10 for c in capsules)
+    assert all(c.id not in c.links.recommended for c in capsules)
@@ -0,0 +1,68 @@
+"""
+Capsule records must round-trip to the same models and outputs
+"""
+
+from datetime import datetime
+
+import pytest
+
+import enrich
+import orchestrator
+from graph import GraphBuilder
+from orchestrator import AlgorithmOrchestrator
+from records import CapsuleRecord, to_models, to_records
+from conftest import SAMPLE_FEED
+
+
+class FixedDatetime(datetime):
+    """datetime whose now() is always the same instant"""
+
+    @classmethod
+    def now(cls, tz=None):
+        return cls(2025, 12, 2, 22, 0, 0)
+
+
+def test_records_round_trip(make_capsules):
+    capsules = GraphBuilder.build_graph(make_capsules(60), related_top_k=3, compact_siblings=True)
+    capsules[0].links.recommended = [capsules[1].id]
+    capsules[1].seo.keywords = []
+    assert capsules[0].links.related_weights and capsules[0].links.sibling_group
+
+    records = to_records(capsules)
+    assert all(isinstance(r, CapsuleRecord) for r in records)
+    assert [r.dict() for r in records] == [c.dict() for c in capsules]
+    assert [r.dict(exclude_none=True) for r in records] == [c.dict(exclude_none=True) for c in capsules]
+
+    models = to_models(records)
+    assert [m.model_dump() for m in models] == [c.model_dump() for c in capsules]
+    assert [r.to_model().model_dump() for r in records] == [c.model_dump() for c in capsules]
+    # Models pass through unchanged
+    assert to_models(capsules[:2]) == capsules[:2]
+
+
+def test_records_reject_invalid_values(make_capsules):
+    records = to_records(make_capsules(3))
+    records[1].tier = 7
+    with pytest.raises(ValueError):
+        to_models(records)
+
+
+@pytest.mark.parametrize('graph_options', [{}, {'related_top_k': 3, 'compact_siblings': True}])
+def test_orchestrator_outputs_match_with_records(tmp_path, monkeypatch, graph_options):
+    monkeypatch.setattr(orchestrator, 'datetime', FixedDatetime)
+    monkeypatch.setattr(enrich, 'datetime', FixedDatetime)
+    feed = tmp_path / 'capsules.json'
+    feed.write_bytes(SAMPLE_FEED.read_bytes())
+
+    outputs = {}
+    for capsule_records in (False, True):
+        output_dir = tmp_path / f"records-{capsule_records}"
+        assert AlgorithmOrchestrator(str(feed), str(output_dir), graph_options=graph_options,
+                                     capsule_records=capsule_records).run()
+        outputs[capsule_records] = {
+            name: (output_dir / name).read_bytes() for name in AlgorithmOrchestrator.OUTPUT_FILES
+        }
+
+    assert outputs[True]['capsules.json'] == outputs[False]['capsules.json']
+    assert outputs[True]['graph.json'] == outputs[False]['graph.json']
+    assert outputs[True] == outputs[False]
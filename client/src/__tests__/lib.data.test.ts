@@ -1,5 +1,11 @@
 import { describe, it, expect, beforeAll } from "vitest";
-import { fetchCapsules, fetchCapsuleBySlug, CapsuleSchema } from "@/lib/data";
+import {
+  fetchCapsules,
+  fetchCapsuleBySlug,
+  expandSiblingGroups,
+  CapsuleSchema,
+  type Capsule,
+} from "@/lib/data";
 
 describe("Data Layer - Capsule Fetching", () => {
   let capsules: any[] = [];
@@ -74,3 +80,59 @@ describe("Data Layer - Capsule Fetching", () => {
     }
   });
 });
+
+function capsule(id: string, siblingGroup?: string): Capsule {
+  return {
+    id,
+    type: "place",
+    tier: 1,
+    slug: id,
+    title: id,
+    emoji: "",
+    season: [],
+    duration: "",
+    geo: { lat: 43, lng: 41, region: "gagra" },
+    links: {
+      parent: [],
+      children: [],
+      siblings: [],
+      related: [],
+      sibling_group: siblingGroup,
+    },
+    seo: { title: id, description: id, keywords: [] },
+    metadata: { created: "2025-01-01", updated: "2025-01-01", version: "1.0" },
+    content: "",
+  };
+}
+
+describe("Data Layer - Sibling Groups", () => {
+  it("should restore siblings from compact groups", () => {
+    const capsules = expandSiblingGroups(
+      [capsule("a", "place:gagra"), capsule("b", "place:gagra"), capsule("c", "place:gagra")],
+      { "place:gagra": ["a", "b", "c"] }
+    );
+    expect(capsules.map(c => c.links.siblings)).toEqual([
+      ["b", "c"],
+      ["a", "c"],
+      ["a", "b"],
+    ]);
+  });
+
+  it("should leave capsules without a group unchanged", () => {
+    const loner = capsule("d");
+    loner.links.siblings = ["x"];
+    const [result] = expandSiblingGroups([loner], { "place:gagra": ["a", "b"] });
+    expect(result.links.siblings).toEqual(["x"]);
+  });
+
+  it("should ignore unknown groups", () => {
+    const [result] = expandSiblingGroups([capsule("a", "missing")], {});
+    expect(result.links.siblings).toEqual([]);
+  });
+
+  it("should pass capsules through without groups", () => {
+    const capsules = [capsule("a", "place:gagra")];
+    expect(expandSiblingGroups(capsules)).toBe(capsules);
+    expect(capsules[0].links.siblings).toEqual([]);
+  });
+});
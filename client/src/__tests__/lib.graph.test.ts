@@ -0,0 +1,54 @@
+import { describe, it, expect } from "vitest";
+import { GraphArtifactSchema, neighbors, type EdgeType, type GraphArtifact } from "@/lib/graph";
+
+// a -> b (parent), a -> c (related), b -> a (children), c has no edges
+const graph: GraphArtifact = {
+  format: "csr",
+  version: 1,
+  edge_types: ["parent", "children", "related", "siblings"],
+  nodes: ["a", "b", "c"],
+  offsets: [0, 2, 3, 3],
+  targets: [1, 2, 0],
+  types: [0, 2, 1],
+  weights: [1, 0.4, 1],
+};
+
+describe("Graph Artifact", () => {
+  it("should validate the CSR artifact", () => {
+    expect(GraphArtifactSchema.safeParse(graph).success).toBe(true);
+  });
+
+  it("should accept recorded build options", () => {
+    const result = GraphArtifactSchema.safeParse({
+      ...graph,
+      build: { engine: "python", related_top_k: 5 },
+    });
+    expect(result.success).toBe(true);
+  });
+
+  it("should reject other formats", () => {
+    expect(GraphArtifactSchema.safeParse({ ...graph, format: "adjacency" }).success).toBe(false);
+  });
+
+  it("should list every neighbor without an edge type", () => {
+    expect(neighbors(graph, 0)).toEqual([1, 2]);
+    expect(neighbors(graph, 1)).toEqual([0]);
+  });
+
+  it("should filter neighbors by edge type", () => {
+    expect(neighbors(graph, 0, "parent")).toEqual([1]);
+    expect(neighbors(graph, 0, "related")).toEqual([2]);
+    expect(neighbors(graph, 0, "siblings")).toEqual([]);
+    expect(neighbors(graph, 1, "children")).toEqual([0]);
+  });
+
+  it("should return no neighbors for an unknown edge type", () => {
+    const older = { ...graph, edge_types: ["parent", "children", "related"] };
+    expect(neighbors(older, 0, "siblings")).toEqual([]);
+    expect(neighbors(graph, 0, "sponsored" as EdgeType)).toEqual([]);
+  });
+
+  it("should return no neighbors for a node without edges", () => {
+    expect(neighbors(graph, 2)).toEqual([]);
+  });
+});
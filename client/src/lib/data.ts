@@ -19,6 +19,8 @@ export const CapsuleSchema = z.object({
     children: z.array(z.string()),
     siblings: z.array(z.string()),
     related: z.array(z.string()),
+    sibling_group: z.string().optional(),
+    recommended: z.array(z.string()).optional(),
   }),
   seo: z.object({
     title: z.string(),
@@ -41,7 +43,26 @@ export async function fetchCapsules(): Promise<Capsule[]> {
     throw new Error("Failed to fetch capsules");
   }
   const data = await response.json();
-  return z.array(CapsuleSchema).parse(data.capsules);
+  const capsules = z.array(CapsuleSchema).parse(data.capsules);
+  return expandSiblingGroups(capsules, data.sibling_groups);
+}
+
+// Compact capsules.json stores sibling membership once per group; restore
+// the per-capsule siblings lists the rest of the client expects.
+export function expandSiblingGroups(
+  capsules: Capsule[],
+  groups?: Record<string, string[]>
+): Capsule[] {
+  if (!groups) return capsules;
+  for (const capsule of capsules) {
+    const members = capsule.links.sibling_group
+      ? groups[capsule.links.sibling_group]
+      : undefined;
+    if (members) {
+      capsule.links.siblings = members.filter(id => id !== capsule.id);
+    }
+  }
+  return capsules;
 }
 
 export async function fetchCapsuleBySlug(
@@ -0,0 +1,48 @@
+import { z } from "zod";
+
+export const EDGE_TYPES = ["parent", "children", "related", "siblings"] as const;
+export type EdgeType = (typeof EDGE_TYPES)[number];
+
+export const GraphArtifactSchema = z.object({
+  format: z.literal("csr"),
+  version: z.number(),
+  edge_types: z.array(z.string()),
+  nodes: z.array(z.string()),
+  offsets: z.array(z.number()),
+  targets: z.array(z.number()),
+  types: z.array(z.number()),
+  weights: z.array(z.number()).optional(),
+  build: z.record(z.unknown()).optional(),
+});
+
+export type GraphArtifact = z.infer<typeof GraphArtifactSchema>;
+
+/**
+ * Load the CSR knowledge graph (graph.json) emitted by the algorithm
+ * Edges of node i are targets[offsets[i]..offsets[i + 1]]
+ */
+export async function fetchGraph(): Promise<GraphArtifact> {
+  const response = await fetch("/graph.json");
+  if (!response.ok) {
+    throw new Error("Failed to fetch graph");
+  }
+  return GraphArtifactSchema.parse(await response.json());
+}
+
+export function neighbors(
+  graph: GraphArtifact,
+  node: number,
+  edgeType?: EdgeType
+): number[] {
+  const wanted = edgeType === undefined ? -1 : graph.edge_types.indexOf(edgeType);
+  if (edgeType !== undefined && wanted < 0) {
+    return [];
+  }
+  const result: number[] = [];
+  for (let e = graph.offsets[node]; e < graph.offsets[node + 1]; e++) {
+    if (wanted < 0 || graph.types[e] === wanted) {
+      result.push(graph.targets[e]);
+    }
+  }
+  return result;
+}
@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""
+Graph Engine Benchmark Script
+Compares GraphBuilder engines on a capsules.json file
+
+Usage:
+    python3 scripts/benchmark_graph.py recall [--input PATH] [--permutations N] [--bands N]
+    python3 scripts/benchmark_graph.py speedup [--input PATH] [--capsules N] [--workers LIST]
+    python3 scripts/benchmark_graph.py scorers [--input PATH] [--capsules N] [--engine NAME] [--k N] [--spread DEG]
+    python3 scripts/benchmark_graph.py mapping [--input PATH] [--sizes LIST] [--repeat N]
+    python3 scripts/benchmark_graph.py records [--input PATH] [--capsules N] [--repeat N]
+
+Examples:
+    python3 scripts/benchmark_graph.py recall
+    python3 scripts/benchmark_graph.py recall --permutations 256 --bands 128
+    python3 scripts/benchmark_graph.py speedup --capsules 5000 --workers 1,2,4,8,16
+    python3 scripts/benchmark_graph.py scorers --capsules 2000 --engine numpy
+    python3 scripts/benchmark_graph.py mapping --sizes 1000,10000,100000
+    python3 scripts/benchmark_graph.py records --capsules 100000
+"""
+
+import argparse
+import copy
+import gc
+import json
+import logging
+import os
+import random
+import sys
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+from typing import Optional
+
+# Add algorithm directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'algorithm'))
+
+from mapper import SchemaMapper
+from enrich import ContentEnricher
+from records import to_models, to_records
+from graph import GraphBuilder
+from graph_index import GraphIndex
+from graph_lsh import MinHashGraphEngine
+
+DEFAULT_INPUT = Path(__file__).parent.parent / 'client' / 'public' / 'capsules.json'
+
+
+def load_capsules(path: Path):
+    """Load and map capsules from a capsules.json file"""
+    with open(path, 'r', encoding='utf-8') as f:
+        raw_data = json.load(f)
+    return SchemaMapper.map_collection(raw_data).capsules
+
+
+def synthesize_raw(path: Path, count: int, seed: int = 1, spread: float = 0.5):
+    """
+    Build synthetic source capsules by varying the capsules of a capsules.json
+
+    Each synthetic capsule copies a source capsule, keeps a random 60% of its
+    words and jitters its coordinates by up to spread degrees (half a degree
+    by default).
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        source = json.load(f)['capsules']
+
+    rng = random.Random(seed)
+    capsules = []
+    for i in range(count):
+        capsule = copy.deepcopy(source[i % len(source)])
+        words = capsule['content'].split()
+        capsule['content'] = ' '.join(w for w in words if rng.random() < 0.6)
+        capsule['id'] = f"{capsule['id']}-{i}"
+        capsule['slug'] = f"{capsule['slug']}-{i}"
+        capsule['geo']['lat'] += rng.uniform(-spread, spread)
+        capsule['geo']['lng'] += rng.uniform(-spread, spread)
+        capsule['links'] = {}
+        capsules.append(capsule)
+
+    return capsules
+
+
+def synthesize(path: Path, count: int, seed: int = 1, spread: float = 0.5):
+    """Build and map a synthetic collection (see synthesize_raw)"""
+    return SchemaMapper.map_collection({'capsules': synthesize_raw(path, count, seed, spread)}).capsules
+
+
+def link_pairs(capsules, link_type: str) -> set:
+    """Collect (capsule, target) pairs for one link type"""
+    return {(c.id, target) for c in capsules for target in getattr(c.links, link_type)}
+
+
+def recall(found: set, expected: set) -> float:
+    """Fraction of expected pairs that were found"""
+    return len(found & expected) / len(expected) if expected else 1.0
+
+
+def run_recall(args) -> int:
+    """Compare MinHash/LSH links and candidate pairs against the exact engine"""
+    exact = load_capsules(args.input)
+    start = time.perf_counter()
+    GraphBuilder.build_graph(exact, engine='python')
+    exact_time = time.perf_counter() - start
+
+    approx = load_capsules(args.input)
+    start = time.perf_counter()
+    GraphBuilder.build_graph(approx, engine='minhash',
+                             minhash_permutations=args.permutations,
+                             minhash_bands=args.bands)
+    approx_time = time.perf_counter() - start
+
+    # Text-only recall: pairs above each similarity threshold that LSH proposes
+    index = GraphIndex(exact)
+    engine = MinHashGraphEngine(exact, index, args.permutations, args.bands)
+    candidates = engine.candidate_pairs()
+    n = len(exact)
+    similar = {
+        threshold: {(i, j) for i in range(n) for j in range(i + 1, n) if index.similarity(i, j) > threshold}
+        for threshold in (GraphBuilder.PARENT_THRESHOLD, GraphBuilder.RELATED_THRESHOLD)
+    }
+    proposed = {(i, j) for i, partners in candidates.items() for j in partners if i < j}
+
+    print("=" * 70)
+    print("MinHash/LSH Recall Report")
+    print("=" * 70)
+    print(f"Input: {args.input}")
+    print(f"Capsules: {n}")
+    print(f"Signature length: {args.permutations}, bands: {args.bands} "
+          f"({args.permutations // args.bands} rows per band)")
+    print(f"Exact engine: {exact_time:.2f}s, MinHash engine: {approx_time:.2f}s")
+    print("-" * 70)
+    for link_type in ('parent', 'related'):
+        expected = link_pairs(exact, link_type)
+        found = link_pairs(approx, link_type)
+        print(f"{link_type:>8} links: {len(found)}/{len(expected)} "
+              f"recall {recall(found, expected):.3f}")
+    for threshold, pairs in similar.items():
+        print(f"Jaccard > {threshold:.2f} pairs: {len(pairs)} "
+              f"candidate recall {recall(proposed, pairs):.3f}")
+    print(f"Candidate pairs scored: {len(proposed)} of {n * (n - 1) // 2}")
+    return 0
+
+
+def run_speedup(args) -> int:
+    """Time the parallel python engine across worker counts"""
+    worker_counts = [int(w) for w in args.workers.split(',')]
+    print("=" * 70)
+    print("Parallel Graph Build Speedup")
+    print("=" * 70)
+    print(f"Capsules: {args.capsules} (synthesized from {args.input})")
+    print(f"CPUs available: {os.cpu_count()}")
+    print("-" * 70)
+    print(f"{'workers':>8} {'seconds':>10} {'speedup':>8}")
+
+    baseline = None
+    reference = None
+    for workers in worker_counts:
+        capsules = synthesize(args.input, args.capsules)
+        start = time.perf_counter()
+        GraphBuilder.build_graph(capsules, workers=workers)
+        elapsed = time.perf_counter() - start
+
+        links = [c.links for c in capsules]
+        if reference is None:
+            reference = links
+        elif links != reference:
+            print(f"Output with {workers} workers differs from {worker_counts[0]} workers")
+            return 1
+
+        baseline = baseline or elapsed
+        print(f"{workers:>8} {elapsed:>10.2f} {baseline / elapsed:>7.2f}x")
+    return 0
+
+
+def neighbor_precision(index: GraphIndex, labels, k: Optional[int] = None) -> float:
+    """
+    Fraction of each capsule's k most text-similar capsules that share its label
+
+    Synthetic capsules copied from the same source capsule share a label, so
+    a scorer that ranks them first separates real matches from capsules that
+    only share common words. Without k, each capsule uses the number of
+    other capsules sharing its label (R-precision).
+    """
+    label_sizes = Counter(labels)
+    hits = total = 0
+    for i in range(len(labels)):
+        limit = k if k is not None else label_sizes[labels[i]] - 1
+        candidates = list(index.token_candidates(i))
+        ranked = sorted(zip(index.scores(i, candidates), (-j for j in candidates)), reverse=True)[:limit]
+        hits += sum(1 for _, j in ranked if labels[-j] == labels[i])
+        total += limit
+    return hits / total if total else 0.0
+
+
+def related_precision(capsules, labels) -> float:
+    """Fraction of related links that join copies of the same source capsule"""
+    label_of = dict(zip((c.id for c in capsules), labels))
+    links = [(label_of[c.id], label_of[r]) for c in capsules for r in c.links.related]
+    return sum(1 for a, b in links if a == b) / len(links) if links else 0.0
+
+
+def run_scorers(args) -> int:
+    """Compare build time and edge quality of the similarity scorers"""
+    print("=" * 70)
+    print("Similarity Scorer Comparison")
+    print("=" * 70)
+    print(f"Capsules: {args.capsules} (synthesized from {args.input}, spread {args.spread} degrees), "
+          f"engine: {args.engine}")
+    print("-" * 70)
+    print(f"{'scorer':>8} {'seconds':>8} {'parents':>8} {'related':>8} {'neighbors':>10} {'related':>8}")
+    print(f"{'':>8} {'':>8} {'':>8} {'':>8} {'precision':>10} {'precision':>8}")
+
+    for scorer in GraphBuilder.SCORERS:
+        capsules = synthesize(args.input, args.capsules, spread=args.spread)
+        labels = [c.id.rsplit('-', 1)[0] for c in capsules]
+
+        start = time.perf_counter()
+        GraphBuilder.build_graph(capsules, engine=args.engine, scorer=scorer)
+        elapsed = time.perf_counter() - start
+
+        index = GraphIndex(capsules, GraphBuilder.create_scorer(scorer))
+        parents = sum(len(c.links.parent) for c in capsules)
+        related = sum(len(c.links.related) for c in capsules)
+        precision = neighbor_precision(index, labels, args.k)
+        print(f"{scorer:>8} {elapsed:>8.2f} {parents:>8} {related:>8} {precision:>10.3f} "
+              f"{related_precision(capsules, labels):>9.3f}")
+    return 0
+
+
+def run_mapping(args) -> int:
+    """Compare per-capsule and bulk schema mapping"""
+    print("=" * 70)
+    print("Schema Mapping: per-capsule vs bulk TypeAdapter")
+    print("=" * 70)
+    print(f"Source: {args.input}, best of {args.repeat} runs")
+    print("-" * 70)
+    print(f"{'capsules':>9} {'per-capsule':>12} {'bulk':>8} {'speedup':>8} {'capsules/s (bulk)':>18}")
+
+    for count in (int(n) for n in args.sizes.split(',')):
+        raw_data = {'capsules': synthesize_raw(args.input, count)}
+        timings = {}
+        for bulk in (False, True):
+            best = None
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                SchemaMapper.map_collection(raw_data, bulk=bulk)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            timings[bulk] = best
+        print(f"{count:>9} {timings[False]:>11.3f}s {timings[True]:>7.3f}s "
+              f"{timings[False] / timings[True]:>7.2f}x {count / timings[True]:>18,.0f}")
+    return 0
+
+
+def link_pass(capsules) -> None:
+    """Read and assign capsule attributes the way the graph and enrichment stages do"""
+    for capsule in capsules:
+        links = capsule.links
+        links.parent = [capsule.id] if capsule.type == 'product' else []
+        links.related = links.parent
+        links.children = []
+        links.siblings = []
+        links.related_weights = None
+        links.sibling_group = f"{capsule.type}/{capsule.geo.region}"
+        capsule.seo.keywords = capsule.seo.keywords
+        capsule.metadata.updated = capsule.metadata.created
+
+
+def best_time(func, repeat: int) -> float:
+    """Best wall time of repeat calls"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def run_records(args) -> int:
+    """Compare CapsuleModel and CapsuleRecord memory and stage throughput"""
+    raw_data = {'capsules': synthesize_raw(args.input, args.capsules)}
+
+    # Memory held by each representation; strings are shared with raw_data
+    # by validation and not counted
+    gc.collect()
+    tracemalloc.start()
+    models = SchemaMapper.map_collection(raw_data, bulk=True).capsules
+    gc.collect()
+    model_memory = tracemalloc.get_traced_memory()[0]
+    records = to_records(models)
+    del models
+    gc.collect()
+    record_memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    models = SchemaMapper.map_collection(raw_data, bulk=True).capsules
+    records = to_records(SchemaMapper.map_collection(raw_data, bulk=True).capsules)
+    rows = [
+        ('link assignment pass', best_time(lambda: link_pass(models), args.repeat),
+         best_time(lambda: link_pass(records), args.repeat)),
+        ('enrich_collection', best_time(lambda: ContentEnricher.enrich_collection(models), 1),
+         best_time(lambda: ContentEnricher.enrich_collection(records), 1)),
+    ]
+    to_records_time = best_time(lambda: to_records(models), args.repeat)
+    to_models_time = best_time(lambda: to_models(records), args.repeat)
+
+    print("=" * 70)
+    print("Capsule representation: CapsuleModel vs CapsuleRecord")
+    print("=" * 70)
+    print(f"Source: {args.input}, {args.capsules} capsules")
+    print("-" * 70)
+    print(f"{'':<24} {'model':>12} {'record':>12} {'ratio':>8}")
+    print(f"{'memory (MB)':<24} {model_memory / 2**20:>12.1f} {record_memory / 2**20:>12.1f} "
+          f"{model_memory / record_memory:>7.2f}x")
+    for name, model_time, record_time in rows:
+        print(f"{name + ' (s)':<24} {model_time:>12.3f} {record_time:>12.3f} {model_time / record_time:>7.2f}x")
+    print("-" * 70)
+    print(f"to_records: {to_records_time:.3f}s, to_models (validation): {to_models_time:.3f}s")
+    return 0
+
+
+def main() -> int:
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description="Benchmark GraphBuilder engines")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    recall_parser = subparsers.add_parser('recall', help="MinHash/LSH recall against the exact engine")
+    recall_parser.add_argument('--input', type=Path, default=DEFAULT_INPUT)
+    recall_parser.add_argument('--permutations', type=int, default=128)
+    recall_parser.add_argument('--bands', type=int, default=64)
+    recall_parser.set_defaults(func=run_recall)
+
+    speedup_parser = subparsers.add_parser('speedup', help="Parallel build time per worker count")
+    speedup_parser.add_argument('--input', type=Path, default=DEFAULT_INPUT)
+    speedup_parser.add_argument('--capsules', type=int, default=2000)
+    speedup_parser.add_argument('--workers', default='1,2,4,8,16')
+    speedup_parser.set_defaults(func=run_speedup)
+
+    scorers_parser = subparsers.add_parser('scorers', help="Build time and edge quality per similarity scorer")
+    scorers_parser.add_argument('--input', type=Path, default=DEFAULT_INPUT)
+    scorers_parser.add_argument('--capsules', type=int, default=2000)
+    scorers_parser.add_argument('--engine', choices=GraphBuilder.ENGINES, default='python')
+    scorers_parser.add_argument('--k', type=int, default=None,
+                                help="Neighbors checked per capsule (default: copies of its source)")
+    scorers_parser.add_argument('--spread', type=float, default=5.0,
+                                help="Coordinate jitter in degrees; wide enough that distance alone "
+                                     "does not relate most capsules")
+    scorers_parser.set_defaults(func=run_scorers)
+
+    mapping_parser = subparsers.add_parser('mapping', help="Per-capsule vs bulk schema mapping")
+    mapping_parser.add_argument('--input', type=Path, default=DEFAULT_INPUT)
+    mapping_parser.add_argument('--sizes', default='1000,10000,100000')
+    mapping_parser.add_argument('--repeat', type=int, default=3)
+    mapping_parser.set_defaults(func=run_mapping)
+
+    records_parser = subparsers.add_parser('records', help="CapsuleModel vs CapsuleRecord memory and throughput")
+    records_parser.add_argument('--input', type=Path, default=DEFAULT_INPUT)
+    records_parser.add_argument('--capsules', type=int, default=100000)
+    records_parser.add_argument('--repeat', type=int, default=3)
+    records_parser.set_defaults(func=run_records)
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
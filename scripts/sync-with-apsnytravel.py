@@ -23,6 +23,29 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def parse_related_top_k(value: str):
+    """
+    Parse the related-link limit from an environment variable
+
+    Args:
+        value: One k for all capsules ("20"), comma-separated type=k pairs
+            ("place=20,guide=10"), or empty for unbounded related lists
+
+    Returns:
+        An int, a capsule type -> k dict, or None
+    """
+    value = value.strip()
+    if not value:
+        return None
+    if '=' not in value:
+        return int(value)
+    limits = {}
+    for pair in value.split(','):
+        capsule_type, k = pair.split('=', 1)
+        limits[capsule_type.strip()] = int(k)
+    return limits
+
+
 def main():
     """Main entry point for the synchronization script"""
     
@@ -35,17 +58,54 @@ def main():
         'APSNYTRAVEL_SOURCE_URL',
         'https://apsnytravel.ru/capsules.json'
     )
+    source_urls = [url.strip() for url in os.getenv('APSNYTRAVEL_SOURCE_URLS', '').split(',') if url.strip()]
     
     output_dir = os.getenv(
         'CAPSULEOS_OUTPUT_DIR',
         os.path.join(os.path.dirname(__file__), '..', 'client', 'public')
     )
     
-    logger.info(f"Source URL: {source_url}")
-    logger.info(f"Output Directory: {output_dir}\n")
+    graph_engine = os.getenv('CAPSULEOS_GRAPH_ENGINE', 'python')
+    graph_workers = int(os.getenv('CAPSULEOS_GRAPH_WORKERS', '1'))
+    graph_options = {'workers': graph_workers}
+    related_top_k = parse_related_top_k(os.getenv('CAPSULEOS_RELATED_TOP_K', ''))
+    if related_top_k is not None:
+        graph_options['related_top_k'] = related_top_k
+    incremental_graph = os.getenv('CAPSULEOS_INCREMENTAL_GRAPH', '') == '1'
+    feed_cache_dir = os.getenv(
+        'CAPSULEOS_FEED_CACHE',
+        os.path.join(os.path.dirname(__file__), '..', 'algorithm', '.cache', 'feed')
+    )
+    streaming_ingestion = os.getenv('CAPSULEOS_STREAMING_INGESTION', '') == '1'
+    snapshot_dir = os.getenv('CAPSULEOS_SNAPSHOT_DIR', '')
+    bulk_mapping = os.getenv('CAPSULEOS_BULK_MAPPING', '') == '1'
+    capsule_records = os.getenv('CAPSULEOS_CAPSULE_RECORDS', '') == '1'
+    enrichment_workers = int(os.getenv('CAPSULEOS_ENRICHMENT_WORKERS', '1'))
+    enrichment_cache = os.getenv(
+        'CAPSULEOS_ENRICHMENT_CACHE',
+        os.path.join(os.path.dirname(__file__), '..', 'algorithm', '.cache', 'enrichment.json')
+    )
+    
+    logger.info(f"Source URL: {', '.join(source_urls) or source_url}")
+    logger.info(f"Output Directory: {output_dir}")
+    logger.info(f"Graph Engine: {graph_engine} ({graph_workers} workers)\n")
     
     # Run the orchestrator
-    orchestrator = AlgorithmOrchestrator(source_url=source_url, output_dir=output_dir)
+    orchestrator = AlgorithmOrchestrator(
+        source_url=source_url,
+        output_dir=output_dir,
+        graph_engine=graph_engine,
+        graph_options=graph_options,
+        incremental_graph=incremental_graph,
+        enrichment_cache=enrichment_cache or None,
+        enrichment_workers=enrichment_workers,
+        feed_cache_dir=feed_cache_dir or None,
+        streaming_ingestion=streaming_ingestion,
+        sources=source_urls,
+        snapshot_dir=snapshot_dir or None,
+        bulk_mapping=bulk_mapping,
+        capsule_records=capsule_records
+    )
     success = orchestrator.run()
     
     if success: